@@ -0,0 +1 @@
+"""Shared data access and analysis engines for the bearing analysis pages."""
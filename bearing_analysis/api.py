@@ -0,0 +1,399 @@
+"""Headless JSON/Arrow API over the Q1-Q19 analyses.
+
+An ASGI app for tools that cannot use the Streamlit pages. It serves the
+same engines the pages use: the cube, survival fits, bootstrap ranking,
+significance tests, association matrix, Weibull table, threshold index and
+severity models. All of them run over the same shared, preloaded dataset.
+Run it with::
+
+    uvicorn bearing_analysis.api:app --host 0.0.0.0 --port 8000
+
+Filters are repeatable query parameters named after a cube dimension, e.g.
+``?industry_type=INDUSTRY_7&machine_type=Blower - Blower``. Every table
+comes back as JSON records, or as an Arrow IPC stream with
+``?format=arrow`` or ``Accept: application/vnd.apache.arrow.stream``.
+
+Handlers never compute or touch the disk on the event loop. The dataset and
+result cache are resolved once on the worker pool at startup, and each
+analysis runs on that thread pool (``API_WORKERS``, one thread per CPU by
+default), so the pool shares the process's dataset, indexes and result
+cache instead of copying them into worker processes. The encoded response
+body of every distinct query is kept in the shared result cache. A repeated
+query is answered on the event loop from those bytes, with no computing or
+re-encoding. Heavier analyses are also cached under their filter signature,
+so queries that spell the same filters differently share the work.
+
+Load-test a running server with :mod:`bearing_analysis.loadtest`.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+
+from bearing_analysis.association import AssociationIndex
+from bearing_analysis.binning import bin_edges, histogram_by_category
+from bearing_analysis.bootstrap import DEFAULT_RESAMPLES, rank_groups
+from bearing_analysis.boxplot import box_stats
+from bearing_analysis.cache import cached, filter_signature, get_result_cache
+from bearing_analysis.cube import DIMENSIONS, get_cube
+from bearing_analysis.dataset import DIMENSION_COLUMNS, SEVERITY_COLUMN, get_dataset, shared_resource
+from bearing_analysis.lubrication import lube_to_failure_cases
+from bearing_analysis.models import get_model_registry
+from bearing_analysis.scoring import score_frame
+from bearing_analysis.significance import independence_tests, mean_difference_tests
+from bearing_analysis.survival import fit_survival
+from bearing_analysis.thresholds import get_rpm_threshold_index
+from bearing_analysis.weibull import CONDITION_COLUMNS, get_weibull_table
+
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+WORKERS = int(os.environ.get("API_WORKERS", os.cpu_count() or 1))
+MEASURES = ["operational_days", "rpm_avg", SEVERITY_COLUMN]
+MIN_RANKING_SAMPLES = 5
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="bearing-api")
+
+
+def _association_columns(df):
+    return [SEVERITY_COLUMN, *[col for col in DIMENSION_COLUMNS if col in df.columns], "rpm_low_med_high_500"]
+
+
+def get_association_index():
+    """Process-wide association index over severity, the dimensions and the RPM range."""
+    return shared_resource("association_index", lambda df: AssociationIndex(df, _association_columns(df)))
+
+
+def _resolve_shared():
+    return {"records": len(get_dataset()), "result_cache": get_result_cache()}
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the dataset and the indexes every request shares before accepting traffic
+    loop = asyncio.get_running_loop()
+    for load in (get_cube, get_rpm_threshold_index, get_association_index):
+        await loop.run_in_executor(_executor, load)
+    app.state.shared = await loop.run_in_executor(_executor, _resolve_shared)
+    threading.Thread(target=lambda: get_model_registry().warm(), daemon=True).start()
+    yield
+
+
+app = FastAPI(title="Bearing Analysis API", lifespan=lifespan)
+
+
+async def _offload(func, *args, **kwargs):
+    """Run ``func`` on the worker pool, so the event loop keeps serving other requests."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+async def _shared(request):
+    """Row count and result cache of the shared dataset, resolved on the worker pool.
+
+    The lifespan hook resolves them at startup; without it they are resolved
+    on the first request. Either way the event loop never touches the disk.
+    """
+    state = request.app.state
+    if getattr(state, "shared", None) is None:
+        state.shared = await _offload(_resolve_shared)
+    return state.shared
+
+
+def _wants_arrow(request):
+    return request.query_params.get("format") == "arrow" or ARROW_TYPE in request.headers.get("accept", "")
+
+
+def _encode(result, arrow):
+    """A DataFrame as an Arrow IPC stream or JSON records; anything else as JSON."""
+    if not isinstance(result, pd.DataFrame):
+        return json.dumps(result).encode()
+    if arrow:
+        table = pa.Table.from_pandas(result, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return result.to_json(orient="records", date_format="iso").encode()
+
+
+def _respond(request, result):
+    """``result`` encoded for the client, without caching."""
+    arrow = _wants_arrow(request) and isinstance(result, pd.DataFrame)
+    return Response(_encode(result, arrow), media_type=ARROW_TYPE if arrow else "application/json")
+
+
+async def _serve(request, compute):
+    """Respond with ``compute()``, run on the worker pool and encoded once per distinct query."""
+    key = ("api response", request.url.path, tuple(sorted(request.query_params.multi_items())), _wants_arrow(request))
+    cache = (await _shared(request))["result_cache"]
+    response = cache.get(key)
+    if response is None:
+        def build():
+            result = compute()
+            arrow = _wants_arrow(request) and isinstance(result, pd.DataFrame)
+            return _encode(result, arrow), ARROW_TYPE if arrow else "application/json"
+
+        response = await _offload(cache.get_or_compute, key, build)
+    body, media_type = response
+    return Response(body, media_type=media_type)
+
+
+def _filters(request):
+    """``dimension -> [values]`` from the query string, for every cube dimension present."""
+    return {col: request.query_params.getlist(col) for col in DIMENSIONS if col in request.query_params}
+
+
+def _signature(filters):
+    df = get_dataset()
+    return filter_signature(filters, {col: df[col].cat.categories for col in filters})
+
+
+def _mask(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for col, values in filters.items():
+        mask &= df[col].isin(values)
+    return mask.to_numpy()
+
+
+def _filtered(filters):
+    df = get_dataset()
+    return df[_mask(df, filters)]
+
+
+def _check_columns(columns, allowed):
+    unknown = [col for col in columns if col not in allowed]
+    if unknown:
+        raise HTTPException(400, f"Unknown column(s) {', '.join(unknown)}; expected one of {', '.join(allowed)}")
+
+
+@app.get("/health")
+async def health(request: Request):
+    shared = await _shared(request)
+    return {"status": "ok", "records": shared["records"], "cache": shared["result_cache"].stats()}
+
+
+@app.get("/dimensions")
+async def dimensions(request: Request):
+    """Every value each filter dimension can take."""
+    return await _serve(request, lambda: {col: [str(value) for value in get_cube().values(col)] for col in DIMENSIONS})
+
+
+@app.get("/rollup")
+async def rollup(request: Request, by: list[str] = Query(...)):
+    """Lifespan statistics and severity counts per group (Q1-Q4)."""
+    _check_columns(by, DIMENSIONS)
+    filters = _filters(request)
+    return await _serve(request, lambda: get_cube().rollup(by, filters))
+
+
+@app.get("/quantiles")
+async def quantiles(request: Request, by: list[str] = Query([]), q: list[float] = Query([0.5])):
+    """Lifespan percentiles per group, from the cube's sketches (Q12, Q13)."""
+    _check_columns(by, DIMENSIONS)
+    if not all(0 <= value <= 1 for value in q):
+        raise HTTPException(400, "Quantiles must be between 0 and 1")
+    filters = _filters(request)
+    return await _serve(request, lambda: get_cube().quantiles(by, q, filters))
+
+
+@app.get("/counts")
+async def counts(request: Request, by: list[str] = Query(...)):
+    """Record counts per group, optionally by severity class (Q7, Q8, Q10, Q11, Q17)."""
+    _check_columns(by, [*DIMENSIONS, SEVERITY_COLUMN])
+    filters = _filters(request)
+    return await _serve(request, lambda: get_cube().size(by, filters).reset_index(name="count"))
+
+
+@app.get("/distribution")
+async def distribution(request: Request, x: str, y: str = "operational_days", color: str | None = None):
+    """Box-plot statistics of ``y`` per ``x`` (and ``color``) group (Q1, Q2, Q4, Q9, Q10, Q16)."""
+    _check_columns([x] + ([color] if color else []), DIMENSIONS)
+    _check_columns([y], MEASURES)
+    filters = _filters(request)
+
+    def compute():
+        return box_stats(_filtered(filters).dropna(subset=[y]), x, y, color)
+
+    return await _serve(request, lambda: cached(("api distribution", x, y, color), _signature(filters), compute))
+
+
+@app.get("/ranking")
+async def ranking(request: Request, resamples: int = Query(DEFAULT_RESAMPLES, ge=100, le=100_000)):
+    """Bearing types by mean lifespan with bootstrap intervals and top/bottom-5 probabilities (Q3)."""
+    filters = _filters(request)
+
+    def compute():
+        df = _filtered(filters).dropna(subset=["operational_days"])
+        counts = df["bearing_type_assigned_1"].value_counts()
+        df = df[df["bearing_type_assigned_1"].isin(counts.index[counts >= MIN_RANKING_SAMPLES])]
+        ranked = rank_groups(df["operational_days"].to_numpy(), df["bearing_type_assigned_1"].astype(str), resamples)
+        return ranked.rename(columns={"group": "bearing_type_assigned_1"}).sort_values("mean", ascending=False)
+
+    return await _serve(request, lambda: cached(("api ranking", resamples), _signature(filters), compute))
+
+
+@app.get("/lubrication/cases")
+async def lubrication_cases(
+    request: Request,
+    lube_class: list[int] = Query([1]),
+    failure_class: list[int] = Query([2, 3]),
+    include_unlubricated: bool = True,
+):
+    """Each failure paired with the last lubrication event before it on the same monitor (Q5, Q6)."""
+    filters = _filters(request)
+
+    def compute():
+        return lube_to_failure_cases(_filtered(filters), lube_class, failure_class, include_unlubricated)
+
+    key = ("api lubrication cases", tuple(lube_class), tuple(failure_class), include_unlubricated)
+    return await _serve(request, lambda: cached(key, _signature(filters), compute))
+
+
+def _lubrication_missing(df):
+    return df["lubrication_type"].astype(str).str.lower().str.contains("not available")
+
+
+@app.get("/significance/lubrication-severity")
+async def lubrication_severity(request: Request):
+    """Per-cell tests of missing lubrication data against severity class (Q7)."""
+    filters = _filters(request)
+
+    def compute():
+        df = _filtered(filters)
+        return independence_tests(df, _lubrication_missing(df), SEVERITY_COLUMN)
+
+    return await _serve(request, lambda: cached(("api lubrication severity",), _signature(filters), compute))
+
+
+@app.get("/significance/lubrication-timing")
+async def lubrication_timing(request: Request, severity: int = 2):
+    """Per-cell tests of time to failure without vs. with lubrication, for one severity class (Q19)."""
+    filters = _filters(request)
+
+    def compute():
+        df = _filtered(filters)
+        df = df[(df[SEVERITY_COLUMN] == severity) & (df["operational_days"] > 0)]
+        return mean_difference_tests(
+            df, _lubrication_missing(df), "operational_days",
+            by=["industry_type", "machine_type", "rpm_very_high_10000"],
+        )
+
+    return await _serve(request, lambda: cached(("api lubrication timing", severity), _signature(filters), compute))
+
+
+@app.get("/associations")
+async def associations(request: Request, corrected: bool = True):
+    """Cramér's V and mutual information between every pair of severity, dimensions and RPM range (Q9)."""
+    filters = _filters(request)
+
+    def compute():
+        mask = _mask(get_dataset(), filters) if filters else None
+        return get_association_index().associations(mask, corrected)
+
+    return await _serve(request, compute)
+
+
+@app.get("/survival")
+async def survival(
+    request: Request,
+    by: list[str] = Query([]),
+    reliability: float = Query(0.9, gt=0, lt=1),
+    failure_class: list[int] | None = Query(None),
+):
+    """Kaplan-Meier and Weibull replacement intervals at ``reliability`` per group (Q12, Q13)."""
+    _check_columns(by, DIMENSIONS)
+    filters = _filters(request)
+    classes = tuple(failure_class) if failure_class else None
+
+    def compute():
+        as_of = get_dataset()["timestamp_of_fault"].max()
+        # The fit is shared by every reliability level; only the intervals depend on it
+        fit = cached(("api survival", tuple(by), classes), _signature(filters),
+                     lambda: fit_survival(_filtered(filters), by, classes, as_of))
+        return fit.intervals(reliability).join(fit.weibull)
+
+    return await _serve(request, compute)
+
+
+class Monitor(BaseModel):
+    machine_type: str | None = None
+    rpm_min: float | None = None
+    rpm_max: float | None = None
+
+
+class PredictRequest(BaseModel):
+    monitors: list[Monitor]
+    industry_type: str = "All"
+    machine_type: str = "All"
+
+
+@app.post("/severity/predict")
+async def predict(request: Request, body: PredictRequest):
+    """Severity class probabilities for each monitor from the narrowest matching model (Q14)."""
+    frame = pd.DataFrame([monitor.model_dump() for monitor in body.monitors], columns=list(Monitor.model_fields))
+
+    def compute():
+        model = get_model_registry().best({"industry_type": body.industry_type, "machine_type": body.machine_type})
+        return score_frame(frame, model)
+
+    return _respond(request, await _offload(compute))
+
+
+@app.get("/heatmap")
+async def heatmap(
+    request: Request,
+    rpm_low: float | None = None,
+    rpm_high: float | None = None,
+    bins: int = Query(40, ge=1, le=500),
+):
+    """Failure counts per machine type and average-RPM bin (Q15)."""
+    filters = _filters(request)
+
+    def compute():
+        df = _filtered(filters).dropna(subset=["rpm_avg", "machine_type"])
+        low = df["rpm_avg"].min() if rpm_low is None else rpm_low
+        high = df["rpm_avg"].max() if rpm_high is None else rpm_high
+        if df.empty or not low <= high:
+            # No rows, or no range to bin (NaN bounds from an empty selection)
+            return pd.DataFrame({"machine_type": [], "rpm_bin_center": [], "count": pd.Series([], dtype=np.int64)})
+        df = df[df["rpm_avg"].between(low, high)]
+        counts = histogram_by_category(df["machine_type"], df["rpm_avg"], bin_edges(low, high, bins))
+        counts = counts.rename_axis(index="machine_type", columns="rpm_bin_center").stack()
+        return counts[counts > 0].reset_index(name="count")
+
+    key = ("api heatmap", rpm_low, rpm_high, bins)
+    return await _serve(request, lambda: cached(key, _signature(filters), compute))
+
+
+@app.get("/weibull")
+async def weibull(request: Request):
+    """Weibull shape/scale with 95% bounds and B10 life per operating-condition group (Q16)."""
+    filters = _filters(request)
+    unsupported = [col for col in filters if col not in CONDITION_COLUMNS]
+    if unsupported:
+        raise HTTPException(400, f"Cannot filter the Weibull table by {', '.join(unsupported)}; "
+                                 f"expected one of {', '.join(CONDITION_COLUMNS)}")
+
+    def compute():
+        table = get_weibull_table()
+        return table[_mask(table, filters)]
+
+    return await _serve(request, compute)
+
+
+@app.get("/high-rpm")
+async def high_rpm(request: Request, threshold: float = 3000, severity: list[int] | None = Query(None)):
+    """Failures at or above ``threshold`` maximum RPM per industry (Q18)."""
+    def compute():
+        counts = get_rpm_threshold_index().counts(threshold, severity)
+        return counts.rename_axis("industry_type").reset_index(name="count")
+
+    return await _serve(request, compute)
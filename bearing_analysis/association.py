@@ -0,0 +1,136 @@
+"""Pairwise association between categorical columns: Cramér's V and mutual information.
+
+Every column is reduced once to integer codes (-1 where missing), so the
+index holds one small integer per row and column. The contingency table of
+a column pair with ``a`` and ``b`` categories has ``a * b`` cells. A row
+lands in cell ``code_i * b + code_j``, and one ``np.bincount`` over those
+combined codes builds the pair's table, whether a column has 4 categories
+or 700. Pairs are counted one at a time into a single stacked array, each
+pair's cells placed after the previous pair's.
+
+Contingency counts are additive. When the filtered subset changes, the
+index updates the previous subset's tables by adding the rows that entered
+and subtracting the rows that left, which is cheaper than a recount
+whenever the filters change only a little.
+
+Cramér's V uses the Bergsma bias correction by default. Without it, columns
+with hundreds of categories and a few rows each look associated with
+everything.
+"""
+
+import threading
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+MEASURES = {"cramers_v": "Cramér's V", "mutual_information": "Mutual information (bits)"}
+
+
+def _codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), len(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes.astype(np.int64), len(uniques)
+
+
+def cramers_v(table, corrected=True):
+    """Cramér's V of a contingency table, ignoring empty rows and columns; NaN when either side has one value."""
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    r, c = table.shape
+    if min(r, c) < 2:
+        return np.nan
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    phi2 = ((table - expected) ** 2 / expected).sum() / n
+    if corrected:
+        # Bergsma (2013): remove the chi-square expected under independence, and shrink r and c alike
+        phi2 = max(0.0, phi2 - (r - 1) * (c - 1) / (n - 1))
+        r, c = r - (r - 1) ** 2 / (n - 1), c - (c - 1) ** 2 / (n - 1)
+        if min(r, c) <= 1:
+            return np.nan
+    return float(np.sqrt(phi2 / (min(r, c) - 1)))
+
+
+def mutual_information(table):
+    """Mutual information in bits between the row and column variables of a contingency table."""
+    n = table.sum()
+    if n == 0:
+        return np.nan
+    joint = table / n
+    outer = np.outer(joint.sum(axis=1), joint.sum(axis=0))
+    nonzero = joint > 0
+    return float((joint[nonzero] * np.log2(joint[nonzero] / outer[nonzero])).sum())
+
+
+class AssociationIndex:
+    """Integer-coded columns of one frame, with all-pairs contingency tables for any row subset."""
+
+    def __init__(self, df, columns):
+        self.columns = list(columns)
+        coded = [_codes(df[col]) for col in self.columns]
+        self.n_rows = len(df)
+        self.cardinality = np.array([k for _, k in coded], dtype=np.int64)
+        self.pairs = list(combinations(range(len(self.columns)), 2))
+        sizes = np.array([self.cardinality[i] * self.cardinality[j] for i, j in self.pairs], dtype=np.int64)
+        self.offsets = np.append(0, np.cumsum(sizes))
+        self._codes = [codes.astype(np.int32) for codes, _ in coded]
+        self._lock = threading.Lock()
+        self._last_mask = None
+        self._last_counts = None
+
+    def _count(self, rows):
+        counts = np.zeros(self.offsets[-1], dtype=np.int64)
+        codes = [column[rows].astype(np.int64) for column in self._codes]
+        for p, (i, j) in enumerate(self.pairs):
+            ci, cj = codes[i], codes[j]
+            known = (ci >= 0) & (cj >= 0)
+            counts[self.offsets[p]:self.offsets[p + 1]] = np.bincount(
+                ci[known] * self.cardinality[j] + cj[known], minlength=self.offsets[p + 1] - self.offsets[p]
+            )
+        return counts
+
+    def counts(self, mask=None):
+        """Stacked contingency counts of the rows in boolean ``mask`` (every row if ``None``)."""
+        mask = np.ones(self.n_rows, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        with self._lock:
+            if self._last_mask is not None:
+                entered = np.flatnonzero(mask & ~self._last_mask)
+                left = np.flatnonzero(self._last_mask & ~mask)
+                if len(entered) + len(left) < mask.sum():
+                    counts = self._last_counts + self._count(entered) - self._count(left)
+                    self._last_mask, self._last_counts = mask, counts
+                    return counts
+            counts = self._count(np.flatnonzero(mask))
+            self._last_mask, self._last_counts = mask, counts
+            return counts
+
+    def table(self, counts, i, j):
+        """Contingency table of columns ``i`` x ``j`` from stacked ``counts``."""
+        if i > j:
+            return self.table(counts, j, i).T
+        p = self.pairs.index((i, j))
+        return counts[self.offsets[p]:self.offsets[p + 1]].reshape(self.cardinality[i], self.cardinality[j])
+
+    def associations(self, mask=None, corrected=True):
+        """Long frame of Cramér's V and mutual information for every column pair over the rows in ``mask``."""
+        counts = self.counts(mask)
+        records = []
+        for p, (i, j) in enumerate(self.pairs):
+            table = counts[self.offsets[p]:self.offsets[p + 1]].reshape(self.cardinality[i], self.cardinality[j])
+            records.append({
+                "column_a": self.columns[i],
+                "column_b": self.columns[j],
+                "records": int(table.sum()),
+                "cramers_v": cramers_v(table, corrected),
+                "mutual_information": mutual_information(table),
+            })
+        return pd.DataFrame(records)
+
+    def matrix(self, mask=None, measure="cramers_v", corrected=True):
+        """Symmetric column x column matrix of ``measure``; the diagonal is left missing."""
+        pairs = self.associations(mask, corrected)
+        matrix = pd.DataFrame(np.nan, index=self.columns, columns=self.columns)
+        for row in pairs.itertuples():
+            matrix.loc[row.column_a, row.column_b] = matrix.loc[row.column_b, row.column_a] = getattr(row, measure)
+        return matrix
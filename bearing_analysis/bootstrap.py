@@ -0,0 +1,85 @@
+"""Bootstrap confidence intervals and rank stability for group means.
+
+For each group of ``n`` records, one ``(n_resamples, n)`` matrix of random
+row indices is drawn and averaged along its rows. Matrices larger than
+``MAX_CELLS`` are drawn a block of resamples at a time. That gives every
+bootstrap mean of the group in one NumPy operation, with no Python loop
+over resamples. Groups of the same size share a single matrix draw, so the
+Python loop runs over distinct group sizes rather than groups.
+
+Stacking the groups' resampled means gives a ``(groups, resamples)`` matrix.
+Each column is one bootstrap world. ``argpartition`` down the columns
+finds the top and bottom ``k`` groups of every world at once. The share of
+worlds a group lands in the top (or bottom) ``k`` is its rank-stability
+probability.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESAMPLES = 10_000
+CONFIDENCE = 0.95
+# Upper bound on index-matrix cells drawn at once, whatever the group size or resample count
+MAX_CELLS = 20_000_000
+
+
+def bootstrap_means(values, group_ids, n_groups, n_resamples=DEFAULT_RESAMPLES, seed=0):
+    """``(n_groups, n_resamples)`` matrix of bootstrap means of ``values`` per group (NaN for empty groups)."""
+    rng = np.random.default_rng(seed)
+    order = np.argsort(group_ids, kind="stable")
+    sorted_values = np.asarray(values, dtype=np.float64)[order]
+    sizes = np.bincount(group_ids, minlength=n_groups)
+    starts = np.append(0, np.cumsum(sizes))[:-1]
+    means = np.full((n_groups, n_resamples), np.nan)
+    for size in np.unique(sizes[sizes > 0]):
+        groups = np.flatnonzero(sizes == size)
+        # Rows of the same-size groups, resampled by one shared offset matrix. Large
+        # groups are split over resamples too, so no chunk exceeds MAX_CELLS
+        # (or a single resample of one group).
+        resamples_per_chunk = max(1, min(n_resamples, MAX_CELLS // size))
+        groups_per_chunk = max(1, MAX_CELLS // (size * resamples_per_chunk))
+        for first in range(0, len(groups), groups_per_chunk):
+            chunk = groups[first:first + groups_per_chunk]
+            for low in range(0, n_resamples, resamples_per_chunk):
+                high = min(low + resamples_per_chunk, n_resamples)
+                offsets = rng.integers(0, size, (len(chunk), high - low, size))
+                rows = starts[chunk][:, None, None] + offsets
+                means[chunk, low:high] = sorted_values[rows].mean(axis=2)
+    return means
+
+
+def rank_groups(values, groups, n_resamples=DEFAULT_RESAMPLES, k=5, confidence=CONFIDENCE, seed=0):
+    """Mean, bootstrap interval and top/bottom-``k`` probabilities of ``values`` per ``groups`` value.
+
+    ``groups`` is a Series aligned with ``values``. The result has one row
+    per group, with ``count``, ``mean``, ``ci_low``, ``ci_high``, ``p_top``
+    and ``p_bottom``.
+    """
+    codes, names = pd.factorize(groups, sort=True)
+    known = codes >= 0
+    values = np.asarray(values, dtype=np.float64)[known]
+    codes = codes[known]
+    n_groups = len(names)
+
+    means = bootstrap_means(values, codes, n_groups, n_resamples, seed)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha], axis=1)
+
+    k = min(k, n_groups)
+    p_top = np.zeros(n_groups)
+    p_bottom = np.zeros(n_groups)
+    if k:
+        top = np.argpartition(-means, k - 1, axis=0)[:k]
+        bottom = np.argpartition(means, k - 1, axis=0)[:k]
+        p_top = np.bincount(top.ravel(), minlength=n_groups) / n_resamples
+        p_bottom = np.bincount(bottom.ravel(), minlength=n_groups) / n_resamples
+
+    return pd.DataFrame({
+        "group": names,
+        "count": np.bincount(codes, minlength=n_groups),
+        "mean": np.bincount(codes, weights=values, minlength=n_groups) / np.maximum(np.bincount(codes, minlength=n_groups), 1),
+        "ci_low": low,
+        "ci_high": high,
+        "p_top": p_top,
+        "p_bottom": p_bottom,
+    })
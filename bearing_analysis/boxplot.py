@@ -0,0 +1,171 @@
+"""Box and violin plots drawn from server-side statistics.
+
+``px.box(points="all")`` and ``px.violin`` send every value to the browser,
+which then recomputes the quartiles itself. Here the values are sorted once
+by (group, value). Quartiles, Tukey whiskers and outliers for every group
+come out of that one array, and the figure gets precomputed box traces.
+Points are capped at ``max_points`` per group: outliers first, then a
+uniform sample of the rest. Random keys with the ``k`` smallest taken per
+group is the vectorised form of reservoir sampling. Violin outlines are
+estimated by the browser from those points only. The opt-in ``show_all``
+mode draws every point with WebGL instead.
+
+Boxes, violins and points are all placed on a numeric axis, one slot per
+``color`` value within each ``x`` category, so they line up exactly.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+DEFAULT_MAX_POINTS = 200
+WHISKER = 1.5
+GROUP_WIDTH = 0.8
+
+
+class _Groups:
+    """Rows with a known ``y``, sorted by (group, y)."""
+
+    def __init__(self, df, x, y, color=None):
+        keys = [x] if color is None or color == x else [x, color]
+        ids = df[keys].groupby(keys, observed=True, sort=True).ngroup().to_numpy()
+        values = df[y].to_numpy(dtype=np.float64)
+        rows = np.flatnonzero((ids >= 0) & ~np.isnan(values))
+        order = np.lexsort((values[rows], ids[rows]))
+        self.rows = rows[order]
+        self.values = values[self.rows]
+
+        # Renumber so that only groups with at least one value remain
+        present, self.ids = np.unique(ids[self.rows], return_inverse=True)
+        self.ids = self.ids.reshape(-1)
+        self.counts = np.bincount(self.ids, minlength=len(present))
+        self.starts = np.append(0, np.cumsum(self.counts)[:-1])
+        frame = df.iloc[self.rows[self.starts]] if len(present) else df.iloc[:0]
+        self.keys = pd.DataFrame({col: frame[col].to_numpy() for col in keys})
+
+    def __len__(self):
+        return len(self.counts)
+
+    def quantile(self, q):
+        # Linear interpolation between order statistics, as numpy and Plotly do
+        position = self.starts + q * (self.counts - 1)
+        below = np.floor(position).astype(np.int64)
+        above = np.ceil(position).astype(np.int64)
+        return self.values[below] + (self.values[above] - self.values[below]) * (position - below)
+
+
+def _stats(groups):
+    q1, median, q3 = groups.quantile(0.25), groups.quantile(0.5), groups.quantile(0.75)
+    iqr = q3 - q1
+    low, high = np.repeat(q1 - WHISKER * iqr, groups.counts), np.repeat(q3 + WHISKER * iqr, groups.counts)
+    inside = (groups.values >= low) & (groups.values <= high)
+    stats = groups.keys.assign(
+        count=groups.counts,
+        mean=np.bincount(groups.ids, weights=groups.values, minlength=len(groups)) / np.maximum(groups.counts, 1),
+        min=groups.values[groups.starts] if len(groups) else [],
+        q1=q1,
+        median=median,
+        q3=q3,
+        max=groups.values[groups.starts + groups.counts - 1] if len(groups) else [],
+    )
+    if len(groups):
+        stats["lowerfence"] = np.minimum.reduceat(np.where(inside, groups.values, np.inf), groups.starts)
+        stats["upperfence"] = np.maximum.reduceat(np.where(inside, groups.values, -np.inf), groups.starts)
+    else:
+        stats["lowerfence"] = stats["upperfence"] = []
+    # Sample std (ddof=1) from centred values, as pandas and the cube report it
+    centred = groups.values - stats["mean"].to_numpy()[groups.ids]
+    sumsq = np.bincount(groups.ids, weights=centred ** 2, minlength=len(groups))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats["std"] = np.sqrt(np.where(groups.counts > 1, sumsq / (groups.counts - 1), np.nan))
+    stats["outliers"] = np.bincount(groups.ids, weights=~inside, minlength=len(groups)).astype(np.int64)
+    return stats, ~inside
+
+
+def box_stats(df, x, y, color=None):
+    """Count, mean, std, quartiles, whiskers (``lowerfence``/``upperfence``) and outlier count of ``y`` per group."""
+    return _stats(_Groups(df, x, y, color))[0]
+
+
+def _sample(groups, outlier, max_points, seed):
+    """Positions (into the sorted values) of at most ``max_points`` per group, outliers first."""
+    if max_points is None:
+        return np.arange(len(groups.values))
+    priority = np.random.default_rng(seed).random(len(groups.values)) + ~outlier
+    order = np.lexsort((priority, groups.ids))
+    rank = np.arange(len(order)) - groups.starts[groups.ids[order]]
+    return np.sort(order[rank < max_points])
+
+
+def distribution_figure(df, x, y, color=None, kind="box", max_points=DEFAULT_MAX_POINTS, show_all=False,
+                        title=None, labels=None, seed=0):
+    """Box (or violin) plot of ``y`` per ``x`` (and ``color``) built from precomputed statistics.
+
+    Draws at most ``max_points`` points per group, or every point with
+    WebGL when ``show_all`` is set. ``color=x`` is drawn as a single trace.
+    """
+    labels = labels or {}
+    if color == x:
+        # Colouring by the x categories only repeats the axis; one trace per category is slow to draw
+        color = None
+    groups = _Groups(df, x, y, color)
+    stats, outlier = _stats(groups)
+
+    categories = pd.unique(stats[x])
+    colours = pd.unique(stats[color]) if color is not None else [None]
+    slots = len(colours)
+    width = GROUP_WIDTH / slots
+    slot = pd.Index(colours).get_indexer(stats[color]) if color is not None else np.zeros(len(stats), dtype=np.int64)
+    stats["position"] = pd.Index(categories).get_indexer(stats[x]) - GROUP_WIDTH / 2 + (slot + 0.5) * width
+
+    points = _sample(groups, outlier, None if show_all else max_points, seed)
+    point_group = groups.ids[points]
+    jitter = np.random.default_rng(seed).uniform(-0.3, 0.3, len(points)) * width
+    point_x = stats["position"].to_numpy()[point_group] + jitter
+    point_y = groups.values[points]
+    Points = go.Scattergl if show_all else go.Scatter
+
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, value in enumerate(colours):
+        in_colour = (stats[color] == value).to_numpy() if color is not None else np.ones(len(stats), dtype=bool)
+        cell = stats[in_colour]
+        chosen = in_colour[point_group]
+        name = str(value) if color is not None else labels.get(y, y)
+        marker = palette[i % len(palette)]
+
+        if kind == "violin":
+            fig.add_trace(go.Violin(
+                x=stats["position"].to_numpy()[point_group[chosen]].astype(np.float32),
+                y=point_y[chosen].astype(np.float32), width=width * 0.9, name=name, legendgroup=name,
+                line_color=marker, points=False, hoverinfo="skip", spanmode="hard", showlegend=color is not None,
+            ))
+
+        fig.add_trace(go.Box(
+            x=cell["position"].astype(np.float32), q1=cell["q1"].astype(np.float32),
+            median=cell["median"].astype(np.float32), q3=cell["q3"].astype(np.float32),
+            lowerfence=cell["lowerfence"].astype(np.float32), upperfence=cell["upperfence"].astype(np.float32),
+            width=width * (0.2 if kind == "violin" else 0.8), name=name, legendgroup=name, marker_color=marker,
+            boxpoints=False, showlegend=color is not None and kind != "violin",
+        ))
+
+        fig.add_trace(Points(
+            x=point_x[chosen].astype(np.float32), y=point_y[chosen].astype(np.float32), mode="markers", name=name,
+            legendgroup=name, showlegend=False, marker={"color": marker, "size": 4, "opacity": 0.5},
+            hovertemplate=f"{labels.get(y, y)}=%{{y}}<extra>{name}</extra>",
+        ))
+
+    fig.update_layout(
+        title=title,
+        legend_title_text=labels.get(color, color) if color is not None else None,
+        xaxis={
+            "title": labels.get(x, x),
+            "tickmode": "array",
+            "tickvals": np.arange(len(categories)),
+            "ticktext": [str(c) for c in categories],
+            "range": [-0.5, len(categories) - 0.5],
+        },
+        yaxis_title=labels.get(y, y),
+    )
+    return fig
@@ -0,0 +1,149 @@
+"""Process-wide cache for aggregation results.
+
+Results are keyed on what was asked, not on how the widgets were set. A key
+is a query name plus a *filter signature*. The signature is either the exact
+set of rows or cube cells the filters select (see :meth:`Cube.mask` and
+:meth:`FilterIndex.signature`) or, for plain ``column -> values`` filters,
+the canonical form built by :func:`filter_signature`. ``["All"]`` and the
+full explicit option list therefore hit the same entry. So do the different
+checkbox paths that arrive at one subset, and the same query asked by two
+pages.
+
+Entries are evicted least-recently-used once their estimated size exceeds
+the byte budget. The cache lives next to the shared dataset, so a rebuilt
+artifact starts with an empty cache.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.dataset import shared_resource
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+ALL = "All"
+
+
+def _nbytes(value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+def _share(value):
+    # Shallow copies under copy-on-write, so callers can add columns freely.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a byte budget and hit/miss counters."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result for ``key``, computing and storing it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _share(self._entries[key][0])
+            self.misses += 1
+        value = compute()
+        self.put(key, value)
+        return _share(value)
+
+    def get(self, key, default=None):
+        """The cached result for ``key``, or ``default``; a miss is left for ``get_or_compute`` to count."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _share(self._entries[key][0])
+
+    def put(self, key, value):
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def get_result_cache():
+    """The process-wide result cache for the shared dataset."""
+    return shared_resource("result_cache", lambda df: ResultCache())
+
+
+def cached(name, signature, compute):
+    """Look up ``(name, signature)`` in the process-wide cache, computing it on a miss."""
+    return get_result_cache().get_or_compute((name, signature), compute)
+
+
+def filter_signature(selections, domains):
+    """Canonical, hashable form of ``column -> selected values`` filters.
+
+    ``domains`` maps each column to every value it can take. A selection of
+    ``None``, one containing ``"All"``, or one covering the whole domain does
+    not constrain the column and is dropped. The remaining selections become
+    sorted tuples, and the columns are sorted too.
+    """
+    signature = []
+    for col in sorted(selections):
+        selected = selections[col]
+        if selected is None:
+            continue
+        if isinstance(selected, str) or not hasattr(selected, "__iter__"):
+            selected = [selected]
+        selected = set(selected)
+        domain = set(domains[col])
+        if ALL in selected or domain <= selected:
+            continue
+        signature.append((col, tuple(sorted(selected & domain, key=str))))
+    return tuple(signature)
@@ -0,0 +1,67 @@
+"""Rendered-figure cache for the matplotlib/seaborn pages.
+
+Figures are drawn on a bare :class:`matplotlib.figure.Figure`, never through
+``pyplot``. ``pyplot`` registers every figure globally and keeps it until
+it is closed. These figures are saved to PNG or SVG bytes and released
+right away. The bytes are cached on a hash of the aggregate that was
+plotted plus the drawing parameters (titles, thresholds, size), so a rerun
+over the same data is a dictionary lookup and nothing is redrawn. The cache
+is the byte-bounded LRU from :mod:`bearing_analysis.cache`.
+"""
+
+import hashlib
+import io
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from bearing_analysis.cache import ResultCache
+from bearing_analysis.dataset import shared_resource
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# What ``st.pyplot`` uses, so cached images look the same
+SAVEFIG_OPTIONS = {"dpi": 200, "bbox_inches": "tight"}
+
+
+def data_hash(data, params=()):
+    """Stable digest of a DataFrame/Series/array (index and labels included) and ``params``."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        labels = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+        digest.update(repr((list(labels), list(data.index.names), data.shape)).encode())
+    else:
+        data = np.ascontiguousarray(data)
+        digest.update(data.tobytes())
+        digest.update(repr((data.dtype.str, data.shape)).encode())
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def get_figure_cache():
+    """The process-wide cache of rendered figure bytes."""
+    return shared_resource("figure_cache", lambda df: ResultCache(max_bytes=DEFAULT_MAX_BYTES))
+
+
+def render_figure(fig, fmt="png"):
+    """Save ``fig`` to bytes and release its artists."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format=fmt, **SAVEFIG_OPTIONS)
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+def cached_figure(name, data, draw, params=(), figsize=None, fmt="png"):
+    """PNG (or SVG) bytes of ``draw(ax, data)``, cached on ``name`` and the hash of ``data`` and ``params``.
+
+    ``draw`` gets the axes of a new figure and must not use ``pyplot``.
+    """
+    def compute():
+        fig = Figure(figsize=figsize)
+        draw(fig.subplots(), data)
+        return render_figure(fig, fmt)
+
+    return get_figure_cache().get_or_compute((name, fmt, figsize, data_hash(data, params)), compute)
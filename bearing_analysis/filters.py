@@ -0,0 +1,134 @@
+"""Bitmap index for the cascading multiselect filters.
+
+For every distinct value of every indexed column the index keeps the set of
+rows holding that value. A multiselect filter is then the OR of its values'
+row sets, and a combination of filters is the AND across columns, evaluated
+on packed 64-bit words rather than on the frame itself.
+
+Frequent values are stored as packed bitmaps (one bit per row). Values held by
+fewer than 1 in 32 rows are stored as sorted row positions instead, which are
+smaller than a bitmap at that density. This keeps high-cardinality columns
+such as ``bearing_type_assigned_1`` from costing one full bitmap per value.
+"""
+
+import numpy as np
+import pandas as pd
+
+# A value is stored as positions when that takes less room than a bitmap.
+_SPARSE_RATIO = 32
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words):
+        return int(np.bitwise_count(words).sum())
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words):
+        return int(_BYTE_COUNTS[words.view(np.uint8)].sum())
+
+
+def _pack(flags):
+    """Pack a boolean row array into little-endian uint64 words."""
+    n_words = -(-len(flags) // 64)
+    packed = np.packbits(flags, bitorder="little")
+    return np.pad(packed, (0, n_words * 8 - len(packed))).view("<u8")
+
+
+class _ColumnIndex:
+    def __init__(self, series, n_rows):
+        categorical = pd.Categorical(series).remove_unused_categories()
+        codes = categorical.codes
+        self.values = list(categorical.categories)
+        self.position = {value: i for i, value in enumerate(self.values)}
+        self.has_missing = bool((codes < 0).any())
+
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.values) + 1))
+        self.dense = {}
+        self.sparse = {}
+        for i in range(len(self.values)):
+            rows = order[bounds[i]:bounds[i + 1]]
+            if len(rows) * _SPARSE_RATIO < n_rows:
+                self.sparse[i] = rows.astype(np.int64)
+            else:
+                flags = np.zeros(n_rows, dtype=bool)
+                flags[rows] = True
+                self.dense[i] = _pack(flags)
+
+    def words(self, codes, n_rows, n_words):
+        """OR of the row sets of ``codes``, as packed words."""
+        words = np.zeros(n_words, dtype=np.uint64)
+        positions = []
+        for code in codes:
+            if code in self.dense:
+                words |= self.dense[code]
+            else:
+                positions.append(self.sparse[code])
+        if positions:
+            flags = np.zeros(n_rows, dtype=bool)
+            flags[np.concatenate(positions)] = True
+            words |= _pack(flags)
+        return words
+
+    def count(self, code, mask_words):
+        """Rows holding ``code`` among the rows set in ``mask_words``."""
+        if code in self.dense:
+            return _popcount(self.dense[code] & mask_words)
+        rows = self.sparse[code]
+        bits = (mask_words[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1)
+        return int(bits.sum())
+
+
+class FilterIndex:
+    """Bitmap index over the dimension columns of a frame.
+
+    ``selections`` map a column to the values to keep. A column that is
+    missing or maps to ``None`` is unconstrained. Selecting every value of a
+    column without missing data is treated as unconstrained too.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.n_words = -(-self.n_rows // 64)
+        self.columns = {col: _ColumnIndex(df[col], self.n_rows) for col in columns}
+        self._all = _pack(np.ones(self.n_rows, dtype=bool))
+
+    def values(self, column):
+        """Every distinct value of ``column`` present in the frame, in category order."""
+        return list(self.columns[column].values)
+
+    def _mask_words(self, selections, skip=None):
+        words = self._all.copy()
+        for col, selected in selections.items():
+            if selected is None or col == skip:
+                continue
+            index = self.columns[col]
+            codes = {index.position[v] for v in selected if v in index.position}
+            if len(codes) == len(index.values) and not index.has_missing:
+                continue
+            words &= index.words(codes, self.n_rows, self.n_words)
+        return words
+
+    def select(self, selections):
+        """Boolean row mask for ``selections``."""
+        words = self._mask_words(selections)
+        return np.unpackbits(words.view(np.uint8), count=self.n_rows, bitorder="little").astype(bool)
+
+    def signature(self, selections):
+        """Hashable key for the exact rows ``selections`` match, for result caching."""
+        return self._mask_words(selections).tobytes()
+
+    def count(self, selections):
+        """Number of rows matching ``selections``."""
+        return _popcount(self._mask_words(selections))
+
+    def counts(self, column, selections):
+        """Rows per value of ``column`` under every selection except ``column``'s own."""
+        index = self.columns[column]
+        words = self._mask_words(selections, skip=column)
+        return pd.Series([index.count(i, words) for i in range(len(index.values))], index=index.values, dtype="int64")
+
+    def available(self, column, selections):
+        """Values of ``column`` still present under the other selections, for cascading widgets."""
+        counts = self.counts(column, selections)
+        return counts.index[counts > 0].tolist()
@@ -0,0 +1,102 @@
+"""Load test for the JSON API.
+
+Drives a running ``bearing_analysis.api`` server with ``--concurrency``
+async clients. Each client cycles through a mix of endpoints for
+``--duration`` seconds, then the tool reports throughput, latency
+percentiles and errors per endpoint::
+
+    uvicorn bearing_analysis.api:app --port 8000 &
+    python -m bearing_analysis.loadtest --url http://127.0.0.1:8000 --concurrency 64 --duration 15
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+# A mix of cheap cube lookups and cached engine results, as the planning tools call them
+DEFAULT_PATHS = [
+    "/health",
+    "/dimensions",
+    "/rollup?by=bearing_type_assigned_1&industry_type=INDUSTRY_7",
+    "/quantiles?by=machine_type&q=0.5&q=0.75",
+    "/counts?by=bearing_make&by=bearing_severity_class",
+    "/counts?by=industry_type&by=machine_type&by=lubrication_type",
+    "/distribution?x=machine_type&y=operational_days",
+    "/ranking?industry_type=INDUSTRY_7",
+    "/significance/lubrication-severity",
+    "/associations?industry_type=INDUSTRY_7",
+    "/survival?by=machine_type&reliability=0.9",
+    "/heatmap?bins=40",
+    "/weibull?machine_type=Blower - Blower",
+    "/high-rpm?threshold=3000",
+]
+
+
+async def _client(http, paths, offset, deadline, results):
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await http.get(path)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        results.append((path, status, time.perf_counter() - start))
+
+
+async def run(url, paths=DEFAULT_PATHS, concurrency=64, duration=10.0, warmup=True):
+    """``(requests per second, per-request results)`` after ``duration`` seconds of ``concurrency`` clients."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as http:
+        if warmup:
+            # Fill the server's result cache once, so the run measures steady-state serving
+            for path in paths:
+                await http.get(path)
+        results = []
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(_client(http, paths, i, deadline, results) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return len(results) / elapsed, pd.DataFrame(results, columns=["path", "status", "seconds"])
+
+
+def summarize(results):
+    """Requests, errors and latency percentiles (ms) per path, plus an overall row."""
+    def stats(frame):
+        ms = frame["seconds"].to_numpy() * 1000
+        return pd.Series({
+            "requests": len(frame),
+            "errors": int((frame["status"] != 200).sum()),
+            "p50_ms": np.percentile(ms, 50),
+            "p95_ms": np.percentile(ms, 95),
+            "p99_ms": np.percentile(ms, 99),
+        })
+
+    per_path = results.groupby("path", sort=False)[["status", "seconds"]].apply(stats)
+    per_path.loc["(all)"] = stats(results)
+    return per_path.astype({"requests": "int64", "errors": "int64"})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the bearing analysis API.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--path", action="append", dest="paths", help="endpoint to request (repeatable)")
+    args = parser.parse_args(argv)
+
+    rate, results = asyncio.run(run(args.url, args.paths or DEFAULT_PATHS, args.concurrency, args.duration))
+    print(summarize(results).to_string(float_format=lambda v: f"{v:.1f}"))
+    print(f"\n{len(results):,} requests at {rate:,.0f} requests/sec")
+    return 0 if (results["status"] == 200).all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Last-lubrication-before-failure engine.
+
+The dataset has no separate lubrication log: a fault record in one of the
+"lubrication" severity classes stands in for a lubrication event. For every
+failure record, the engine looks up the monitor's most recent lubrication
+event strictly before it. This is a backward as-of join keyed on
+``monitor_id``, so the cost is one sort instead of a nested scan per monitor.
+"""
+
+import pandas as pd
+
+SEVERITY = "bearing_severity_class"
+TIMESTAMP = "timestamp_of_fault"
+
+
+def lube_to_failure_cases(df, lube_classes=(1, 2), failure_classes=(2, 3), include_unlubricated=False, attributes=()):
+    """Pair each failure with the last lubrication event before it on the same monitor.
+
+    Returns one row per failure with ``monitor_id``, ``last_lube``,
+    ``fail_date``, ``lubed_before_fail`` and ``days_between``, ordered by
+    monitor and failure time. Failures with no earlier lubrication are dropped
+    unless ``include_unlubricated`` is set; those rows then have a missing
+    ``last_lube`` and ``days_between``.
+
+    ``attributes`` lists extra columns to copy onto each case from the
+    monitor's earliest lubrication or failure record.
+    """
+    events = df.loc[
+        df[SEVERITY].isin(set(lube_classes) | set(failure_classes)),
+        ["monitor_id", TIMESTAMP, SEVERITY, *attributes],
+    ].sort_values(TIMESTAMP, kind="stable")
+
+    lubes = events.loc[events[SEVERITY].isin(lube_classes), ["monitor_id", TIMESTAMP]]
+    fails = events.loc[events[SEVERITY].isin(failure_classes), ["monitor_id", TIMESTAMP]]
+    cases = pd.merge_asof(
+        fails.rename(columns={TIMESTAMP: "fail_date"}),
+        lubes.rename(columns={TIMESTAMP: "last_lube"}),
+        left_on="fail_date",
+        right_on="last_lube",
+        by="monitor_id",
+        allow_exact_matches=False,
+        direction="backward",
+    )
+    cases["lubed_before_fail"] = cases["last_lube"].notna()
+    if not include_unlubricated:
+        cases = cases[cases["lubed_before_fail"]]
+    cases["days_between"] = (cases["fail_date"] - cases["last_lube"]).dt.days
+    if not include_unlubricated:
+        cases["days_between"] = cases["days_between"].astype("int64")
+
+    if attributes:
+        first = events.drop_duplicates("monitor_id").set_index("monitor_id")[list(attributes)]
+        cases = cases.join(first, on="monitor_id")
+    return cases.sort_values(["monitor_id", "fail_date"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,169 @@
+"""Persisted severity classifiers for the Q14 page.
+
+Two kinds of model are trained per filter scope: all records, each
+industry, and each machine type. Both predict ``bearing_severity_class``
+and use the same 80/20 split, so they are evaluated on the same held-out
+rows. The ``"forest"`` model is the page's original random forest on
+machine type and average RPM. The ``"boosting"`` model is gradient
+boosting on the wide feature set of :mod:`bearing_analysis.features`.
+
+Each model is saved with joblib together with its label encoders and its
+held-out rows, under ``data/.cache/models/<dataset hash>-v<version>/``. A
+changed workbook therefore gets freshly trained models, and older model
+directories are removed.
+
+The registry loads models lazily and keeps them for the life of the
+process. :meth:`ModelRegistry.warm` loads (or trains, the first time)
+every scope up front, so the page itself only predicts and evaluates.
+"""
+
+import hashlib
+import shutil
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+from bearing_analysis.dataset import CACHE_DIR, SEVERITY_COLUMN, _write_atomic, dataset_hash, shared_resource
+from bearing_analysis.features import MIN_CLASS_ROWS, feature_frame, make_boosting_pipeline
+
+# Bump whenever features, estimators or split change.
+MODEL_VERSION = 2
+MODEL_DIR = CACHE_DIR / "models"
+MODEL_KINDS = {
+    "forest": "Random forest (machine type + RPM)",
+    "boosting": "Gradient boosting (all features)",
+}
+FEATURES = ["machine_type", "rpm_avg"]
+SCOPE_COLUMNS = ["industry_type", "machine_type"]
+GLOBAL = (None, None)
+# Smaller scopes fall back to a broader model
+MIN_ROWS = 20
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def training_frame(df):
+    """Records usable for training and evaluation."""
+    return df.dropna(subset=[SEVERITY_COLUMN, *FEATURES])
+
+
+class SeverityModel:
+    """A fitted classifier with its encoders and the rows it was not trained on."""
+
+    # Registry models never change once trained
+    revision = 0
+
+    def __init__(self, scope, model, machine_encoder, severity_encoder, test_rows, kind="forest"):
+        self.scope = scope
+        self.kind = kind
+        self.model = model
+        self.machine_encoder = machine_encoder
+        self.severity_encoder = severity_encoder
+        self.test_rows = test_rows
+
+    @classmethod
+    def train(cls, df, scope=GLOBAL, kind="forest"):
+        """Fit on ``df`` (already restricted to ``scope``), holding out ``TEST_SIZE`` of it."""
+        machine_encoder = LabelEncoder().fit(df["machine_type"].astype(str))
+        severity_encoder = LabelEncoder().fit(df[SEVERITY_COLUMN])
+        X = cls._encode(df, machine_encoder) if kind == "forest" else feature_frame(df)
+        y = severity_encoder.transform(df[SEVERITY_COLUMN])
+        X_train, X_test, y_train, _ = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+        if kind == "forest":
+            model = RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=-1)
+        else:
+            smallest_class = np.bincount(y_train)[np.unique(y_train)].min()
+            model = make_boosting_pipeline(RANDOM_STATE, early_stopping=smallest_class >= MIN_CLASS_ROWS)
+        model.fit(X_train, y_train)
+        return cls(scope, model, machine_encoder, severity_encoder, X_test.index.to_numpy(), kind)
+
+    @staticmethod
+    def _encode(df, machine_encoder):
+        return pd.DataFrame({
+            "machine_type": machine_encoder.transform(df["machine_type"].astype(str)),
+            "rpm_avg": df["rpm_avg"].to_numpy(),
+        }, index=df.index)
+
+    @property
+    def classes(self):
+        return self.severity_encoder.classes_
+
+    def predict(self, df):
+        """Predicted severity class for each row of ``df``."""
+        features = self._encode(df, self.machine_encoder) if self.kind == "forest" else feature_frame(df)
+        return self.severity_encoder.inverse_transform(self.model.predict(features))
+
+
+def _model_file(kind, scope):
+    col, value = scope
+    if col is None:
+        return f"{kind}-global.joblib"
+    return f"{kind}-{col}-{hashlib.sha256(str(value).encode()).hexdigest()[:16]}.joblib"
+
+
+class ModelRegistry:
+    """Severity models for every scope of one dataset version, persisted under ``directory``."""
+
+    def __init__(self, df, directory):
+        self.df = training_frame(df)
+        self.directory = directory
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def scopes(self):
+        """The global scope, then every industry and machine type with at least ``MIN_ROWS`` records."""
+        scopes = [GLOBAL]
+        for col in SCOPE_COLUMNS:
+            counts = self.df[col].value_counts()
+            scopes += [(col, value) for value in sorted(counts.index[counts >= MIN_ROWS], key=str)]
+        return scopes
+
+    def _rows(self, scope):
+        col, value = scope
+        return self.df if col is None else self.df[self.df[col] == value]
+
+    def model(self, scope=GLOBAL, kind="forest"):
+        """The ``kind`` model for ``scope``, loaded from disk or trained and saved on first use; ``None`` if too small."""
+        key = (kind, scope)
+        with self._lock:
+            if key not in self._models:
+                path = self.directory / _model_file(kind, scope)
+                if path.exists():
+                    self._models[key] = joblib.load(path)
+                elif scope != GLOBAL and len(self._rows(scope)) < MIN_ROWS:
+                    self._models[key] = None
+                else:
+                    model = SeverityModel.train(self._rows(scope), scope, kind)
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    _write_atomic(path, lambda tmp: joblib.dump(model, tmp))
+                    self._models[key] = model
+            return self._models[key]
+
+    def best(self, filters, kind="forest"):
+        """The narrowest trained ``kind`` model covering ``filters`` (``column -> value`` or ``"All"``)."""
+        for col in reversed(SCOPE_COLUMNS):
+            value = filters.get(col, "All")
+            if value != "All" and (model := self.model((col, value), kind)) is not None:
+                return model
+        return self.model(GLOBAL, kind)
+
+    def warm(self):
+        """Load or train every kind and scope, and drop models saved for other dataset versions."""
+        for kind in MODEL_KINDS:
+            for scope in self.scopes():
+                self.model(scope, kind)
+        for stale in MODEL_DIR.glob("*"):
+            if stale.is_dir() and stale != self.directory:
+                shutil.rmtree(stale, ignore_errors=True)
+        return self
+
+
+def get_model_registry():
+    """Process-wide model registry for the current dataset version."""
+    directory = MODEL_DIR / f"{dataset_hash()[:16]}-v{MODEL_VERSION}"
+    return shared_resource("severity_models", lambda df: ModelRegistry(df, directory))
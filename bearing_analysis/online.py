@@ -0,0 +1,225 @@
+"""Incrementally trained severity classifier.
+
+A logistic-regression ``SGDClassifier`` over hashed features, updated with
+``partial_fit`` from batches of new fault records instead of being retrained
+from scratch. Each categorical value becomes a ``column=value`` token. It is
+hashed with the same signed MurmurHash3 trick as
+``sklearn.feature_extraction.FeatureHasher``, so industries, machines or
+bearing types never seen before need no refit of any encoder. The hash is
+computed once per distinct value, not once per row. RPM and asset age enter
+as fixed-scale numeric features.
+
+Faults are identified by (monitor, fault timestamp). The checkpoint records
+which faults the model has learned from, so replaying a batch is a no-op.
+About one fault in ``HOLDOUT`` is never trained on and forms the evaluation
+set. Membership is decided by the fault's hash, so it stays the same as the
+dataset grows.
+
+The state is checkpointed with joblib under ``data/.cache/online/``. When
+the workbook gains rows, :func:`get_online_model` trains on just the new
+faults. Batches from elsewhere can be applied with::
+
+    python -m bearing_analysis.online new_faults.parquet
+"""
+
+import argparse
+import sys
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import murmurhash3_32
+
+from bearing_analysis.dataset import CACHE_DIR, SEVERITY_COLUMN, _write_atomic, apply_schema, shared_resource
+from bearing_analysis.features import CATEGORICAL_FEATURES
+from bearing_analysis.models import GLOBAL, RANDOM_STATE, training_frame
+
+CHECKPOINT_PATH = CACHE_DIR / "online" / "severity_sgd.joblib"
+# Bump whenever the hashed features or the estimator change.
+CHECKPOINT_VERSION = 1
+SEVERITY_CLASSES = np.array([0, 1, 2, 3])
+N_FEATURES = 2 ** 18
+HOLDOUT = 5
+CHUNK_SIZE = 10_000
+INITIAL_EPOCHS = 20
+# log1p-scaled so typical values land in [0, 1]
+NUMERIC_SCALES = {"rpm_avg": np.log1p(10_000), "operational_days": np.log1p(3_650)}
+
+
+def _hash(token):
+    """Column index and sign of ``token``, as ``FeatureHasher(alternate_sign=True)`` computes them."""
+    h = murmurhash3_32(token, seed=0)
+    return abs(h) % N_FEATURES, 1.0 if h >= 0 else -1.0
+
+
+def hashed_features(df):
+    """Sparse ``(len(df), N_FEATURES)`` matrix of hashed categorical tokens and scaled numeric features."""
+    rows, cols, values = [], [], []
+    positions = np.arange(len(df))
+    for col in [*CATEGORICAL_FEATURES, "fault_month"]:
+        if col == "fault_month":
+            categorical = pd.Categorical(df["timestamp_of_fault"].dt.month)
+        else:
+            categorical = pd.Categorical(df[col])
+        hashed = [_hash(f"{col}={value}") for value in categorical.categories]
+        index = np.array([h[0] for h in hashed], dtype=np.int64)
+        sign = np.array([h[1] for h in hashed])
+        codes = categorical.codes
+        known = codes >= 0
+        rows.append(positions[known])
+        cols.append(index[codes[known]])
+        values.append(sign[codes[known]])
+    for col, scale in NUMERIC_SCALES.items():
+        numeric = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+        known = ~np.isnan(numeric)
+        index, sign = _hash(col)
+        rows.append(positions[known])
+        cols.append(np.full(known.sum(), index))
+        values.append(sign * np.log1p(np.clip(numeric[known], 0, None)) / scale)
+    return sp.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(df), N_FEATURES),
+    )
+
+
+def fault_keys(df):
+    """Stable 64-bit identity of each fault record."""
+    identity = pd.DataFrame({
+        "monitor_id": df["monitor_id"].astype(np.int64),
+        # Same unit whatever the source, so a fault read back from Parquet or CSV hashes alike
+        "timestamp_of_fault": df["timestamp_of_fault"].astype("datetime64[ns]"),
+    })
+    return pd.util.hash_pandas_object(identity, index=False).to_numpy()
+
+
+def is_held_out(keys):
+    return keys % HOLDOUT == 0
+
+
+class OnlineSeverityModel:
+    """SGD severity classifier with the evaluation interface of :class:`~bearing_analysis.models.SeverityModel`."""
+
+    kind = "online"
+    scope = GLOBAL
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        # Averaged SGD keeps the weights steady from one small batch to the next
+        self.estimator = SGDClassifier(loss="log_loss", alpha=1e-5, average=True, random_state=RANDOM_STATE)
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.revision = 0
+        self.severity_encoder = LabelEncoder().fit(SEVERITY_CLASSES)
+        self.test_rows = np.empty(0, dtype=np.int64)
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @property
+    def classes(self):
+        return self.severity_encoder.classes_
+
+    @classmethod
+    def load(cls, path=CHECKPOINT_PATH):
+        """The checkpointed model at ``path``, or an untrained one if there is none (or it is outdated)."""
+        model = cls(path)
+        model._restore()
+        return model
+
+    def _restore(self):
+        try:
+            state = joblib.load(self.path)
+            mtime = self.path.stat().st_mtime_ns
+        except (OSError, EOFError):
+            return
+        if state.get("version") == CHECKPOINT_VERSION:
+            self.estimator, self.seen, self.revision = state["estimator"], state["seen"], state["revision"]
+            self._mtime = mtime
+
+    def refresh(self):
+        """Pick up a checkpoint written by another process since this one was loaded."""
+        with self._lock:
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except OSError:
+                return self
+            if mtime != self._mtime:
+                self._restore()
+        return self
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        state = {"version": CHECKPOINT_VERSION, "estimator": self.estimator, "seen": self.seen, "revision": self.revision}
+        _write_atomic(self.path, lambda tmp: joblib.dump(state, tmp))
+        self._mtime = self.path.stat().st_mtime_ns
+
+    def update(self, df, epochs=1):
+        """``partial_fit`` on the faults in ``df`` not yet learned from and not held out; returns how many."""
+        df = training_frame(df)
+        unknown = ~df[SEVERITY_COLUMN].isin(SEVERITY_CLASSES)
+        if unknown.any():
+            raise ValueError(f"Unknown severity classes: {sorted(df.loc[unknown, SEVERITY_COLUMN].unique())}")
+        keys = fault_keys(df)
+        new = ~np.isin(keys, self.seen) & ~is_held_out(keys)
+        if not new.any():
+            return 0
+        rows = df[new]
+        X = hashed_features(rows)
+        y = rows[SEVERITY_COLUMN].to_numpy()
+        order = np.random.default_rng(self.revision).permutation(len(rows))
+        with self._lock:
+            for _ in range(epochs):
+                for start in range(0, len(rows), CHUNK_SIZE):
+                    chunk = order[start:start + CHUNK_SIZE]
+                    self.estimator.partial_fit(X[chunk], y[chunk], classes=SEVERITY_CLASSES)
+            self.seen = np.union1d(self.seen, keys[new])
+            self.revision += 1
+        return int(new.sum())
+
+    def predict(self, df):
+        """Predicted severity class for each row of ``df``."""
+        return self.estimator.predict(hashed_features(df))
+
+
+def _sync(df):
+    # Learn from whatever the current dataset has that the checkpoint has not seen
+    registry_df = training_frame(df)
+    model = OnlineSeverityModel.load()
+    if model.update(registry_df, epochs=1 if model.revision else INITIAL_EPOCHS):
+        model.save()
+    model.test_rows = registry_df.index[is_held_out(fault_keys(registry_df))].to_numpy()
+    return model
+
+
+def get_online_model():
+    """Process-wide online model, caught up with the current dataset and the latest checkpoint."""
+    return shared_resource("online_severity_model", _sync).refresh()
+
+
+def read_batch(path):
+    """A batch of fault records (Parquet or CSV with the workbook's columns) in the ingest schema."""
+    if str(path).endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, parse_dates=["subscription_start", "subscription_end", "timestamp_of_fault"])
+    return apply_schema(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the online severity model from new fault records.")
+    parser.add_argument("batches", nargs="+", help="Parquet or CSV files of fault records")
+    args = parser.parse_args(argv)
+
+    # Catch up with the dataset first, so its faults are not mistaken for new ones later
+    model = get_online_model()
+    for path in args.batches:
+        learned = model.update(read_batch(path))
+        print(f"{path}: learned from {learned:,} new fault records", file=sys.stderr)
+    model.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Range index for slider filters on continuous columns.
+
+Rows are partitioned into cells, one per observed combination of the
+partition columns (e.g. machine type x bearing make). Within each cell they
+are sorted on the range column ``x``. As in :mod:`bearing_analysis.thresholds`,
+a row is stored under the composite key ``cell * span + (x - low)``, so one
+vectorised ``searchsorted`` turns an ``x`` range into a contiguous slice per
+cell.
+
+An optional second column ``y`` is kept in the same order with running sums
+of ``y`` and ``y**2``. They restart in every cell and are taken after
+shifting ``y`` by the cell's mean, so they stay small and a slice's squared
+deviations are not the difference of two large totals. With a 1-D (``x``)
+filter, per-group count, mean and standard deviation of ``y`` cost
+O(cells * log n). A 2-D (``x`` and ``y``)
+filter only looks at the rows inside the ``x`` slices. Neither ever scans the
+full frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class RangeIndex:
+    def __init__(self, cells, order, keys, x, y, offsets, low, span):
+        self.cells = cells
+        self.order = order
+        self.keys = keys
+        self.x = x
+        self.y = y
+        self.offsets = offsets
+        self.low = low
+        self.span = span
+        self._codes = {col: cells[col].cat.codes.to_numpy() for col in cells.columns}
+        self._positions = {
+            col: {value: i for i, value in enumerate(cells[col].cat.categories)} for col in cells.columns
+        }
+        if y is not None:
+            sizes = np.diff(offsets)
+            owner = np.repeat(np.arange(len(sizes)), sizes)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._y_shift = np.where(sizes > 0, np.bincount(owner, weights=y, minlength=len(sizes)) / sizes, 0.0)
+            shifted = pd.Series(y - self._y_shift[owner])
+            running = shifted.groupby(owner).cumsum().to_numpy()
+            running_sq = (shifted * shifted).groupby(owner).cumsum().to_numpy()
+            self._y_sum = np.concatenate([[0.0], running])
+            self._y_sumsq = np.concatenate([[0.0], running_sq])
+
+    @classmethod
+    def from_frame(cls, df, x, y=None, partition=()):
+        """Index ``df[x]`` (and ``df[y]``) per combination of ``partition``; rows with missing values are skipped."""
+        partition = list(partition)
+        known = df[x].notna().to_numpy()
+        if y is not None:
+            known = known & df[y].notna().to_numpy()
+        if partition:
+            grouped = df[partition].groupby(partition, observed=True)
+            cell_ids = grouped.ngroup().to_numpy()
+            cells = grouped.size().index.to_frame(index=False).astype("category")
+            known = known & (cell_ids >= 0)
+        else:
+            cell_ids = np.zeros(len(df), dtype=np.int64)
+            cells = pd.DataFrame(index=range(1))
+
+        rows = np.flatnonzero(known)
+        values = df[x].to_numpy(dtype=np.float64)[rows]
+        cell_ids = cell_ids[rows]
+        low = values.min() if len(values) else 0.0
+        span = (values.max() - low if len(values) else 0.0) + 1.0
+        keys = cell_ids * span + (values - low)
+        sort = np.argsort(keys, kind="stable")
+        offsets = np.append(0, np.cumsum(np.bincount(cell_ids, minlength=len(cells))))
+        return cls(
+            cells=cells,
+            order=rows[sort],
+            keys=keys[sort],
+            x=values[sort],
+            y=None if y is None else df[y].to_numpy(dtype=np.float64)[rows][sort],
+            offsets=offsets,
+            low=low,
+            span=span,
+        )
+
+    def __len__(self):
+        return len(self.order)
+
+    def x_bounds(self):
+        return (float(self.x.min()), float(self.x.max())) if len(self.x) else (0.0, 0.0)
+
+    def y_bounds(self):
+        return (float(self.y.min()), float(self.y.max())) if len(self.y) else (0.0, 0.0)
+
+    def _cell_ids(self, where):
+        mask = np.ones(len(self.cells), dtype=bool)
+        for col, value in (where or {}).items():
+            if not isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+                value = [value]
+            positions = self._positions[col]
+            mask &= np.isin(self._codes[col], [positions[v] for v in value if v in positions])
+        return np.flatnonzero(mask)
+
+    def _spans(self, x_range, cell_ids):
+        lo, hi = np.clip(np.asarray(x_range, dtype=np.float64) - self.low, -0.5, self.span - 0.5)
+        base = cell_ids * self.span
+        starts = np.searchsorted(self.keys, base + lo, side="left")
+        stops = np.searchsorted(self.keys, base + hi, side="right")
+        return starts, np.maximum(stops, starts)
+
+    @staticmethod
+    def _gather(starts, stops):
+        lengths = stops - starts
+        ends = np.cumsum(lengths)
+        return np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - (ends - lengths), lengths)
+
+    def _window(self, running, starts, stops, cell_starts):
+        # Running sums restart at each cell, so a slice starting there has nothing to subtract
+        before = np.where(starts > cell_starts, running[starts], 0.0)
+        return np.where(stops > starts, running[stops] - before, 0.0)
+
+    def rows(self, x_range, y_range=None, where=None):
+        """Positions (ascending) of rows with ``x`` (and ``y``) inside the inclusive ranges."""
+        starts, stops = self._spans(x_range, self._cell_ids(where))
+        sorted_positions = self._gather(starts, stops)
+        if y_range is not None:
+            y = self.y[sorted_positions]
+            sorted_positions = sorted_positions[(y >= y_range[0]) & (y <= y_range[1])]
+        return np.sort(self.order[sorted_positions])
+
+    def summary(self, by, x_range, y_range=None, where=None):
+        """Count, mean and sample std of ``y`` per group of ``by`` (partition columns) within the ranges."""
+        by = [by] if isinstance(by, str) else list(by)
+        cell_ids = self._cell_ids(where)
+        starts, stops = self._spans(x_range, cell_ids)
+        # Count, mean and sum of squared deviations (m2) of each cell's slice
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if y_range is None:
+                count = stops - starts
+                cell_starts = self.offsets[cell_ids]
+                shifted = self._window(self._y_sum, starts, stops, cell_starts)
+                shifted_sq = self._window(self._y_sumsq, starts, stops, cell_starts)
+                mean = self._y_shift[cell_ids] + shifted / count
+                m2 = shifted_sq - shifted * shifted / count
+            else:
+                sorted_positions = self._gather(starts, stops)
+                owner = np.repeat(np.arange(len(cell_ids)), stops - starts)
+                y = self.y[sorted_positions]
+                inside = (y >= y_range[0]) & (y <= y_range[1])
+                owner, y = owner[inside], y[inside]
+                count = np.bincount(owner, minlength=len(cell_ids))
+                mean = np.bincount(owner, weights=y, minlength=len(cell_ids)) / count
+                m2 = np.bincount(owner, weights=(y - mean[owner]) ** 2, minlength=len(cell_ids))
+        mean = np.where(count > 0, mean, 0.0)
+        m2 = np.where(count > 0, m2, 0.0)
+
+        # Roll cells up to groups of ``by`` on their category codes. Chan et al.: a
+        # group's m2 is its cells' m2 plus each cell's count times its squared
+        # offset from the group mean.
+        codes = np.column_stack([self._codes[col][cell_ids] for col in by])
+        keys, group_ids = np.unique(codes, axis=0, return_inverse=True)
+        group_ids = group_ids.reshape(-1)
+        n = np.bincount(group_ids, weights=count, minlength=len(keys))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            group_mean = np.bincount(group_ids, weights=count * mean, minlength=len(keys)) / n
+            spread = count * (mean - group_mean[group_ids]) ** 2
+            m2 = np.bincount(group_ids, weights=m2 + spread, minlength=len(keys))
+            var = np.where(n > 1, m2 / (n - 1), np.nan)
+        mean = group_mean
+        out = pd.DataFrame({
+            **{col: pd.Categorical.from_codes(keys[:, i], dtype=self.cells[col].dtype) for i, col in enumerate(by)},
+            "count": n.astype(np.int64),
+            "mean": mean,
+            "std": np.sqrt(np.clip(var, 0, None)),
+        })
+        return out[out["count"] > 0].reset_index(drop=True)
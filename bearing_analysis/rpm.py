@@ -0,0 +1,102 @@
+"""Named RPM bucketing schemes, computed once at ingest.
+
+Each scheme bins one RPM column into ordered categories. The buckets are
+computed with a single ``np.searchsorted`` over the whole column and stored in
+the dataset as ``rpm_<scheme name>`` categorical columns, so pages reuse them
+instead of applying their own per-row bucketing function.
+
+Bins are described like :func:`pandas.cut`: ``edges`` holds every bin boundary,
+outer ones included (use ``±inf`` for open ends). By default a bin contains its
+lower edge, ``[a, b)``; ``right`` lists the edges whose own value falls in the
+bin below instead. Values outside the edges, or missing, get the ``unknown``
+label (``None`` leaves them missing).
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+INF = float("inf")
+
+
+@dataclass(frozen=True)
+class BucketScheme:
+    name: str
+    source: str
+    edges: tuple
+    labels: tuple
+    right: tuple = ()
+    unknown: str = "Unknown"
+
+    @property
+    def column(self):
+        return f"rpm_{self.name}"
+
+    @property
+    def categories(self):
+        return list(self.labels) + ([self.unknown] if self.unknown is not None else [])
+
+
+SCHEMES = {
+    scheme.name: scheme
+    for scheme in (
+        # Q1-Q3: four bands on the minimum RPM.
+        BucketScheme(
+            "fine_4", "rpm_min",
+            edges=(-INF, 200, 900, 1500, INF),
+            labels=("(0-200)", "(200-900)", "(900-1500)", "(1500+)"),
+        ),
+        # Q9, Q10: low / medium / high on the minimum RPM.
+        BucketScheme(
+            "low_med_high_500", "rpm_min",
+            edges=(-INF, 500, 1500, INF),
+            labels=("Low", "Medium", "High"),
+        ),
+        # Q4, Q11: low (<1000) / medium (1000-3000) / high (>3000) on the average RPM.
+        BucketScheme(
+            "low_med_high_1000", "rpm_avg",
+            edges=(-INF, 1000, 3000, INF),
+            labels=("Low", "Medium", "High"),
+            right=(3000,),
+        ),
+        # Q19: right-closed bands on the maximum RPM; anything outside (0, 10000] is left out.
+        BucketScheme(
+            "very_high_10000", "rpm_max",
+            edges=(0, 1000, 3000, 6000, 10000),
+            labels=("Low", "Medium", "High", "Very High"),
+            right=(0, 1000, 3000, 6000, 10000),
+            unknown=None,
+        ),
+    )
+}
+
+
+def bucket_codes(values, scheme):
+    """Integer bucket codes for ``values``; -1 marks values outside every bin."""
+    values = np.asarray(values, dtype="float64")
+    edges = np.asarray(scheme.edges, dtype="float64")
+    # Number of edges <= value, less one for a right-closed edge hit exactly.
+    codes = np.searchsorted(edges, values, side="right") - 1
+    if scheme.right:
+        codes -= np.isin(values, scheme.right)
+    codes[(codes < 0) | (codes >= len(scheme.labels)) | np.isnan(values)] = -1
+    return codes
+
+
+def bucketize(values, scheme):
+    """Bucket ``values`` into an ordered categorical using ``scheme`` (name or object)."""
+    if isinstance(scheme, str):
+        scheme = SCHEMES[scheme]
+    codes = bucket_codes(values, scheme)
+    if scheme.unknown is not None:
+        codes[codes < 0] = len(scheme.labels)
+    return pd.Categorical.from_codes(codes, categories=scheme.categories, ordered=True)
+
+
+def add_rpm_columns(df):
+    """Add ``rpm_avg`` and one ``rpm_<scheme>`` column per scheme to ``df``."""
+    df["rpm_avg"] = (df["rpm_min"] + df["rpm_max"]) / 2
+    for scheme in SCHEMES.values():
+        df[scheme.column] = bucketize(df[scheme.source], scheme)
+    return df
@@ -0,0 +1,213 @@
+"""Batch severity scoring for fleets of monitors.
+
+Reads a Parquet or CSV file of monitors (``machine_type``, ``rpm_min``,
+``rpm_max`` plus any passthrough columns) in chunks. Each chunk comes back
+with one probability column per severity class and the most likely class,
+so files far larger than memory stream straight through.
+
+The classifier only sees two features: the encoded machine type and the
+average RPM. A fleet repeats the same (machine, RPM) pairs many times, so
+each chunk is factorised to its distinct pairs. The forest predicts those
+once, in parallel across cores, and the probabilities are gathered back
+to rows. Monitors with an unknown machine type or a missing RPM get
+missing probabilities.
+
+Usage::
+
+    python -m bearing_analysis.scoring monitors.parquet scores.parquet
+    python -m bearing_analysis.scoring monitors.csv scores.csv --machine-type "Pump - Centrifugal"
+    python -m bearing_analysis.scoring --benchmark 10000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from bearing_analysis.models import get_model_registry
+
+INPUT_COLUMNS = ["machine_type", "rpm_min", "rpm_max"]
+DEFAULT_CHUNK_SIZE = 1_000_000
+PREDICTED = "predicted_severity"
+
+
+def probability_columns(model):
+    return [f"p_severity_{cls}" for cls in model.classes]
+
+
+def _machine_codes(values, classes):
+    """Encoder codes of ``values``; -1 where the machine type is missing or unknown to the model."""
+    classes = pd.Index(classes)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Look up each category once rather than every row
+        lookup = np.append(classes.get_indexer(values.cat.categories.astype(str)), -1)
+        return lookup[values.cat.codes.to_numpy()]
+    return np.where(values.notna().to_numpy(), classes.get_indexer(values.astype(str)), -1)
+
+
+def score_frame(frame, model):
+    """``frame`` with a probability column per severity class and the predicted class appended."""
+    codes = _machine_codes(frame["machine_type"], model.machine_encoder.classes_)
+    rpm_avg = (pd.to_numeric(frame["rpm_min"], errors="coerce").to_numpy(dtype=np.float64)
+               + pd.to_numeric(frame["rpm_max"], errors="coerce").to_numpy(dtype=np.float64)) / 2
+    known = (codes >= 0) & ~np.isnan(rpm_avg)
+
+    # Predict each distinct (machine, RPM) pair once
+    rpm_ids, rpm_values = pd.factorize(rpm_avg[known])
+    pair_ids, pairs = pd.factorize(codes[known].astype(np.int64) * max(len(rpm_values), 1) + rpm_ids)
+    features = pd.DataFrame({
+        "machine_type": pairs // max(len(rpm_values), 1),
+        "rpm_avg": rpm_values[pairs % max(len(rpm_values), 1)] if len(pairs) else np.empty(0),
+    })
+    columns = probability_columns(model)
+    probabilities = np.full((len(frame), len(columns)), np.nan)
+    if len(pairs):
+        # The forest only knows the classes present in its training split
+        probabilities[np.ix_(known, model.model.classes_)] = model.model.predict_proba(features)[pair_ids]
+
+    scored = frame.copy()
+    scored[columns] = probabilities
+    best = np.argmax(np.nan_to_num(probabilities, nan=-1.0), axis=1)
+    scored[PREDICTED] = pd.array(np.where(known, model.classes[best], pd.NA), dtype="Int8")
+    return scored
+
+
+def read_batches(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``path`` (Parquet or CSV) as DataFrames of at most ``chunk_size`` rows."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def score_batches(batches, model):
+    """Score an iterable of DataFrames lazily, one chunk at a time."""
+    for frame in batches:
+        missing = [col for col in INPUT_COLUMNS if col not in frame.columns]
+        if missing:
+            raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+        yield score_frame(frame, model)
+
+
+def _output_schema(source, first, model):
+    """Arrow schema every chunk of a Parquet destination is written with.
+
+    A Parquet source declares its column types, and they are kept. A CSV
+    source declares none, so its columns are typed from the ``first`` scored
+    chunk. Integers are widened to float64 and columns empty in that chunk
+    become strings, so blanks, decimals or text in later chunks still fit.
+    """
+    outputs = {*probability_columns(model), PREDICTED}
+    inferred = pa.Schema.from_pandas(first, preserve_index=False).remove_metadata()
+    declared = pq.read_schema(source) if Path(source).suffix == ".parquet" else None
+    fields = []
+    for field in inferred:
+        if field.name in outputs:
+            pass
+        elif declared is not None:
+            if field.name in declared.names:
+                field = declared.field(field.name)
+        elif first[field.name].isna().all():
+            field = field.with_type(pa.string())
+        elif pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _to_arrow(frame, schema):
+    """``frame`` as a table of exactly ``schema``."""
+    text = [f.name for f in schema if pa.types.is_string(f.type) or pa.types.is_large_string(f.type)]
+    frame = frame.assign(**{col: frame[col].astype("string") for col in text})
+    try:
+        return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+        raise ValueError(f"Chunk does not match the output schema: {exc}") from exc
+
+
+def score_file(source, destination, model, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Score ``source`` into ``destination`` (Parquet or CSV, by suffix). Returns the number of rows."""
+    destination = Path(destination)
+    rows = 0
+    writer = None
+    try:
+        for scored in score_batches(read_batches(source, chunk_size), model):
+            if destination.suffix == ".parquet":
+                if writer is None:
+                    writer = pq.ParquetWriter(destination, _output_schema(source, scored, model))
+                writer.write_table(_to_arrow(scored, writer.schema))
+            else:
+                scored.to_csv(destination, mode="a" if rows else "w", header=not rows, index=False)
+            rows += len(scored)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def synthetic_fleet(n_rows, model, seed=0, distinct=True):
+    """``n_rows`` monitors with known machine types and RPM ranges drawn from the dataset's.
+
+    With ``distinct``, each monitor's RPM range is scaled by its own random
+    factor within +/-5%, so nearly every row is a different (machine, RPM)
+    pair. Without it, rows repeat the dataset's few hundred pairs and
+    scoring mostly measures the deduplication.
+    """
+    rng = np.random.default_rng(seed)
+    source = get_model_registry().df
+    sample = rng.integers(0, len(source), n_rows)
+    # One factor per monitor keeps rpm_min <= rpm_max
+    jitter = rng.uniform(0.95, 1.05, n_rows) if distinct else 1.0
+    return pd.DataFrame({
+        "monitor_id": np.arange(n_rows),
+        "machine_type": pd.Categorical(source["machine_type"].astype(str).to_numpy()[sample],
+                                       categories=model.machine_encoder.classes_),
+        "rpm_min": source["rpm_min"].to_numpy(dtype=np.float64)[sample] * jitter,
+        "rpm_max": source["rpm_max"].to_numpy(dtype=np.float64)[sample] * jitter,
+    })
+
+
+def benchmark(n_rows, model, chunk_size=DEFAULT_CHUNK_SIZE, distinct=True):
+    """Rows per second scoring ``n_rows`` synthetic monitors in memory."""
+    fleet = synthetic_fleet(n_rows, model, distinct=distinct)
+    chunks = (fleet.iloc[start:start + chunk_size] for start in range(0, n_rows, chunk_size))
+    start = time.perf_counter()
+    for _ in score_batches(chunks, model):
+        pass
+    return n_rows / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score monitors with the Q14 severity classifier.")
+    parser.add_argument("source", nargs="?", help="Parquet or CSV with machine_type, rpm_min and rpm_max")
+    parser.add_argument("destination", nargs="?", help="Parquet or CSV to write scores to")
+    parser.add_argument("--industry-type", default="All", help="use the model trained for this industry")
+    parser.add_argument("--machine-type", default="All", help="use the model trained for this machine type")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--benchmark", type=int, metavar="ROWS",
+                        help="score ROWS synthetic monitors, with distinct and with repeated RPMs, and report rows/sec")
+    args = parser.parse_args(argv)
+
+    registry = get_model_registry()
+    model = registry.best({"industry_type": args.industry_type, "machine_type": args.machine_type})
+    if args.benchmark:
+        for distinct, label in ((True, "distinct RPM ranges"), (False, "RPM ranges repeated from the dataset")):
+            rate = benchmark(args.benchmark, model, args.chunk_size, distinct)
+            print(f"Scored {args.benchmark:,} rows ({label}) at {rate:,.0f} rows/sec")
+        return 0
+    if not (args.source and args.destination):
+        parser.error("source and destination are required unless --benchmark is given")
+    rows = score_file(args.source, args.destination, model, args.chunk_size)
+    print(f"Scored {rows:,} rows into {args.destination}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
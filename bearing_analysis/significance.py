@@ -0,0 +1,170 @@
+"""Batched significance tests for a two-way split inside every operating-condition cell.
+
+A cell is one industry x machine type x RPM bucket combination. Within
+each cell, the records are split by a flag such as "lubrication missing".
+Two tests are available:
+
+* :func:`independence_tests` asks whether the flag is associated with an
+  outcome class (severity). It uses the chi-square test, plus a
+  permutation p-value that stays valid for the many small cells where the
+  chi-square approximation does not hold.
+* :func:`mean_difference_tests` asks whether flagged and unflagged
+  records differ in a numeric value (time to failure), by permutation.
+
+All cells are tested together. The records are sorted by cell once, and
+every contingency table comes from one ``bincount`` over composite
+``(cell, flag, outcome)`` keys. Each permutation shuffles the flag within
+every cell at once: one ``argsort`` of ``cell + uniform noise`` per row of
+a ``(permutations, records)`` matrix. That keeps each cell's margins fixed
+and needs no loop over cells. The p-values are then corrected across cells
+with the Benjamini-Hochberg false discovery rate.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+
+CELL_COLUMNS = ["industry_type", "machine_type", "rpm_fine_4"]
+DEFAULT_PERMUTATIONS = 2_000
+FDR = 0.05
+# Upper bound on permutation-matrix cells handled at once
+MAX_CELLS = 20_000_000
+
+
+def benjamini_hochberg(p_values):
+    """Benjamini-Hochberg adjusted p-values (q-values); missing p-values stay missing and are not counted."""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    q = np.full(p_values.shape, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    if len(tested):
+        order = tested[np.argsort(p_values[tested])]
+        ranked = p_values[order] * len(tested) / np.arange(1, len(tested) + 1)
+        q[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q
+
+
+def _cells(df, by):
+    """Cell id per row (-1 where a cell column is missing) and the cells' key columns."""
+    grouped = df.groupby(by, observed=True, sort=True)
+    return grouped.ngroup().to_numpy(), grouped.size().index.to_frame(index=False)
+
+
+def _permuted_flags(cell_ids, flags, n_permutations, rng):
+    """Yield ``(chunk, records)`` matrices of ``flags`` shuffled within each cell; ``cell_ids`` must be sorted."""
+    per_chunk = max(1, MAX_CELLS // max(len(flags), 1))
+    for start in range(0, n_permutations, per_chunk):
+        size = min(per_chunk, n_permutations - start)
+        # Noise in [0, 1) reorders rows only within their integer cell id
+        order = np.argsort(cell_ids + rng.random((size, len(flags))), axis=1)
+        yield flags[order]
+
+
+def _chi_square(counts):
+    """Chi-square statistic over the last two axes of ``counts`` (flag x outcome tables)."""
+    rows = counts.sum(axis=-1, keepdims=True)
+    cols = counts.sum(axis=-2, keepdims=True)
+    total = rows.sum(axis=-2, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expected = rows * cols / total
+        terms = np.where(expected > 0, (counts - expected) ** 2 / expected, 0.0)
+    return terms.sum(axis=(-2, -1))
+
+
+def _sorted_inputs(df, flag, by):
+    cell_ids, keys = _cells(df, by)
+    known = cell_ids >= 0
+    order = np.argsort(cell_ids[known], kind="stable")
+    return cell_ids[known][order], np.asarray(flag, dtype=bool)[known][order], known, order, keys
+
+
+def independence_tests(df, flag, outcome, by=CELL_COLUMNS, n_permutations=DEFAULT_PERMUTATIONS, seed=0):
+    """Test of association between ``flag`` (bool per row) and the ``outcome`` column in every ``by`` cell.
+
+    One row per cell with the record count, flagged count, chi-square
+    statistic, degrees of freedom, chi-square and permutation p-values, the
+    FDR-adjusted ``q_value`` (from the permutation p-values) and
+    ``significant``. Cells whose flag or outcome takes only one value cannot
+    be tested and have missing p-values.
+    """
+    df = df.assign(_flag=np.asarray(flag, dtype=bool)).dropna(subset=[outcome])
+    cell_ids, flags, known, order, keys = _sorted_inputs(df, df["_flag"], by)
+    outcome_codes, _ = pd.factorize(df[outcome].to_numpy()[known][order], sort=True)
+    n_cells, n_outcomes = len(keys), outcome_codes.max() + 1 if len(outcome_codes) else 1
+    width = 2 * n_outcomes
+
+    base = cell_ids * width + outcome_codes
+    counts = np.bincount(base + flags * n_outcomes, minlength=n_cells * width).reshape(n_cells, 2, n_outcomes)
+    statistic = _chi_square(counts.astype(np.float64))
+    dof = ((counts.sum(axis=2) > 0).sum(axis=1) - 1) * ((counts.sum(axis=1) > 0).sum(axis=1) - 1)
+    testable = dof > 0
+
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(n_cells)
+    for shuffled in _permuted_flags(cell_ids, flags, n_permutations, rng):
+        offsets = np.arange(len(shuffled))[:, None] * (n_cells * width)
+        permuted = np.bincount((offsets + base + shuffled * n_outcomes).ravel(), minlength=len(shuffled) * n_cells * width)
+        stats = _chi_square(permuted.reshape(len(shuffled), n_cells, 2, n_outcomes).astype(np.float64))
+        # Tolerance so ties with the observed table count as at least as extreme
+        exceed += (stats >= statistic - 1e-9).sum(axis=0)
+
+    with np.errstate(invalid="ignore"):
+        p_chi2 = np.where(testable, chi2.sf(statistic, np.maximum(dof, 1)), np.nan)
+    p_permutation = np.where(testable, (exceed + 1) / (n_permutations + 1), np.nan)
+    q_value = benjamini_hochberg(p_permutation)
+    return keys.assign(
+        records=counts.sum(axis=(1, 2)),
+        flagged=counts[:, 1].sum(axis=1),
+        chi2=np.where(testable, statistic, np.nan),
+        dof=dof.clip(0),
+        p_chi2=p_chi2,
+        p_permutation=p_permutation,
+        q_value=q_value,
+        significant=q_value < FDR,
+    )
+
+
+def mean_difference_tests(df, flag, value, by=CELL_COLUMNS, n_permutations=DEFAULT_PERMUTATIONS, seed=0):
+    """Two-sided permutation test of the difference in mean ``value`` between flagged and other rows, per cell.
+
+    One row per cell with counts and means of both sides, ``difference``
+    (flagged minus other), the permutation p-value, the FDR-adjusted
+    ``q_value`` and ``significant``. Cells missing either side have missing
+    p-values.
+    """
+    df = df.assign(_flag=np.asarray(flag, dtype=bool)).dropna(subset=[value])
+    cell_ids, flags, known, order, keys = _sorted_inputs(df, df["_flag"], by)
+    values = df[value].to_numpy(dtype=np.float64)[known][order]
+    n_cells = len(keys)
+
+    # Each cell's flagged count is fixed under permutation, so only the flagged sum varies
+    n_flagged = np.bincount(cell_ids, weights=flags, minlength=n_cells)
+    n_other = np.bincount(cell_ids, minlength=n_cells) - n_flagged
+    total = np.bincount(cell_ids, weights=values, minlength=n_cells)
+    testable = (n_flagged > 0) & (n_other > 0)
+
+    def differences(flagged_sum):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return flagged_sum / n_flagged - (total - flagged_sum) / n_other
+
+    observed = differences(np.bincount(cell_ids, weights=values * flags, minlength=n_cells))
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(n_cells)
+    for shuffled in _permuted_flags(cell_ids, flags, n_permutations, rng):
+        offsets = np.arange(len(shuffled))[:, None] * n_cells
+        sums = np.bincount((offsets + cell_ids).ravel(), weights=(values * shuffled).ravel(),
+                           minlength=len(shuffled) * n_cells).reshape(len(shuffled), n_cells)
+        exceed += (np.abs(differences(sums)) >= np.abs(observed) - 1e-9).sum(axis=0)
+
+    p_permutation = np.where(testable, (exceed + 1) / (n_permutations + 1), np.nan)
+    q_value = benjamini_hochberg(p_permutation)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return keys.assign(
+            flagged=n_flagged.astype(np.int64),
+            other=n_other.astype(np.int64),
+            mean_flagged=np.bincount(cell_ids, weights=values * flags, minlength=n_cells) / n_flagged,
+            mean_other=(total - np.bincount(cell_ids, weights=values * flags, minlength=n_cells)) / n_other,
+            difference=observed,
+            p_permutation=p_permutation,
+            q_value=q_value,
+            significant=q_value < FDR,
+        )
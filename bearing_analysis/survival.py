@@ -0,0 +1,210 @@
+"""Kaplan-Meier and Weibull survival with right-censoring, for every group at once.
+
+Each record is observed for ``duration`` days from subscription start:
+
+* until its fault, which counts as a failure (an *event*) if its severity
+  class is one of ``failure_classes``;
+* a fault of another class only shows that the bearing survived that long,
+  so the record is right-censored there;
+* records with no fault are censored at ``subscription_end``, or at
+  ``as_of`` while the subscription is still running.
+
+:func:`kaplan_meier` sorts all records once by (group, duration). It counts
+events and exits per distinct time, then takes a grouped cumulative product,
+so one pass yields the curve of every group. As in
+:mod:`bearing_analysis.thresholds`, the curves are laid out under composite
+keys (``2 * group + (1 - survival)``). A single ``searchsorted`` then gives
+every group's replacement interval at any reliability level.
+
+:func:`weibull_fit` solves the censored maximum-likelihood equation for the
+shape ``k`` of every group simultaneously by Newton's method, on
+``bincount`` sums. The scale follows in closed form, and the interval at
+reliability ``R`` is ``scale * (-ln R) ** (1 / k)``.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.dataset import SEVERITY_COLUMN
+
+NEWTON_STEPS = 50
+TOLERANCE = 1e-10
+
+
+def survival_frame(df, failure_classes=None, as_of=None):
+    """``duration`` (days) and ``event`` (failed, not censored) per record; records without a duration are dropped.
+
+    ``failure_classes`` defaults to every severity class, ``as_of`` to the
+    latest fault in ``df``.
+    """
+    start = df["subscription_start"]
+    fault = df["timestamp_of_fault"]
+    if as_of is None:
+        as_of = fault.max()
+    end = df["subscription_end"].fillna(as_of) if "subscription_end" in df.columns else pd.Series(as_of, index=df.index)
+    failed = fault.notna()
+    if failure_classes is not None:
+        failed &= df[SEVERITY_COLUMN].isin(list(failure_classes))
+    stop = fault.where(fault.notna(), end)
+    out = df.assign(duration=(stop - start).dt.days.astype("float64"), event=failed.to_numpy())
+    return out[out["duration"].notna()]
+
+
+def _group_ids(df, by):
+    if not by:
+        return np.zeros(len(df), dtype=np.int64), pd.DataFrame(index=range(1))
+    grouped = df.groupby(by, observed=True, sort=True)
+    ids = grouped.ngroup().to_numpy()
+    keys = grouped.size().index.to_frame(index=False)
+    return ids, keys
+
+
+class SurvivalCurves:
+    """Kaplan-Meier curves and Weibull fits for the groups of one frame."""
+
+    def __init__(self, keys, table, weibull):
+        self.keys = keys
+        self.table = table
+        self.weibull = weibull
+        ids = table["group"].to_numpy()
+        self._keys = 2.0 * ids + (1.0 - table["survival"].to_numpy())
+        self._ends = np.append(0, np.cumsum(np.bincount(ids, minlength=len(keys))))
+
+    def __sizeof__(self):
+        # Lets the result cache charge the curves against its byte budget
+        frames = (self.keys, self.table, self.weibull)
+        return int(sum(frame.memory_usage(deep=True).sum() for frame in frames) + self._keys.nbytes)
+
+    def curve(self, group=0):
+        """Step curve of one group: ``time``, ``at_risk``, ``events``, ``censored``, ``survival``."""
+        rows = self.table.iloc[self._ends[group]:self._ends[group + 1]]
+        return rows.drop(columns="group").reset_index(drop=True)
+
+    def intervals(self, reliability):
+        """Per group, the time by which the survival probability first drops to ``reliability``.
+
+        Kaplan-Meier gives ``km_days``, which is missing when the curve never
+        gets that low. The Weibull fit gives ``weibull_days``.
+        """
+        groups = np.arange(len(self.keys))
+        first = np.searchsorted(self._keys, 2.0 * groups + (1.0 - reliability) - 1e-12, side="left")
+        reached = first < self._ends[1:]
+        times = self.table["time"].to_numpy()
+        km = np.where(reached, times[np.minimum(first, len(times) - 1)], np.nan) if len(times) else np.full(len(groups), np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weibull = self.weibull["scale"].to_numpy() * (-np.log(reliability)) ** (1.0 / self.weibull["shape"].to_numpy())
+        return self.keys.assign(km_days=km, weibull_days=weibull)
+
+
+def kaplan_meier(durations, events, group_ids, n_groups):
+    """Long table of every group's curve: one row per (group, distinct time)."""
+    order = np.lexsort((durations, group_ids))
+    durations, events, group_ids = durations[order], events[order], group_ids[order]
+    frame = pd.DataFrame({"group": group_ids, "time": durations, "events": events.astype(np.int64)})
+    steps = frame.groupby(["group", "time"], sort=True).agg(exits=("events", "size"), events=("events", "sum")).reset_index()
+
+    group = steps["group"].to_numpy()
+    totals = np.bincount(group_ids, minlength=n_groups)
+    exits = steps["exits"].to_numpy()
+    # Everyone still in the group at a time is at risk: the total minus earlier exits
+    exited_before = np.cumsum(exits) - exits
+    first_step = np.searchsorted(group, np.arange(n_groups), side="left")
+    exited_before -= exited_before[np.minimum(first_step, len(steps) - 1)][group] if len(steps) else 0
+    at_risk = totals[group] - exited_before
+
+    factor = 1.0 - steps["events"].to_numpy() / at_risk
+    survival = pd.Series(factor).groupby(group).cumprod().to_numpy()
+    return pd.DataFrame({
+        "group": group,
+        "time": steps["time"].to_numpy(),
+        "at_risk": at_risk,
+        "events": steps["events"].to_numpy(),
+        "censored": exits - steps["events"].to_numpy(),
+        "survival": survival,
+    })
+
+
+def weibull_fit(durations, events, group_ids, n_groups):
+    """Censored maximum-likelihood Weibull ``shape`` and ``scale`` per group.
+
+    Only positive durations take part. Groups with fewer than two failures,
+    or whose failures all share one time, get missing parameters.
+    """
+    positive = durations > 0
+    t, d, g = durations[positive], events[positive].astype(np.float64), group_ids[positive]
+    log_t = np.log(t)
+    r = np.bincount(g, weights=d, minlength=n_groups)
+    mean_log_event = np.bincount(g, weights=d * log_t, minlength=n_groups) / np.maximum(r, 1)
+    event_spread = np.bincount(g, weights=d * (log_t - mean_log_event[g]) ** 2, minlength=n_groups)
+    # Rounding leaves a tiny spread where every failure time is the same
+    valid = (r >= 2) & (event_spread > 1e-9 * r)
+
+    # Scale times per group so t ** k stays finite for large k
+    log_scale = np.full(n_groups, 0.0)
+    log_scale[valid] = mean_log_event[valid]
+    x = log_t - log_scale[g]
+    shape = np.ones(n_groups)
+    for _ in range(NEWTON_STEPS):
+        w = np.exp(shape[g] * x)
+        b = np.bincount(g, weights=w, minlength=n_groups)
+        a = np.bincount(g, weights=w * x, minlength=n_groups)
+        c = np.bincount(g, weights=w * x * x, minlength=n_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = a / b - 1.0 / shape - (mean_log_event - log_scale)
+            slope = (c * b - a * a) / (b * b) + 1.0 / shape ** 2
+            step = np.where(valid, f / slope, 0.0)
+        # Halve steps that would leave the positive axis
+        shape = np.where(shape - step > 0, shape - step, shape / 2)
+        if np.all(np.abs(step[valid]) < TOLERANCE * shape[valid]):
+            break
+
+    w = np.exp(shape[g] * x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.exp(log_scale + np.log(np.bincount(g, weights=w, minlength=n_groups) / r) / shape)
+    return pd.DataFrame({
+        "shape": np.where(valid, shape, np.nan),
+        "scale": np.where(valid, scale, np.nan),
+        "failures": r.astype(np.int64),
+        "records": np.bincount(g, minlength=n_groups),
+    })
+
+
+def weibull_standard_errors(durations, events, group_ids, fit):
+    """Standard errors of ``log(shape)`` and ``log(scale)`` per group from the observed information at the fit.
+
+    Working on the log scale keeps Wald intervals ``exp(log(p) +- z * se)``
+    positive and closer to symmetric for small groups.
+    """
+    positive = durations > 0
+    t, g = durations[positive], group_ids[positive]
+    n_groups = len(fit)
+    shape, scale = fit["shape"].to_numpy(), fit["scale"].to_numpy()
+    r = fit["failures"].to_numpy(dtype=np.float64)
+    log_ratio = np.log(t) - np.log(scale[g])
+    z = np.exp(shape[g] * log_ratio)
+    z_log = np.bincount(g, weights=z * log_ratio, minlength=n_groups)
+    z_log2 = np.bincount(g, weights=z * log_ratio ** 2, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Negative Hessian of the log-likelihood in (shape, scale), using sum(z) == failures at the optimum
+        i_kk = r / shape ** 2 + z_log2
+        i_ll = shape ** 2 * r / scale ** 2
+        i_kl = -shape / scale * z_log
+        det = i_kk * i_ll - i_kl ** 2
+        return pd.DataFrame({
+            "log_shape_se": np.sqrt(i_ll / det) / shape,
+            "log_scale_se": np.sqrt(i_kk / det) / scale,
+        })
+
+
+def fit_survival(df, by=(), failure_classes=None, as_of=None):
+    """Kaplan-Meier curves and Weibull fits of every ``by`` group of ``df`` in one pass."""
+    by = [by] if isinstance(by, str) else list(by)
+    frame = survival_frame(df, failure_classes, as_of)
+    group_ids, keys = _group_ids(frame, by)
+    known = group_ids >= 0
+    durations = frame["duration"].to_numpy(dtype=np.float64)[known]
+    events = frame["event"].to_numpy(dtype=bool)[known]
+    group_ids = group_ids[known]
+    table = kaplan_meier(durations, events, group_ids, len(keys))
+    weibull = weibull_fit(durations, events, group_ids, len(keys))
+    return SurvivalCurves(keys, table, weibull)
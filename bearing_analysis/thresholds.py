@@ -0,0 +1,84 @@
+"""Sorted-value index for "how many records at or above a threshold" queries.
+
+Records are split into cells, one per (group, stratum) pair: by default
+industry x severity class. Each cell's values (``rpm_max``) are sorted and
+laid out back to back. A value is stored under the composite key
+``cell * span + (value - low)``. ``span`` exceeds the value range, so the
+keys are globally sorted, and every cell's count above a threshold comes out
+of a single vectorised ``searchsorted``. That holds for every group, every
+stratum and any number of thresholds at once. Records with a missing value
+or group are left out.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.dataset import SEVERITY_COLUMN, shared_resource
+
+
+class ThresholdIndex:
+    def __init__(self, groups, strata, keys, offsets, low, span):
+        self.groups = pd.Index(groups)
+        self.strata = pd.Index(strata)
+        self.keys = keys
+        self.offsets = offsets
+        self.low = low
+        self.span = span
+
+    @classmethod
+    def from_frame(cls, df, value="rpm_max", group="industry_type", stratum=SEVERITY_COLUMN):
+        known = df[value].notna() & df[group].notna() & df[stratum].notna()
+        values = df.loc[known, value].to_numpy(dtype=np.float64)
+        groups = pd.Categorical(df.loc[known, group]).remove_unused_categories()
+        strata = pd.Categorical(df.loc[known, stratum]).remove_unused_categories()
+
+        n_strata = len(strata.categories)
+        cells = groups.codes.astype(np.int64) * n_strata + strata.codes
+        n_cells = len(groups.categories) * n_strata
+        low = values.min() if len(values) else 0.0
+        span = (values.max() - low if len(values) else 0.0) + 1.0
+        keys = np.sort(cells * span + (values - low))
+        offsets = np.append(0, np.cumsum(np.bincount(cells, minlength=n_cells)))
+        return cls(groups.categories, strata.categories, keys, offsets, low, span)
+
+    def _cell_counts(self, thresholds):
+        """Records at or above each threshold, shaped ``(groups, strata, thresholds)``."""
+        thresholds = np.atleast_1d(np.asarray(thresholds, dtype=np.float64))
+        n_cells = len(self.offsets) - 1
+        cells = np.arange(n_cells)
+        shifted = np.clip(thresholds - self.low, 0.0, self.span - 0.5)
+        starts = np.searchsorted(self.keys, cells[:, None] * self.span + shifted[None, :], side="left")
+        counts = self.offsets[1:, None] - starts
+        return counts.reshape(len(self.groups), len(self.strata), len(thresholds))
+
+    def _strata_mask(self, strata):
+        if strata is None:
+            return np.ones(len(self.strata), dtype=bool)
+        return self.strata.isin(list(strata))
+
+    def counts(self, threshold, strata=None):
+        """Records with value >= ``threshold`` per group, over the selected ``strata`` (all by default)."""
+        cell_counts = self._cell_counts(threshold)[:, self._strata_mask(strata), 0]
+        return pd.Series(cell_counts.sum(axis=1), index=self.groups, dtype="int64")
+
+    def stratified(self, threshold):
+        """Records with value >= ``threshold`` as a groups x strata table."""
+        return pd.DataFrame(
+            self._cell_counts(threshold)[:, :, 0],
+            index=self.groups,
+            columns=self.strata,
+        )
+
+    def curve(self, thresholds, strata=None):
+        """Threshold-vs-count table: one row per threshold, one column per group."""
+        cell_counts = self._cell_counts(thresholds)[:, self._strata_mask(strata), :]
+        return pd.DataFrame(
+            cell_counts.sum(axis=1).T,
+            index=pd.Index(np.asarray(thresholds), name="threshold"),
+            columns=self.groups,
+        )
+
+
+def get_rpm_threshold_index():
+    """Process-wide ``rpm_max`` index by industry and severity class."""
+    return shared_resource("rpm_max_thresholds", ThresholdIndex.from_frame)
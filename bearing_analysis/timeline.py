@@ -0,0 +1,97 @@
+"""Per-monitor event timelines in a compact CSR layout.
+
+Rows are sorted by ``monitor_id`` then ``timestamp_of_fault`` and stored as
+flat typed arrays. ``offsets[i]:offsets[i + 1]`` is the slice of monitor
+``monitor_ids[i]``. Looking up a monitor is a binary search over the distinct
+ids, and time lookups within a monitor are binary searches over its slice.
+So "history of monitor X", "last lubrication before t" and "events in a
+window" cost O(log n) plus the size of the answer, with no groupby scan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.dataset import shared_resource
+
+
+class EventStore:
+    def __init__(self, monitor_ids, offsets, timestamps, severity, lubrication, rows):
+        self.monitor_ids = monitor_ids
+        self.offsets = offsets
+        self.timestamps = timestamps
+        self.severity = severity
+        self.lubrication = lubrication
+        self.rows = rows
+        self._last_lube = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a store from a dataset frame; ``rows`` keeps each event's position in ``df``."""
+        order = np.lexsort((df["timestamp_of_fault"].to_numpy(), df["monitor_id"].to_numpy()))
+        monitors = df["monitor_id"].to_numpy()[order]
+        monitor_ids, starts = np.unique(monitors, return_index=True)
+        offsets = np.append(starts, len(order)).astype(np.int64)
+        return cls(
+            monitor_ids=monitor_ids,
+            offsets=offsets,
+            timestamps=df["timestamp_of_fault"].to_numpy()[order],
+            severity=df["bearing_severity_class"].to_numpy()[order].astype(np.int8),
+            lubrication=pd.Categorical(df["lubrication_type"])[order],
+            rows=order.astype(np.int64),
+        )
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def span(self, monitor_id):
+        """``(start, stop)`` of a monitor's events; empty if the monitor is unknown."""
+        i = np.searchsorted(self.monitor_ids, monitor_id)
+        if i == len(self.monitor_ids) or self.monitor_ids[i] != monitor_id:
+            return 0, 0
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def _frame(self, start, stop):
+        return pd.DataFrame({
+            "timestamp_of_fault": self.timestamps[start:stop],
+            "bearing_severity_class": self.severity[start:stop],
+            "lubrication_type": self.lubrication[start:stop],
+            "row": self.rows[start:stop],
+        })
+
+    def history(self, monitor_id):
+        """All events of a monitor in time order."""
+        return self._frame(*self.span(monitor_id))
+
+    def events_in_window(self, monitor_id, start_time, end_time):
+        """Events of a monitor with ``start_time <= timestamp < end_time``."""
+        start, stop = self.span(monitor_id)
+        times = self.timestamps[start:stop]
+        lo = np.searchsorted(times, np.datetime64(pd.Timestamp(start_time)), side="left")
+        hi = np.searchsorted(times, np.datetime64(pd.Timestamp(end_time)), side="left")
+        return self._frame(start + lo, start + hi)
+
+    def _last_lube_positions(self, lube_classes):
+        # For every event, the position of the latest lubrication event at or
+        # before it on the same monitor (-1 if none), built once per class set.
+        key = frozenset(lube_classes)
+        if key not in self._last_lube:
+            positions = np.where(np.isin(self.severity, list(key)), np.arange(len(self)), -1)
+            positions = np.maximum.accumulate(positions)
+            monitor_start = np.repeat(self.offsets[:-1], np.diff(self.offsets))
+            positions[positions < monitor_start] = -1
+            self._last_lube[key] = positions
+        return self._last_lube[key]
+
+    def last_lube_before(self, monitor_id, time, lube_classes=(1,)):
+        """Timestamp of the monitor's last lubrication event strictly before ``time`` (NaT if none)."""
+        start, stop = self.span(monitor_id)
+        before = np.searchsorted(self.timestamps[start:stop], np.datetime64(pd.Timestamp(time)), side="left")
+        if before == 0:
+            return pd.NaT
+        position = self._last_lube_positions(lube_classes)[start + before - 1]
+        return pd.NaT if position < 0 else pd.Timestamp(self.timestamps[position])
+
+
+def get_event_store():
+    """The process-wide event store over the shared dataset."""
+    return shared_resource("event_store", EventStore.from_frame)
@@ -0,0 +1,149 @@
+"""Batch Weibull parameter table for every operating-condition group.
+
+One row per (bearing type, bearing make, machine type, lubrication type)
+combination. Each row holds the censored maximum-likelihood shape and
+scale, with 95% Wald bounds on the log scale; the B10 life (the day by
+which 10% are expected to fail); and the record and failure counts. The
+lifespans are the Q12/Q13/Q16 ones: days from subscription start to the
+fault, censored as in :mod:`bearing_analysis.survival`.
+
+Groups are fitted with the vectorised Newton solve of
+:func:`~bearing_analysis.survival.weibull_fit`. The job splits the groups
+into contiguous slices, one per worker process, and fits each slice in a
+single pass. The table is written to Parquet under
+``data/.cache/weibull/<dataset hash>-v<version>.parquet``, and pages load it
+through :func:`get_weibull_table` instead of refitting. Rebuild it with::
+
+    python -m bearing_analysis.weibull --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.dataset import CACHE_DIR, _write_atomic, dataset_hash, get_dataset, shared_resource
+from bearing_analysis.survival import survival_frame, weibull_fit, weibull_standard_errors
+
+CONDITION_COLUMNS = ["bearing_type_assigned_1", "bearing_make", "machine_type", "lubrication_type"]
+# Bump whenever the fit or the table's columns change.
+TABLE_VERSION = 1
+TABLE_DIR = CACHE_DIR / "weibull"
+Z_95 = 1.959963984540054
+B10_RELIABILITY = 0.9
+# Below this many records, starting worker processes costs more than the fit
+MIN_ROWS_PER_WORKER = 500_000
+
+
+def _fit_slice(durations, events, group_ids, n_groups):
+    fit = weibull_fit(durations, events, group_ids, n_groups)
+    return pd.concat([fit, weibull_standard_errors(durations, events, group_ids, fit)], axis=1)
+
+
+def _slices(group_ids, n_groups, n_slices):
+    """Row and group ranges splitting ``group_ids`` (sorted) into at most ``n_slices`` parts of similar row counts."""
+    # Cut at evenly spaced rows, moved back to the start of the group they fall in
+    cuts = np.linspace(0, len(group_ids), n_slices + 1).astype(np.int64)[:-1]
+    group_bounds = np.append(group_ids[cuts], n_groups)
+    bounds = np.searchsorted(group_ids, group_bounds)
+    return [
+        (bounds[i], bounds[i + 1], group_bounds[i], group_bounds[i + 1])
+        for i in range(n_slices)
+        if group_bounds[i] < group_bounds[i + 1]
+    ]
+
+
+def fit_conditions(df, by=CONDITION_COLUMNS, workers=None):
+    """The Weibull parameter table of every ``by`` group of ``df``.
+
+    ``workers`` defaults to one process per CPU. It is capped so that each
+    worker gets at least ``MIN_ROWS_PER_WORKER`` records.
+    """
+    frame = survival_frame(df).dropna(subset=by)
+    grouped = frame.groupby(by, observed=True, sort=True)
+    keys = grouped.size().index.to_frame(index=False)
+    group_ids = grouped.ngroup().to_numpy()
+    order = np.argsort(group_ids, kind="stable")
+    group_ids = group_ids[order]
+    durations = frame["duration"].to_numpy(dtype=np.float64)[order]
+    events = frame["event"].to_numpy(dtype=bool)[order]
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(keys), len(frame) // MIN_ROWS_PER_WORKER))
+    if workers == 1:
+        fit = _fit_slice(durations, events, group_ids, len(keys))
+    else:
+        slices = _slices(group_ids, len(keys), workers)
+        with ProcessPoolExecutor(workers) as pool:
+            parts = pool.map(
+                _fit_slice,
+                [durations[lo:hi] for lo, hi, _, _ in slices],
+                [events[lo:hi] for lo, hi, _, _ in slices],
+                [group_ids[lo:hi] - first for lo, hi, first, _ in slices],
+                [last - first for _, _, first, last in slices],
+            )
+            fit = pd.concat(list(parts), ignore_index=True)
+
+    shape, scale = fit["shape"], fit["scale"]
+    return keys.assign(
+        records=fit["records"],
+        failures=fit["failures"],
+        shape=shape,
+        shape_low=shape * np.exp(-Z_95 * fit["log_shape_se"]),
+        shape_high=shape * np.exp(Z_95 * fit["log_shape_se"]),
+        scale=scale,
+        scale_low=scale * np.exp(-Z_95 * fit["log_scale_se"]),
+        scale_high=scale * np.exp(Z_95 * fit["log_scale_se"]),
+        b10_days=scale * (-np.log(B10_RELIABILITY)) ** (1 / shape),
+    )
+
+
+def table_path():
+    return TABLE_DIR / f"{dataset_hash()[:16]}-v{TABLE_VERSION}.parquet"
+
+
+def build_table(df, workers=None):
+    """Fit every condition group of ``df``, write the table for the current dataset, and drop older tables."""
+    table = fit_conditions(df, workers=workers)
+    path = table_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(path, lambda tmp: table.to_parquet(tmp, index=False))
+    for stale in TABLE_DIR.glob("*.parquet"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return table
+
+
+def _load(df):
+    path = table_path()
+    if path.exists():
+        table = pd.read_parquet(path)
+        # Parquet keeps the categories; match the dataset's so filters compare alike
+        return table.astype({col: df[col].dtype for col in CONDITION_COLUMNS})
+    return build_table(df, workers=1)
+
+
+def get_weibull_table():
+    """Process-wide Weibull parameter table for the current dataset, built on first use if the job has not run."""
+    return shared_resource("weibull_table", _load)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit Weibull parameters for every operating-condition group.")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    table = build_table(get_dataset(), args.workers)
+    fitted = table["shape"].notna().sum()
+    print(f"Fitted {fitted:,} of {len(table):,} groups in {time.perf_counter() - start:.2f}s into {table_path()}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,18 @@
+import threading
 import streamlit as st
+from bearing_analysis.cache import get_result_cache
+from bearing_analysis.models import get_model_registry
 
 st.set_page_config(page_title="Bearing Dataset Analysis", layout="wide", initial_sidebar_state="collapsed")
+# Load (or, on a new dataset version, train) the Q14 models once per server process, in the background
+@st.cache_resource
+def warm_models():
+    thread = threading.Thread(target=lambda: get_model_registry().warm(), daemon=True)
+    thread.start()
+    return thread
+
+warm_models()
+
 st.title("🔍 Bearing Analysis")
 st.divider()
 
@@ -130,3 +142,12 @@ for group_title, questions in question_groups.items():
                     st.button(" Coming Soon", key=f"{item['q']}_disabled", disabled=True)
 
 st.divider()
+
+# Shared result cache counters (all sessions in this server process)
+with st.expander("Result Cache"):
+    stats = get_result_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hits", stats["hits"])
+    col2.metric("Misses", stats["misses"])
+    col3.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+    col4.metric("Cached", f"{stats['entries']} results / {stats['bytes'] / 1e6:.1f} MB")
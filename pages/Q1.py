@@ -1,6 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.boxplot import distribution_figure
+from bearing_analysis.cache import cached, filter_signature
+from bearing_analysis.cube import get_cube
+from bearing_analysis.dataset import get_dataset
 
 # --- Page Config ---
 st.set_page_config(page_title="Q1: Bearing Type vs Asset Life", layout="wide", initial_sidebar_state="collapsed")
@@ -8,32 +11,30 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q1: Bearing Type vs Asset Performance Across Assets")
 
 # --- Load & Preprocess Data ---
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["subscription_start", "timestamp_of_fault"])
-    df['operational_days'] = (df['timestamp_of_fault'] - df['subscription_start']).dt.days
-    df['asset_type'] = df['industry_type'] + " | " + df['machine_type'] + " | " + df['bearing_make']
-
-    def rpm_bucket(rpm):
-        if pd.isna(rpm):
-            return "Unknown"
-        elif rpm < 200:
-            return "(0-200)"
-        elif rpm < 900:
-            return "(200-900)"
-        elif rpm < 1500:
-            return "(900-1500)"
-        else:
-            return "1500+"
-    df['rpm_range'] = df['rpm_min'].apply(rpm_bucket)
+    df = get_dataset()
+    df['asset_type'] = df['industry_type'].astype(str) + " | " + df['machine_type'].astype(str) + " | " + df['bearing_make'].astype(str)
+    df['rpm_range'] = df['rpm_fine_4']
     return df.dropna(subset=['operational_days'])
 
 df = load_data()
+cube = get_cube()
+
+# Cached on the filters that define the subset, so equivalent widget states share a result
+def life_stats(frame, by, filters):
+    domains = {col: df[col].cat.categories for col in filters}
+    return cached(
+        ("operational_days stats", tuple(by)), filter_signature(filters, domains),
+        lambda: frame.groupby(by, observed=True)['operational_days'].agg(
+            count='count', mean='mean', median='median', std='std'
+        ).reset_index().rename(columns={'rpm_fine_4': 'rpm_range'})
+    )
 
 # --- KPIs ---
 st.subheader("Key Performance Indicators")
 
-kpi_df = df.groupby('bearing_type_assigned_1')['operational_days'].agg(['mean', 'std', 'count']).dropna()
+kpi_df = cube.rollup('bearing_type_assigned_1').set_index('bearing_type_assigned_1')[['mean', 'std', 'count']].dropna()
 kpi_df['cv'] = (kpi_df['std'] / kpi_df['mean']) * 100
 
 col1, col2, col3 = st.columns(3)
@@ -69,17 +70,19 @@ with tab1:
         st.subheader("Select a Bearing Type")
         selected_bearing = st.selectbox("Bearing Type", sorted(df['bearing_type_assigned_1'].dropna().unique()))
         plot_type_1 = st.radio("Plot Type", list(plot_type_options.keys()), index=0)
+        show_all_1 = st.toggle("Show all points", value=False, help="Draw every record (WebGL) instead of a sample per group")
 
     with col2:
-        filtered = df[df['bearing_type_assigned_1'] == selected_bearing]
+        filtered = df[df['bearing_type_assigned_1'] == selected_bearing].copy()
 
         if plot_type_options[plot_type_1] == "bar":
-            grouped = filtered.groupby(['industry_type', 'machine_type', 'bearing_make', 'rpm_range']).agg(
-                avg_life=('operational_days', 'mean'),
-                count=('operational_days', 'count')
-            ).reset_index()
+            grouped = cube.rollup(
+                ['industry_type', 'machine_type', 'bearing_make', 'rpm_fine_4'],
+                where={'bearing_type_assigned_1': selected_bearing}
+            ).rename(columns={'rpm_fine_4': 'rpm_range', 'mean': 'avg_life'})
+            grouped = grouped.loc[grouped['count'] > 0, ['industry_type', 'machine_type', 'bearing_make', 'rpm_range', 'avg_life', 'count']]
 
-            grouped['Asset Configuration'] = grouped['industry_type'] + " | " + grouped['machine_type'] + " | " + grouped['bearing_make']
+            grouped['Asset Configuration'] = grouped['industry_type'].astype(str) + " | " + grouped['machine_type'].astype(str) + " | " + grouped['bearing_make'].astype(str)
 
             fig = px.bar(
                 grouped, x='Asset Configuration', y='avg_life', color='rpm_range',
@@ -99,22 +102,21 @@ with tab1:
             }))
 
         else:
-            fig_func = px.box if plot_type_options[plot_type_1] == "box" else px.violin
-            filtered['Asset Configuration'] = filtered['industry_type'] + " | " + filtered['machine_type'] + " | " + filtered['bearing_make']
+            filtered['Asset Configuration'] = filtered['industry_type'].astype(str) + " | " + filtered['machine_type'].astype(str) + " | " + filtered['bearing_make'].astype(str)
 
-            fig = fig_func(
+            fig = distribution_figure(
                 filtered, x='Asset Configuration', y='operational_days', color='rpm_range',
-                points="all", title=f"{plot_type_1} of '{selected_bearing}' Across Asset Configurations",
+                kind=plot_type_options[plot_type_1], show_all=show_all_1,
+                title=f"{plot_type_1} of '{selected_bearing}' Across Asset Configurations",
                 labels={'Asset Configuration': 'Asset Configuration', 'operational_days': 'Operational Days'}
             )
             fig.update_layout(xaxis_tickangle=-30)
             st.plotly_chart(fig, use_container_width=True)
 
-            stats = filtered.groupby(
-                ['industry_type', 'machine_type', 'bearing_make', 'rpm_range']
-            )['operational_days'].agg(
-                count='count', mean='mean', median='median', std='std'
-            ).reset_index()
+            stats = life_stats(
+                filtered, ['industry_type', 'machine_type', 'bearing_make', 'rpm_fine_4'],
+                {'bearing_type_assigned_1': selected_bearing}
+            )
             st.dataframe(stats.rename(columns={
                 'mean': 'Avg', 'median': 'Median', 'std': 'Std Dev', 'count': 'Samples',
                 'industry_type': 'Industry', 'machine_type': 'Machine', 'bearing_make': 'Make'
@@ -126,36 +128,42 @@ with tab2:
 
     with col1:
         st.subheader("Fix Asset Configuration")
-        query = df.copy()
+        query = df
+        fixed = {}
 
         fix_industry = st.checkbox("Fix Industry Type")
         if fix_industry:
             selected_industry = st.selectbox("Industry Type", sorted(df['industry_type'].dropna().unique()))
             query = query[query['industry_type'] == selected_industry]
+            fixed['industry_type'] = selected_industry
 
         fix_machine = st.checkbox("Fix Machine Type")
         if fix_machine:
             selected_machine = st.selectbox("Machine Type", sorted(query['machine_type'].dropna().unique()))
             query = query[query['machine_type'] == selected_machine]
+            fixed['machine_type'] = selected_machine
 
         fix_make = st.checkbox("Fix Bearing Make")
         if fix_make:
             selected_make = st.selectbox("Bearing Make", sorted(query['bearing_make'].dropna().unique()))
             query = query[query['bearing_make'] == selected_make]
+            fixed['bearing_make'] = selected_make
 
         fix_rpm = st.checkbox("Fix RPM Range")
         if fix_rpm:
             selected_rpm = st.selectbox("RPM Range", sorted(query['rpm_range'].dropna().unique()))
             query = query[query['rpm_range'] == selected_rpm]
+            fixed['rpm_fine_4'] = selected_rpm
 
         plot_type_2 = st.radio("Plot Type", list(plot_type_options.keys()), index=0, key="plot2")
+        show_all_2 = st.toggle("Show all points", value=False, key="points2", help="Draw every record (WebGL) instead of a sample per group")
 
     with col2:
         if plot_type_options[plot_type_2] == "bar":
-            grouped = query.groupby(['bearing_type_assigned_1', 'rpm_range']).agg(
-                avg_life=('operational_days', 'mean'),
-                count=('operational_days', 'count')
-            ).reset_index()
+            grouped = cube.rollup(['bearing_type_assigned_1', 'rpm_fine_4'], where=fixed).rename(
+                columns={'rpm_fine_4': 'rpm_range', 'mean': 'avg_life'}
+            )
+            grouped = grouped.loc[grouped['count'] > 0, ['bearing_type_assigned_1', 'rpm_range', 'avg_life', 'count']]
 
             fig = px.bar(
                 grouped, x='bearing_type_assigned_1', y='avg_life', color='rpm_range',
@@ -167,19 +175,17 @@ with tab2:
             st.dataframe(grouped.rename(columns={'avg_life': 'Avg Life (days)', 'count': 'Sample Count'}))
 
         else:
-            fig_func = px.box if plot_type_options[plot_type_2] == "box" else px.violin
-            fig = fig_func(
+            fig = distribution_figure(
                 query, x='bearing_type_assigned_1', y='operational_days',
-                color='rpm_range' if fix_rpm else None, points="all",
+                color='rpm_range' if fix_rpm else None,
+                kind=plot_type_options[plot_type_2], show_all=show_all_2,
                 title="Distribution of Bearing Life by Type",
                 labels={'bearing_type_assigned_1': 'Bearing Type', 'operational_days': 'Operational Days'}
             )
             fig.update_layout(xaxis_tickangle=-30)
             st.plotly_chart(fig, use_container_width=True)
 
-            stats = query.groupby(
-                ['bearing_type_assigned_1', 'rpm_range'] if fix_rpm else ['bearing_type_assigned_1']
-            )['operational_days'].agg(
-                count='count', mean='mean', median='median', std='std'
-            ).reset_index()
+            stats = life_stats(
+                query, ['bearing_type_assigned_1', 'rpm_fine_4'] if fix_rpm else ['bearing_type_assigned_1'], fixed
+            )
             st.dataframe(stats.rename(columns={'mean': 'Avg', 'median': 'Median', 'std': 'Std Dev', 'count': 'Samples'}))
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.cube import get_cube
 
 # Page configuration
 st.set_page_config(page_title="Q11: Bearing Make vs Failure Severity", layout="wide")
@@ -8,35 +8,26 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q11. Are certain bearing makes associated with consistently higher or lower severity failures?")
 st.markdown("🔍 Link brand reliability with severity trends to guide procurement decisions.")
 
-# Load dataset
-@st.cache_data
-def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault", "subscription_start"])
-    return df
-
-df = load_data()
+# Load pre-aggregated counts
+cube = get_cube()
 
 # --- Optional Filters ---
+where = {}
 with st.expander("Optional Filters"):
-    industry = st.selectbox("Filter by Industry", ["All"] + sorted(df["industry_type"].dropna().unique()))
-    machine = st.selectbox("Filter by Machine Type", ["All"] + sorted(df["machine_type"].dropna().unique()))
+    industry = st.selectbox("Filter by Industry", ["All"] + cube.values("industry_type"))
+    machine = st.selectbox("Filter by Machine Type", ["All"] + cube.values("machine_type"))
     rpm_range = st.selectbox("Filter by RPM Range", ["All", "Low (<1000)", "Medium (1000-3000)", "High (>3000)"])
 
     if industry != "All":
-        df = df[df["industry_type"] == industry]
+        where["industry_type"] = industry
     if machine != "All":
-        df = df[df["machine_type"] == machine]
+        where["machine_type"] = machine
     if rpm_range != "All":
-        if rpm_range == "Low (<1000)":
-            df = df[df["rpm"] < 1000]
-        elif rpm_range == "Medium (1000-3000)":
-            df = df[(df["rpm"] >= 1000) & (df["rpm"] <= 3000)]
-        else:
-            df = df[df["rpm"] > 3000]
+        where["rpm_low_med_high_1000"] = rpm_range.split(" ")[0]
 
 # --- Bar Plot ---
-if "bearing_make" in df.columns and "bearing_severity_class" in df.columns:
-    severity_by_make = df.groupby(["bearing_make", "bearing_severity_class"]).size().reset_index(name="count")
+severity_by_make = cube.size(["bearing_make", "bearing_severity_class"], where).reset_index(name="count")
+if not severity_by_make.empty:
 
     fig = px.bar(
         severity_by_make,
@@ -59,4 +50,4 @@ if "bearing_make" in df.columns and "bearing_severity_class" in df.columns:
     percent_table = (pivot.T / pivot.sum(axis=1)).T * 100
     st.dataframe(percent_table.round(2))
 else:
-    st.error("Required columns `bearing_make` or `bearing_severity_class` not found in the dataset.")
+    st.warning("No records match the selected filters.")
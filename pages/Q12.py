@@ -1,7 +1,13 @@
+import numpy as np
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import numpy as np
+import plotly.graph_objects as go
+from bearing_analysis.cache import cached
+from bearing_analysis.cube import get_cube
+from bearing_analysis.dataset import SEVERITY_COLUMN, get_dataset
+from bearing_analysis.filters import FilterIndex
+from bearing_analysis.sketch import ALPHA
+from bearing_analysis.survival import fit_survival
 
 st.set_page_config(page_title="Q12: Preventive Replacement Interval")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
@@ -9,17 +15,23 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q12: What is the ideal preventive replacement interval?")
 st.markdown("Estimate data-driven preventive maintenance thresholds (median / 75th percentile).")
 
-@st.cache_data
+filter_cols = ["bearing_make", "bearing_type_assigned_1", "machine_type", "industry_type", "lubrication_type"]
+
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault", "subscription_start", "subscription_end"])
-    return df
+    df = get_dataset()
+    # Rows with a valid start, and either a failure after it or none yet (censored)
+    df = df.dropna(subset=["subscription_start"])
+    df["days_to_failure"] = (df["timestamp_of_fault"] - df["subscription_start"]).dt.days
+    return df[(df["days_to_failure"] > 0) | df["timestamp_of_fault"].isna()]
 
-df = load_data()
+@st.cache_resource
+def load_index():
+    return FilterIndex(load_data(), filter_cols)
 
-# Only rows with valid start and failure timestamps
-df = df.dropna(subset=["subscription_start", "timestamp_of_fault"])
-df["days_to_failure"] = (df["timestamp_of_fault"] - df["subscription_start"]).dt.days
-df = df[df["days_to_failure"] > 0]
+df = load_data()
+index = load_index()
+cube = get_cube()
 
 # ─────────────────────────────
 # Page Layout: 2 columns
@@ -29,23 +41,67 @@ left_col, right_col = st.columns([1, 2])
 with left_col:
     st.markdown("### Filter Options")
 
-    filter_cols = ["bearing_make", "bearing_type_assigned_1", "machine_type", "industry_type", "lubrication_type"]
-
+    # Each filter only offers values left by the filters above it
+    selections = {}
     for col in filter_cols:
-        if col in df.columns:
-            options = df[col].dropna().unique().tolist()
-            selected = st.multiselect(f"{col.replace('_', ' ').title()}", options, default=options, key=col)
-            df = df[df[col].isin(selected)]
+        options = index.available(col, selections)
+        selections[col] = st.multiselect(f"{col.replace('_', ' ').title()}", options, default=options, key=col)
+
+    st.markdown("### Survival Options")
+    severity_classes = sorted(df[SEVERITY_COLUMN].dropna().unique().tolist())
+    failure_classes = st.multiselect(
+        "Severity classes counted as failure", severity_classes, default=severity_classes,
+        help="Faults of other classes only show the bearing lasted that long and are treated as censored.",
+    )
+    reliability = st.slider("Target reliability", 0.50, 0.99, 0.90, 0.01, format="%.2f")
+
+# Records still running are censored at the latest fault on record, whatever the filters
+as_of = df["timestamp_of_fault"].max()
+df = df[index.select(selections)]
 
 with right_col:
     if df.empty:
         st.warning(" No data available after applying filters.")
     else:
-        median_days = int(df["days_to_failure"].median())
-        percentile_75 = int(np.percentile(df["days_to_failure"], 75))
+        interval = cube.quantiles([], [0.5, 0.75], where=selections).iloc[0]
+
+        st.metric("Median Failure Interval", f"{interval['p50']:.0f} days")
+        st.metric("75th Percentile Failure Interval", f"{interval['p75']:.0f} days")
+        st.caption(f"Percentiles are merged from pre-aggregated sketches and are accurate to within {ALPHA:.0%}.")
+
+        # Survival-adjusted interval: censored records count as survivors up to their last observation
+        st.subheader("Survival-Adjusted Replacement Interval")
+        survival = cached(
+            ("Q12 survival", tuple(failure_classes)), index.signature(selections),
+            lambda: fit_survival(df, failure_classes=failure_classes, as_of=as_of),
+        )
+        adjusted = survival.intervals(reliability).iloc[0]
+        weibull = survival.weibull.iloc[0]
+        failures, records = int(weibull["failures"]), int(weibull["records"])
+        curve = survival.curve()
+        km_col, weibull_col = st.columns(2)
+        km_col.metric(f"Kaplan-Meier ({reliability:.0%} reliability)",
+                      "not reached" if np.isnan(adjusted["km_days"]) else f"{adjusted['km_days']:.0f} days")
+        weibull_col.metric(f"Weibull ({reliability:.0%} reliability)",
+                           "n/a" if np.isnan(adjusted["weibull_days"]) else f"{adjusted['weibull_days']:.0f} days")
+        st.caption(
+            f"{failures:,} failures and {records - failures:,} censored records. "
+            + ("" if np.isnan(weibull["shape"]) else f"Weibull shape {weibull['shape']:.2f}, scale {weibull['scale']:.0f} days.")
+        )
 
-        st.metric("Median Failure Interval", f"{median_days} days")
-        st.metric("75th Percentile Failure Interval", f"{percentile_75} days")
+        fig_survival = go.Figure(go.Scatter(
+            x=curve["time"], y=curve["survival"], mode="lines", line_shape="hv", name="Kaplan-Meier",
+        ))
+        if not np.isnan(weibull["shape"]):
+            days = np.linspace(0, curve["time"].max(), 200)
+            fig_survival.add_trace(go.Scatter(
+                x=days, y=np.exp(-(days / weibull["scale"]) ** weibull["shape"]), mode="lines", name="Weibull fit",
+                line={"dash": "dash"},
+            ))
+        fig_survival.add_hline(y=reliability, line_dash="dot", line_color="gray")
+        fig_survival.update_layout(title="Probability of Surviving Past Each Day", xaxis_title="Days since subscription start",
+                                   yaxis_title="Survival probability", yaxis_range=[0, 1.02])
+        st.plotly_chart(fig_survival, use_container_width=True)
 
         # Histogram
         st.subheader("Distribution of Days to Failure")
@@ -1,21 +1,18 @@
 import streamlit as st
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 import seaborn as sns
-import matplotlib.pyplot as plt
+from bearing_analysis.cache import cached, filter_signature
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.figures import cached_figure
+from bearing_analysis.models import MODEL_KINDS, get_model_registry
+from bearing_analysis.online import get_online_model
 
 st.set_page_config(page_title="Q14: Severity Prediction", layout="wide")
 # Load data
-@st.cache_data
-def load_data():
-    return pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx")
+df = get_dataset()
 
-df = load_data()
-
-# Load your data
+# Pre-trained models per scope (all records, each industry, each machine type)
+registry = get_model_registry()
 
 st.title("Q14. Can we predict bearing failure severity based on machine type and RPM range?")
 st.markdown("Train a simple classifier to estimate severity level before failure occurs.")
@@ -29,49 +26,56 @@ with col1:
     machine = st.selectbox("Select Machine Type", ["All"] + sorted(df["machine_type"].dropna().unique()))
     bearing = st.selectbox("Select Bearing Type", ["All"] + sorted(df["bearing_type_assigned_1"].dropna().unique()))
 
-    if industry != "All":
-        df = df[df["industry"] == industry]
-    if machine != "All":
-        df = df[df["machine_type"] == machine]
-    if bearing != "All":
-        df = df[df["bearing_type"] == bearing]
+    model_kinds = {**MODEL_KINDS, "online": "Online SGD (hashed features, updated incrementally)"}
+    kind = st.radio("Model", list(model_kinds), format_func=model_kinds.get)
+
+    filters = {"industry_type": industry, "machine_type": machine, "bearing_type_assigned_1": bearing}
+    # The online model covers all records and learns new faults as they arrive
+    model = get_online_model() if kind == "online" else registry.best(filters, kind)
+    scope_col, scope_value = model.scope
+    st.caption(f"Model scope: {'all records' if scope_col is None else f'{scope_col} = {scope_value}'}")
 
-    # Drop rows with missing values for relevant columns
-    df = df.dropna(subset=["bearing_severity_class", "machine_type", "rpm_min", "rpm_max"])
+    # Evaluate on the model's held-out records that match every filter
+    test_df = registry.df.loc[model.test_rows]
+    for col, value in filters.items():
+        if value != "All":
+            test_df = test_df[test_df[col] == value]
 
-    if df.empty:
+    if test_df.empty:
         st.warning("No data available for selected filters.")
         st.stop()
 
-    # Feature engineering: average RPM
-    df["rpm_avg"] = (df["rpm_min"] + df["rpm_max"]) / 2
-
-    # Encode target and categorical features
-    le_severity = LabelEncoder()
-    df["severity_encoded"] = le_severity.fit_transform(df["bearing_severity_class"])
-
-    X = df[["machine_type", "rpm_avg"]].copy()
-    X["machine_type"] = LabelEncoder().fit_transform(X["machine_type"])
-    y = df["severity_encoded"]
-
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    model = RandomForestClassifier(random_state=42)
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
+def evaluate():
+    labels = list(range(len(model.classes)))
+    y_test = model.severity_encoder.transform(test_df["bearing_severity_class"])
+    y_pred = model.severity_encoder.transform(model.predict(test_df))
+    names = [str(cls) for cls in model.classes]
+    report = classification_report(y_test, y_pred, labels=labels, target_names=names, zero_division=0)
+    return report, confusion_matrix(y_test, y_pred, labels=labels)
 
 with col2:
     st.subheader("Model Evaluation")
 
-    target_names = [str(cls) for cls in le_severity.classes_]
-    report = classification_report(y_test, y_pred, target_names=target_names, output_dict=False)
+    target_names = [str(cls) for cls in model.classes]
+    domains = {col: df[col].cat.categories for col in filters}
+    report, cm = cached(
+        ("Q14 evaluation", model.kind, model.scope, model.revision),
+        filter_signature({col: [value] for col, value in filters.items()}, domains),
+        evaluate,
+    )
     st.text(report)
 
     # Confusion matrix plot
-    cm = confusion_matrix(y_test, y_pred)
-    fig, ax = plt.subplots()
-    sns.heatmap(cm, annot=True, fmt="d", cmap="Blues", 
-                xticklabels=target_names, yticklabels=target_names, ax=ax)
-    ax.set_xlabel("Predicted")
-    ax.set_ylabel("Actual")
-    st.pyplot(fig)
+    def draw_matrix(ax, matrix):
+        sns.heatmap(matrix, annot=True, fmt="d", cmap="Blues",
+                    xticklabels=target_names, yticklabels=target_names, ax=ax)
+        ax.set_xlabel("Predicted")
+        ax.set_ylabel("Actual")
+
+    st.image(cached_figure("Q14 confusion matrix", cm, draw_matrix, params=tuple(target_names)))
+
+    if model.kind == "boosting":
+        estimator = model.model[-1]
+        st.caption(f"Stopped after {estimator.n_iter_} boosting iterations.")
+    elif model.kind == "online":
+        st.caption(f"Learned from {len(model.seen):,} fault records (checkpoint revision {model.revision}).")
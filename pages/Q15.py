@@ -1,8 +1,11 @@
 # Q9.py
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.binning import bin_edges, histogram_by_category
+from bearing_analysis.cache import cached, filter_signature
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.ranges import RangeIndex
 
 st.set_page_config(page_title="Q15: Failure Distribution by RPM & Machine Type")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
@@ -10,42 +13,58 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q15: What is the distribution of failures by RPM and machine type?")
 st.markdown("Visualize where failure density is highest.")
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault"])
-    return df
+    df = get_dataset()
 
-df = load_data()
+    # Drop rows with missing values required for this analysis
+    df = df.dropna(subset=["rpm_min", "rpm_max", "machine_type", "timestamp_of_fault"])
+
+    # Calculate average RPM
+    df["avg_rpm"] = (df["rpm_min"] + df["rpm_max"]) / 2
+    return df
 
-# Drop rows with missing values required for this analysis
-df = df.dropna(subset=["rpm_min", "rpm_max", "machine_type", "timestamp_of_fault"])
+# Sorted RPM per machine type, so slider drags never rescan the frame
+@st.cache_resource
+def load_index():
+    return RangeIndex.from_frame(load_data(), "avg_rpm", partition=["machine_type"])
 
-# Calculate average RPM
-df["avg_rpm"] = (df["rpm_min"] + df["rpm_max"]) / 2
+df = load_data()
+index = load_index()
+rpm_min, rpm_max = index.x_bounds()
+machine_options = sorted(df["machine_type"].unique())
+n_bins = 40
 
 # Filters
 with st.container():
     col1, col2 = st.columns(2)
     with col1:
-        selected_machines = st.multiselect("Filter by Machine Type", options=sorted(df["machine_type"].unique()), default=df["machine_type"].unique())
+        selected_machines = st.multiselect("Filter by Machine Type", options=machine_options, default=df["machine_type"].unique())
     with col2:
-        rpm_range = st.slider("Filter by RPM", min_value=int(df["avg_rpm"].min()), max_value=int(df["avg_rpm"].max()), value=(int(df["avg_rpm"].min()), int(df["avg_rpm"].max())))
+        rpm_range = st.slider("Filter by RPM", min_value=int(rpm_min), max_value=int(rpm_max), value=(int(rpm_min), int(rpm_max)))
+
+# Apply filters and bin on the server, so only the machine x RPM count matrix reaches the browser
+def bin_failures():
+    filtered_df = df.iloc[index.rows(rpm_range, where={"machine_type": selected_machines})]
+    return histogram_by_category(filtered_df["machine_type"], filtered_df["avg_rpm"], bin_edges(*rpm_range, n_bins))
 
-# Apply filters
-filtered_df = df[
-    (df["machine_type"].isin(selected_machines)) &
-    (df["avg_rpm"].between(rpm_range[0], rpm_range[1]))
-]
+counts = cached(
+    ("failure heatmap", "machine_type", "avg_rpm", n_bins, tuple(rpm_range)),
+    filter_signature({"machine_type": selected_machines}, {"machine_type": machine_options}),
+    bin_failures,
+)
 
 # Density heatmap
 st.subheader("Failure Density by RPM and Machine Type")
-fig = px.density_heatmap(
-    filtered_df,
-    x="avg_rpm",
-    y="machine_type",
-    nbinsx=40,
-    title="Failure Heatmap: RPM vs Machine Type",
-    labels={"avg_rpm": "Average RPM", "machine_type": "Machine Type"},
-    color_continuous_scale="Reds"
-)
-st.plotly_chart(fig, use_container_width=True)
+if counts.empty:
+    st.info("No failures match the selected filters.")
+else:
+    fig = px.imshow(
+        counts,
+        aspect="auto",
+        origin="lower",
+        title="Failure Heatmap: RPM vs Machine Type",
+        labels={"x": "Average RPM", "y": "Machine Type", "color": "count"},
+        color_continuous_scale="Reds"
+    )
+    st.plotly_chart(fig, use_container_width=True)
@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from bearing_analysis.boxplot import distribution_figure
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.ranges import RangeIndex
+from bearing_analysis.weibull import get_weibull_table
 
 st.set_page_config(page_title="Q16: Bearing Make vs Lifespan")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
@@ -8,25 +10,33 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q16: How does bearing make influence lifespan in identical operating conditions?")
 st.markdown("Compare bearing brands under similar speeds (RPM), machine types, and bearing sizes.")
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault", "subscription_start"])
+    df = get_dataset()
+
+    # Clean & engineer columns
+    df = df.dropna(subset=["subscription_start", "timestamp_of_fault", "rpm_min", "rpm_max", "bearing_make"])
+    df["lifespan_days"] = (df["timestamp_of_fault"] - df["subscription_start"]).dt.days
+    df["avg_rpm"] = (df["rpm_min"] + df["rpm_max"]) / 2
     return df
 
-df = load_data()
+# RPM sorted within each machine type x bearing make, with lifespan prefix sums
+@st.cache_resource
+def load_index():
+    return RangeIndex.from_frame(load_data(), "avg_rpm", "lifespan_days", partition=["machine_type", "bearing_make"])
 
-# Clean & engineer columns
-df = df.dropna(subset=["subscription_start", "timestamp_of_fault", "rpm_min", "rpm_max", "bearing_make"])
-df["lifespan_days"] = (df["timestamp_of_fault"] - df["subscription_start"]).dt.days
-df["avg_rpm"] = (df["rpm_min"] + df["rpm_max"]) / 2
+df = load_data()
+index = load_index()
+rpm_min, rpm_max = index.x_bounds()
+life_min, life_max = index.y_bounds()
 
 # -- FILTERS --
 
 # RPM Range Filter
 rpm_range = st.slider("Filter by RPM", 
-                      min_value=int(df["avg_rpm"].min()), 
-                      max_value=int(df["avg_rpm"].max()), 
-                      value=(int(df["avg_rpm"].min()), int(df["avg_rpm"].max())))
+                      min_value=int(rpm_min), 
+                      max_value=int(rpm_max), 
+                      value=(int(rpm_min), int(rpm_max)))
 
 # Machine Type Filter (if column exists)
 if "machine_type" in df.columns:
@@ -44,29 +54,60 @@ else:
 
 # Lifespan Filter
 lifespan_range = st.slider("Filter by Lifespan (days)",
-                           min_value=int(df["lifespan_days"].min()),
-                           max_value=int(df["lifespan_days"].max()),
-                           value=(int(df["lifespan_days"].min()), int(df["lifespan_days"].max())))
+                           min_value=int(life_min),
+                           max_value=int(life_max),
+                           value=(int(life_min), int(life_max)))
 
-# -- APPLY FILTERS --
-filtered_df = df[df["avg_rpm"].between(rpm_range[0], rpm_range[1])]
-filtered_df = filtered_df[filtered_df["lifespan_days"].between(lifespan_range[0], lifespan_range[1])]
+show_all_points = st.toggle("Show all points", value=False, help="Draw every record (WebGL) instead of a sample per brand")
 
-if selected_machine != "All":
-    filtered_df = filtered_df[filtered_df["machine_type"] == selected_machine]
+# -- APPLY FILTERS --
+machine_filter = {} if selected_machine == "All" else {"machine_type": selected_machine}
+filtered_df = df.iloc[index.rows(rpm_range, lifespan_range, where=machine_filter)]
 
 if selected_sizes:
     filtered_df = filtered_df[filtered_df["bearing_size"].isin(selected_sizes)]
 
 # -- PLOT --
 st.subheader("Lifespan Comparison by Bearing Make")
-fig = px.box(
+fig = distribution_figure(
     filtered_df,
     x="bearing_make",
     y="lifespan_days",
     color="bearing_make",
-    points="all",
+    show_all=show_all_points,
     title="Lifespan by Bearing Brand (Filtered)",
     labels={"lifespan_days": "Lifespan (days)", "bearing_make": "Bearing Brand"}
 )
 st.plotly_chart(fig, use_container_width=True)
+
+# -- SUMMARY --
+if not selected_sizes:
+    st.subheader("Lifespan Summary by Bearing Make")
+    summary = index.summary("bearing_make", rpm_range, lifespan_range, where=machine_filter)
+    st.dataframe(summary.rename(columns={
+        "bearing_make": "Bearing Brand", "count": "Samples", "mean": "Avg Lifespan (days)", "std": "Std Dev"
+    }), use_container_width=True)
+
+# -- WEIBULL PARAMETERS --
+# Fitted per (bearing type, make, machine, lubrication) by the batch job, so bearing makes compare like for like
+st.subheader("Weibull Reliability by Bearing Make under Identical Conditions")
+weibull = get_weibull_table()
+weibull = weibull[weibull["shape"].notna()]
+if selected_machine != "All":
+    weibull = weibull[weibull["machine_type"] == selected_machine]
+if weibull.empty:
+    st.info("No condition group with at least two distinct failure times for this selection.")
+else:
+    st.dataframe(
+        weibull.sort_values(["machine_type", "bearing_type_assigned_1", "b10_days"], ascending=[True, True, False])
+        .rename(columns={
+            "bearing_type_assigned_1": "Bearing Type", "bearing_make": "Bearing Brand", "machine_type": "Machine Type",
+            "lubrication_type": "Lubrication", "records": "Samples", "failures": "Failures",
+            "shape": "Shape", "shape_low": "Shape 95% Low", "shape_high": "Shape 95% High",
+            "scale": "Scale (days)", "scale_low": "Scale 95% Low", "scale_high": "Scale 95% High",
+            "b10_days": "B10 Life (days)",
+        })
+        .style.format(precision=2).format("{:.0f}", subset=["Scale (days)", "Scale 95% Low", "Scale 95% High", "B10 Life (days)"]),
+        hide_index=True, use_container_width=True,
+    )
+    st.caption("B10 life is the day by which 10% of bearings are expected to fail. Bounds are 95% Wald intervals.")
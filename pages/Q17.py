@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 import seaborn as sns
-import matplotlib.pyplot as plt
+from bearing_analysis.cube import get_cube
+from bearing_analysis.figures import cached_figure
 
 # Page config
 st.set_page_config(page_title="Q17: Failure by Bearing-Machine Pair", layout="wide")
@@ -9,36 +9,32 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q17. What is the failure distribution by bearing type and machine type combinations?")
 st.markdown(" Detect which bearing–machine pairs are most prone to issues.")
 
-# Load dataset
-@st.cache_data
-def load_data():
-    return pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx")
-
-df = load_data()
+# Load pre-aggregated counts
+cube = get_cube()
 
 # Optional filters
+where = {}
 with st.expander("Filters"):
-    industry_filter = st.selectbox("Industry", ["All"] + sorted(df["industry_type"].dropna().unique()))
+    industry_filter = st.selectbox("Industry", ["All"] + cube.values("industry_type"))
     if industry_filter != "All":
-        df = df[df["industry_type"] == industry_filter]
-
-# Drop rows with missing bearing/machine/failure info
-df_filtered = df.dropna(subset=["bearing_type_assigned_1", "machine_type", "bearing_severity_class"])
+        where["industry_type"] = industry_filter
 
-# Group and count
-grouped = df_filtered.groupby(["bearing_type_assigned_1", "machine_type"]).size().reset_index(name="count")
+# Group and count (rows with a missing bearing or machine are left out)
+grouped = cube.size(["bearing_type_assigned_1", "machine_type"], where).reset_index(name="count")
 
 # Pivot for heatmap
 pivot_table = grouped.pivot(index="bearing_type_assigned_1", columns="machine_type", values="count").fillna(0)
 
 # Plot
 st.subheader("Failure Distribution Heatmap")
-fig, ax = plt.subplots(figsize=(12, 6))
-sns.heatmap(pivot_table, annot=True, fmt=".0f", cmap="Reds", ax=ax)
-plt.xlabel("Machine Type")
-plt.ylabel("Bearing Type")
-plt.title("Failure Count by Bearing Type and Machine Type")
-st.pyplot(fig)
+def draw_heatmap(ax, table):
+    sns.heatmap(table, annot=True, fmt=".0f", cmap="Reds", ax=ax)
+    ax.set_xlabel("Machine Type")
+    ax.set_ylabel("Bearing Type")
+    ax.set_title("Failure Count by Bearing Type and Machine Type")
+
+# Rendered once per distinct pivot table
+st.image(cached_figure("Q17 failure heatmap", pivot_table, draw_heatmap, figsize=(12, 6)), use_container_width=True)
 
 # Raw Data Option
 with st.expander(" View Raw Grouped Data"):
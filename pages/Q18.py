@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 import seaborn as sns
-import matplotlib.pyplot as plt
+from bearing_analysis.figures import cached_figure
+from bearing_analysis.thresholds import get_rpm_threshold_index
 
 # Page config
 st.set_page_config(page_title="Q18: High-RPM Failures by Industry", layout="wide")
@@ -9,33 +9,40 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q18. Do certain industries experience more frequent high-RPM failures than others?")
 st.markdown(" Explore operational stress by comparing RPM and failure frequency by sector.")
 
-# Load data
-@st.cache_data
-def load_data():
-    return pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx")
-
-df = load_data()
+# Load the per-industry sorted rpm_max index
+index = get_rpm_threshold_index()
 
 # Define RPM thresholds (customize as needed)
 rpm_threshold = st.slider("Set High-RPM Threshold", min_value=1000, max_value=10000, step=500, value=3000)
-
-# Filter failures with high RPM
-df_high_rpm = df[(df["rpm_max"] >= rpm_threshold) & (df["bearing_severity_class"].notna())]
+severities = st.multiselect("Severity Classes", index.strata.tolist(), default=index.strata.tolist())
 
 # Count high-RPM failures per industry
-failures_by_industry = df_high_rpm.groupby("industry_type").size().reset_index(name="high_rpm_failure_count")
+high_rpm_counts = index.counts(rpm_threshold, strata=severities)
+failures_by_industry = high_rpm_counts[high_rpm_counts > 0].rename_axis("industry_type").reset_index(name="high_rpm_failure_count")
 failures_by_industry = failures_by_industry.sort_values(by="high_rpm_failure_count", ascending=False)
 
 # Plot
 st.subheader(f"High-RPM Failures (RPM ≥ {rpm_threshold}) by Industry")
-fig, ax = plt.subplots(figsize=(12, 6))
-sns.barplot(data=failures_by_industry, x="industry_type", y="high_rpm_failure_count", palette="viridis", ax=ax)
-plt.xticks(rotation=45)
-plt.xlabel("Industry")
-plt.ylabel("Failure Count")
-plt.title(f"High-RPM Failures by Industry (RPM ≥ {rpm_threshold})")
-st.pyplot(fig)
+def draw_bars(ax, counts):
+    sns.barplot(data=counts, x="industry_type", y="high_rpm_failure_count", palette="viridis", ax=ax)
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.set_xlabel("Industry")
+    ax.set_ylabel("Failure Count")
+    ax.set_title(f"High-RPM Failures by Industry (RPM ≥ {rpm_threshold})")
+
+# Rendered once per distinct count table and threshold
+st.image(
+    cached_figure("Q18 high-RPM bars", failures_by_industry, draw_bars, params=(rpm_threshold,), figsize=(12, 6)),
+    use_container_width=True,
+)
 
 # View Data
 with st.expander("View Raw Data"):
     st.dataframe(failures_by_industry)
+
+with st.expander("Counts by Severity Class"):
+    st.dataframe(index.stratified(rpm_threshold).rename_axis("industry_type"))
+
+# Failure count at every slider position, for all industries at once
+with st.expander("Threshold Curve"):
+    st.line_chart(index.curve(list(range(1000, 10001, 500)), strata=severities))
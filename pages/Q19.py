@@ -1,6 +1,9 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.cache import cached
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.filters import FilterIndex
+from bearing_analysis.significance import DEFAULT_PERMUTATIONS, FDR, mean_difference_tests
 
 st.set_page_config(page_title="Q19: Bearing Clearance Timing", layout="wide")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
@@ -16,21 +19,28 @@ This analysis investigates the **time to failure** for *bearing clearance issues
 
 """)
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["subscription_start", "timestamp_of_fault"])
+    df = get_dataset()
     df = df[df["bearing_severity_class"] == 2]
-    df = df[df["timestamp_of_fault"].notna() & df["subscription_start"].notna()]
+    df = df[df["timestamp_of_fault"].notna() & df["subscription_start"].notna()].copy()
     df["time_to_failure_days"] = (df["timestamp_of_fault"] - df["subscription_start"]).dt.days
-    df = df[df["time_to_failure_days"] > 0]  # Remove invalid durations
-    df["rpm_bucket"] = pd.cut(df["rpm_max"], bins=[0, 1000, 3000, 6000, 10000], labels=["Low", "Medium", "High", "Very High"])
+    df = df[df["time_to_failure_days"] > 0].copy()  # Remove invalid durations
+    df["rpm_bucket"] = df["rpm_very_high_10000"]
 
     # Normalize lubrication labels
-    df["lubrication_condition"] = df["lubrication_type"].fillna("Unknown").apply(lambda x: "Without Lubrication" if x.strip().lower() in ["not available", "none", "na", "unknown"] else "With Lubrication")
+    lube_label = df["lubrication_type"].str.strip().str.lower()
+    without_lube = lube_label.isna() | lube_label.isin(["not available", "none", "na", "unknown"])
+    df["lubrication_condition"] = without_lube.map({True: "Without Lubrication", False: "With Lubrication"})
     
     return df
 
+@st.cache_resource
+def load_index():
+    return FilterIndex(load_data(), ["industry_type", "rpm_bucket", "bearing_type_assigned_1", "bearing_make", "lubrication_condition"])
+
 df = load_data()
+index = load_index()
 
 if df.empty:
     st.warning("No bearing clearance records with valid timestamps found.")
@@ -39,16 +49,16 @@ if df.empty:
 # --- Sidebar Filters ---
 col1, col2, col3, col4, col5 = st.columns(5)
 
-industry_options = sorted(df["industry_type"].dropna().unique())
-rpm_options = df["rpm_bucket"].dropna().unique()
-type_options = sorted(df["bearing_type_assigned_1"].dropna().unique())
-make_options = sorted(df["bearing_make"].dropna().unique())
+industry_options = index.values("industry_type")
+rpm_options = index.values("rpm_bucket")
+type_options = index.values("bearing_type_assigned_1")
+make_options = index.values("bearing_make")
 lube_conditions = ["With Lubrication", "Without Lubrication"]
 
 with col1:
     selected_industries = st.multiselect("Industry", industry_options, default=industry_options)
 with col2:
-    selected_rpms = st.multiselect("RPM Bucket", list(rpm_options), default=list(rpm_options))
+    selected_rpms = st.multiselect("RPM Bucket", rpm_options, default=rpm_options)
 with col3:
     selected_types = st.multiselect("Bearing Type", type_options, default=type_options)
 with col4:
@@ -57,13 +67,14 @@ with col5:
     selected_lubes = st.multiselect("Lubrication Condition", lube_conditions, default=lube_conditions)
 
 # --- Filtered Dataset ---
-df_filtered = df[
-    (df["industry_type"].isin(selected_industries)) &
-    (df["rpm_bucket"].isin(selected_rpms)) &
-    (df["bearing_type_assigned_1"].isin(selected_types)) &
-    (df["bearing_make"].isin(selected_makes)) &
-    (df["lubrication_condition"].isin(selected_lubes))
-]
+selections = {
+    "industry_type": selected_industries,
+    "rpm_bucket": selected_rpms,
+    "bearing_type_assigned_1": selected_types,
+    "bearing_make": selected_makes,
+    "lubrication_condition": selected_lubes,
+}
+df_filtered = df[index.select(selections)]
 
 if df_filtered.empty:
     st.warning("No records match the selected filters.")
@@ -81,7 +92,7 @@ if df_filtered.empty:
 # --- Lubrication Comparison Chart ---
 st.markdown("### Lubrication Impact on Failure Timing")
 
-lube_chart = df_filtered.groupby("lubrication_condition")["time_to_failure_days"].agg(["count", "mean", "median"]).reset_index()
+lube_chart = df_filtered.groupby("lubrication_condition", observed=True)["time_to_failure_days"].agg(["count", "mean", "median"]).reset_index()
 lube_chart.rename(columns={"count": "Failure Count", "mean": "Mean Days", "median": "Median Days"}, inplace=True)
 
 fig = px.bar(
@@ -95,6 +106,34 @@ fig = px.bar(
 )
 st.plotly_chart(fig, use_container_width=True)
 
+# Permutation test of the with/without difference in every industry x machine x RPM bucket cell
+st.markdown("### Is the Difference Significant?")
+tests = cached(
+    ("Q19 lubrication timing tests", DEFAULT_PERMUTATIONS), index.signature(selections),
+    lambda: mean_difference_tests(
+        df_filtered, df_filtered["lubrication_condition"] == "Without Lubrication", "time_to_failure_days",
+        by=["industry_type", "machine_type", "rpm_bucket"],
+    ),
+)
+tests = tests[tests["p_permutation"].notna()].sort_values("p_permutation")
+if tests.empty:
+    st.info("No industry x machine x RPM bucket cell has failures both with and without lubrication.")
+else:
+    st.dataframe(
+        tests.rename(columns={
+            "flagged": "without_lubrication", "other": "with_lubrication",
+            "mean_flagged": "mean_days_without", "mean_other": "mean_days_with", "difference": "difference_days",
+        }).style
+        .apply(lambda row: ["background-color: rgba(214, 39, 40, 0.25)" if row["significant"] else ""] * len(row), axis=1)
+        .format({"mean_days_without": "{:.0f}", "mean_days_with": "{:.0f}", "difference_days": "{:+.0f}",
+                 "p_permutation": "{:.4f}", "q_value": "{:.4f}"}),
+        hide_index=True, use_container_width=True,
+    )
+    st.caption(
+        f"Two-sided permutation tests ({DEFAULT_PERMUTATIONS:,} within-cell shuffles) of the difference in mean time to "
+        f"failure. q-values control the false discovery rate across cells; highlighted cells have q < {FDR}."
+    )
+
 st.markdown("### Time to Failure Distribution by Lubrication Condition")
 box_fig = px.box(
     df_filtered,
@@ -109,7 +148,7 @@ st.plotly_chart(box_fig, use_container_width=True)
 # Mean Failure Time by Lubrication + Bearing Make
 st.markdown("### Mean Time to Failure by Lubrication and Bearing Make")
 bar_fig = px.bar(
-    df_filtered.groupby(["lubrication_type", "bearing_make"])["time_to_failure_days"].mean().reset_index(),
+    df_filtered.groupby(["lubrication_type", "bearing_make"], observed=True)["time_to_failure_days"].mean().reset_index(),
     x="bearing_make",
     y="time_to_failure_days",
     color="lubrication_type",
@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 from sklearn.preprocessing import MinMaxScaler
+from bearing_analysis.boxplot import distribution_figure
+from bearing_analysis.cache import cached
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.filters import FilterIndex
 
 # --- Config ---
 st.set_page_config(page_title="Q2: Bearing Across Assets", layout="wide", initial_sidebar_state="collapsed")
@@ -11,28 +13,19 @@ st.markdown("You can analyze how a **single bearing type** behaves across differ
 st.divider()
 
 # --- Load Data ---
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["subscription_start", "timestamp_of_fault"])
-    df['operational_days'] = (df['timestamp_of_fault'] - df['subscription_start']).dt.days
-
-    def rpm_bucket(rpm):
-        if pd.isna(rpm):
-            return "Unknown"
-        elif rpm < 200:
-            return "(0-200)"
-        elif rpm < 900:
-            return "(200-900)"
-        elif rpm < 1500:
-            return "(900-1500)"
-        else:
-            return "(1500+)"
-
-    df['rpm_range'] = df['rpm_min'].apply(rpm_bucket)
-    df['asset_type'] = df['machine_type'] + " | " + df['bearing_make']
+    df = get_dataset()
+    df['rpm_range'] = df['rpm_fine_4']
+    df['asset_type'] = df['machine_type'].astype(str) + " | " + df['bearing_make'].astype(str)
     return df.dropna(subset=['operational_days'])
 
+@st.cache_resource
+def load_index():
+    return FilterIndex(load_data(), ['industry_type', 'bearing_type_assigned_1', 'machine_type', 'bearing_make', 'rpm_range'])
+
 df = load_data()
+index = load_index()
 
 # --- Layout ---
 left, right = st.columns([1, 2])
@@ -41,57 +34,60 @@ with left:
     st.subheader("Filters")
 
     # --- Industry filter ---
-    industry_list = sorted(df['industry_type'].dropna().unique())
+    industry_list = index.values('industry_type')
     selected_industry = st.selectbox("Industry", industry_list)
-    df_filtered = df[df['industry_type'] == selected_industry]
+    in_industry = {'industry_type': [selected_industry]}
 
     # --- Bearing Type (Multiselect with All) ---
-    bearing_list = sorted(df_filtered['bearing_type_assigned_1'].dropna().unique())
+    bearing_list = index.available('bearing_type_assigned_1', in_industry)
     selected_bearings = st.multiselect("Bearing Types", options=["All"] + bearing_list, default=["All"])
     if "All" in selected_bearings:
         selected_bearings = bearing_list
 
     # --- Machine Type (Multiselect with All) ---
-    machines = sorted(df_filtered['machine_type'].dropna().unique())
+    machines = index.available('machine_type', in_industry)
     selected_machines = st.multiselect("Machine Types", options=["All"] + machines, default=["All"])
     if "All" in selected_machines:
         selected_machines = machines
 
     # --- Bearing Make (Multiselect with All) ---
-    makes = sorted(df_filtered['bearing_make'].dropna().unique())
+    makes = index.available('bearing_make', in_industry)
     selected_makes = st.multiselect("Bearing Makes", options=["All"] + makes, default=["All"])
     if "All" in selected_makes:
         selected_makes = makes
 
     # --- RPM Ranges (Multiselect with All) ---
-    rpms = sorted(df_filtered['rpm_range'].dropna().unique())
+    rpms = index.available('rpm_range', in_industry)
     selected_rpms = st.multiselect("RPM Ranges", options=["All"] + rpms, default=["All"])
     if "All" in selected_rpms:
         selected_rpms = rpms
 
     show_table = st.toggle("Show Summary Table", value=False)
+    show_points = st.toggle("Show All Points", value=False, help="Draw every record (WebGL) instead of a sample per group")
 
 with right:
     st.subheader(f"Performance of {', '.join(selected_bearings)} in {selected_industry}")
 
     # --- Final Filtering ---
-    plot_df = df_filtered[
-        (df_filtered['bearing_type_assigned_1'].isin(selected_bearings)) &
-        (df_filtered['machine_type'].isin(selected_machines)) &
-        (df_filtered['bearing_make'].isin(selected_makes)) &
-        (df_filtered['rpm_range'].isin(selected_rpms))
-    ]
+    selections = {
+        'industry_type': [selected_industry],
+        'bearing_type_assigned_1': selected_bearings,
+        'machine_type': selected_machines,
+        'bearing_make': selected_makes,
+        'rpm_range': selected_rpms,
+    }
+    plot_df = df[index.select(selections)]
 
     if plot_df.empty:
         st.warning("No matching data found.")
     else:
         # --- Box Plot ---
-        fig = px.box(
+        fig = distribution_figure(
             plot_df,
             x='asset_type',
             y='operational_days',
             color='rpm_range',
-            points='all',
+            show_all=show_points,
             title=f"Lifespan of Bearings Across Asset Types",
             labels={'asset_type': 'Asset (Machine + Make)', 'operational_days': 'Operational Days'},
         )
@@ -99,12 +95,12 @@ with right:
         st.plotly_chart(fig, use_container_width=True)
 
         if show_table:
-            stats = plot_df.groupby(['asset_type', 'rpm_range'])['operational_days'].agg(
+            stats = cached(("Q2 asset stats",), index.signature(selections), lambda: plot_df.groupby(['asset_type', 'rpm_range'], observed=True)['operational_days'].agg(
                 count='count',
                 mean='mean',
                 median='median',
                 std='std'
-            ).reset_index()
+            ).reset_index())
 
             st.markdown("### Summary Table")
             st.dataframe(stats.rename(columns={
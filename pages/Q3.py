@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.bootstrap import DEFAULT_RESAMPLES, rank_groups
+from bearing_analysis.cache import cached
+from bearing_analysis.cube import get_cube
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.filters import FilterIndex
 
 # --- Page Config ---
 st.set_page_config(page_title="Q3: Bearing Comparison Under Same Conditions", layout="wide", initial_sidebar_state="collapsed")
@@ -15,26 +19,21 @@ Identify:
 st.divider()
 
 # --- Load Data ---
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["subscription_start", "timestamp_of_fault"])
-    df['operational_days'] = (df['timestamp_of_fault'] - df['subscription_start']).dt.days
-
-    def rpm_bucket(rpm):
-        if pd.isna(rpm):
-            return ""
-        elif rpm < 200:
-            return "(0-200)"
-        elif rpm < 900:
-            return "(200-900)"
-        elif rpm < 1500:
-            return "(900-1500)"
-        else:
-            return "(1500+)"
-    df['rpm_range'] = df['rpm_min'].apply(rpm_bucket)
+    df = get_dataset()
+    df['rpm_range'] = df['rpm_fine_4']
     return df.dropna(subset=['operational_days'])
 
+@st.cache_resource
+def load_index():
+    return FilterIndex(load_data(), ['industry_type', 'machine_type', 'rpm_range'])
+
 df = load_data()
+index = load_index()
+cube = get_cube()
+
+MIN_SAMPLES = 5
 
 # --- Helper: Multiselect with 'All' ---
 def multiselect_with_all(label, options, default=None):
@@ -57,38 +56,56 @@ st.subheader("Select Operating Conditions")
 col1, col2, col3 = st.columns(3)
 
 with col1:
-    all_industries = df['industry_type'].dropna().unique()
+    all_industries = index.values('industry_type')
     selected_industries = multiselect_with_all("Select Industry Type(s)", all_industries)
 
 with col2:
-    filtered_machines_df = df[df['industry_type'].isin(selected_industries)]
-    all_machines = filtered_machines_df['machine_type'].dropna().unique()
+    all_machines = index.available('machine_type', {'industry_type': selected_industries})
     selected_machines = multiselect_with_all("Select Machine Type(s)", all_machines)
 
 with col3:
-    all_rpms = df['rpm_range'].dropna().unique()
+    all_rpms = index.values('rpm_range')
     selected_rpms = multiselect_with_all("Select RPM Range(s)", all_rpms)
 
-# --- Filter Data ---
-filtered_df = df[
-    (df['industry_type'].isin(selected_industries)) &
-    (df['machine_type'].isin(selected_machines)) &
-    (df['rpm_range'].isin(selected_rpms))
-]
+# --- Aggregate Matching Cells ---
+where = {
+    'industry_type': selected_industries,
+    'machine_type': selected_machines,
+    'rpm_fine_4': selected_rpms,
+}
+grouped = cube.rollup('bearing_type_assigned_1', where)
+selections = {'industry_type': selected_industries, 'machine_type': selected_machines, 'rpm_range': selected_rpms}
+
+# Bootstrap every bearing type with enough samples; cached on the exact rows the filters match
+def bootstrap_ranking():
+    subset = df[index.select(selections)]
+    counts = subset['bearing_type_assigned_1'].value_counts()
+    subset = subset[subset['bearing_type_assigned_1'].isin(counts.index[counts >= MIN_SAMPLES])]
+    ranking = rank_groups(subset['operational_days'].to_numpy(), subset['bearing_type_assigned_1'].astype(str))
+    return ranking.rename(columns={'group': 'bearing_type_assigned_1'})
 
 # --- Analysis ---
-if filtered_df.empty:
+if grouped['count'].sum() == 0:
     st.warning("No matching data found for the selected conditions.")
 else:
-    grouped = filtered_df.groupby('bearing_type_assigned_1')['operational_days'].agg(
-        count='count', mean='mean', median='median', std='std'
-    ).reset_index()
+    medians = cube.quantiles('bearing_type_assigned_1', [0.5], where).rename(columns={'p50': 'median'})
+    grouped = grouped.merge(medians, on='bearing_type_assigned_1')[
+        ['bearing_type_assigned_1', 'count', 'mean', 'median', 'std']
+    ]
 
-    grouped = grouped[grouped['count'] >= 5]  # minimum data filter
+    grouped = grouped[grouped['count'] >= MIN_SAMPLES]  # minimum data filter
 
     if grouped.empty:
         st.warning("Not enough data for reliable comparison.")
     else:
+        ranking = cached(("Q3 bootstrap ranking", MIN_SAMPLES, DEFAULT_RESAMPLES), index.signature(selections), bootstrap_ranking)
+        grouped = grouped.astype({'bearing_type_assigned_1': str}).merge(
+            ranking[['bearing_type_assigned_1', 'ci_low', 'ci_high', 'p_top', 'p_bottom']], on='bearing_type_assigned_1'
+        )
+        grouped['ci_plus'] = grouped['ci_high'] - grouped['mean']
+        grouped['ci_minus'] = grouped['mean'] - grouped['ci_low']
+        columns = {'mean': 'Avg Life (days)', 'count': 'Sample Count', 'ci_low': '95% CI Low', 'ci_high': '95% CI High',
+                   'p_top': 'P(Top 5)', 'p_bottom': 'P(Bottom 5)'}
         top5 = grouped.nlargest(5, 'mean')
         bottom5 = grouped.nsmallest(5, 'mean')
 
@@ -96,12 +113,13 @@ else:
 
         with col1:
             st.markdown("### Top 5 Bearing Types by Lifespan")
-            st.dataframe(top5.rename(columns={'mean': 'Avg Life (days)', 'count': 'Sample Count'}), use_container_width=True)
+            st.dataframe(top5.drop(columns=['ci_plus', 'ci_minus']).rename(columns=columns), use_container_width=True)
             fig_top = px.bar(
                 top5,
                 x='bearing_type_assigned_1',
                 y='mean',
-                error_y='std',
+                error_y='ci_plus',
+                error_y_minus='ci_minus',
                 color='bearing_type_assigned_1',
                 labels={'bearing_type_assigned_1': 'Bearing Type', 'mean': 'Avg Life (days)'},
                 title="Top 5 Bearing Types"
@@ -111,15 +129,22 @@ else:
 
         with col2:
             st.markdown("### Bottom 5 Bearing Types by Lifespan")
-            st.dataframe(bottom5.rename(columns={'mean': 'Avg Life (days)', 'count': 'Sample Count'}), use_container_width=True)
+            st.dataframe(bottom5.drop(columns=['ci_plus', 'ci_minus']).rename(columns=columns), use_container_width=True)
             fig_bottom = px.bar(
                 bottom5,
                 x='bearing_type_assigned_1',
                 y='mean',
-                error_y='std',
+                error_y='ci_plus',
+                error_y_minus='ci_minus',
                 color='bearing_type_assigned_1',
                 labels={'bearing_type_assigned_1': 'Bearing Type', 'mean': 'Avg Life (days)'},
                 title="Bottom 5 Bearing Types"
             )
             fig_bottom.update_layout(showlegend=False, height=400)
             st.plotly_chart(fig_bottom, use_container_width=True)
+
+        st.caption(
+            f"Intervals are 95% bootstrap intervals of the mean from {DEFAULT_RESAMPLES:,} resamples. "
+            "P(Top 5) and P(Bottom 5) give how often a bearing type ranks there across resamples; "
+            "low values mean its place in the ranking rests on a handful of samples."
+        )
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
+from bearing_analysis.boxplot import distribution_figure
+from bearing_analysis.dataset import get_dataset
 
 st.set_page_config(page_title="Q4: Bearing Type vs Lifespan")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
@@ -8,28 +8,14 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q4: Do certain bearing types consistently fail earlier than others across different RPM ranges?")
 st.markdown("Identify early-failing bearings under low, medium, and high RPM conditions.")
 
-@st.cache_data
-def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault", "subscription_start"])
-    return df
-
-df = load_data()
+df = get_dataset()
 
 # Drop missing and compute lifespan + average RPM
-df = df.dropna(subset=["subscription_start", "timestamp_of_fault", "rpm_min", "rpm_max", "bearing_type_assigned_1"])
+df = df.dropna(subset=["subscription_start", "timestamp_of_fault", "rpm_min", "rpm_max", "bearing_type_assigned_1"]).copy()
 df["lifespan_days"] = (df["timestamp_of_fault"] - df["subscription_start"]).dt.days
-df["avg_rpm"] = (df["rpm_min"] + df["rpm_max"]) / 2
 
 # RPM bins: Low (<1000), Medium (1000–3000), High (>3000)
-def rpm_category(rpm):
-    if rpm < 1000:
-        return "Low"
-    elif rpm <= 3000:
-        return "Medium"
-    else:
-        return "High"
-
-df["rpm_category"] = df["avg_rpm"].apply(rpm_category)
+df["rpm_category"] = df["rpm_low_med_high_1000"]
 
 # --- RPM Category Filter ---
 rpm_category = st.selectbox("Select RPM Range", options=["All", "Low", "Medium", "High"])
@@ -46,8 +32,10 @@ selected_industry = st.selectbox("Filter by Industry", industry_types)
 machine_types = ["All"] + sorted(df["machine_type"].dropna().unique().tolist())
 selected_machine = st.selectbox("Filter by Machine Type", machine_types)
 
+show_all_points = st.toggle("Show all points", value=False, help="Draw every record (WebGL) instead of a sample per bearing type")
+
 # --- Filtering Logic ---
-filtered_df = df.copy()
+filtered_df = df
 
 if rpm_category != "All":
     filtered_df = filtered_df[filtered_df["rpm_category"] == rpm_category]
@@ -65,12 +53,12 @@ if selected_machine != "All":
 if filtered_df.empty:
     st.warning("No data available for selected filters.")
 else:
-    fig = px.box(
+    fig = distribution_figure(
         filtered_df,
         x="bearing_type_assigned_1",
         y="lifespan_days",
         color="bearing_type_assigned_1",
-        points="all",
+        show_all=show_all_points,
         labels={
             "lifespan_days": "Lifespan (days)",
             "bearing_type_assigned_1": "Bearing Type"
@@ -81,6 +69,6 @@ else:
 
     # Optional: Count table
     st.subheader("Failure Count by Bearing Type")
-    count_df = filtered_df["bearing_type_assigned_1"].value_counts().reset_index()
+    count_df = filtered_df["bearing_type_assigned_1"].value_counts().loc[lambda counts: counts > 0].reset_index()
     count_df.columns = ["Bearing Type", "Count"]
     st.dataframe(count_df)
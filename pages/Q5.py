@@ -1,6 +1,8 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.lubrication import lube_to_failure_cases
+from bearing_analysis.timeline import get_event_store
 
 st.set_page_config(page_title="Q5: Lubrication vs Failure Timing")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
@@ -10,47 +12,22 @@ st.markdown("""
 Analyze how soon bearings fail after a lubrication event.
 """)
 
-@st.cache_data
-def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault"])
-    return df
-
-df = load_data()
+df = get_dataset()
 df.columns = df.columns.str.strip().str.lower()
 
 # Keep severity 1, 2, 3 only
 df = df[df["bearing_severity_class"].isin([1, 2, 3])]
 
-# Group and calculate failure delay after lubrication
-df_sorted = df.sort_values(["monitor_id", "timestamp_of_fault"])
-results = []
-
-for monitor_id, group in df_sorted.groupby("monitor_id"):
-    group = group.reset_index(drop=True)
-
-    lube_dates = group[group["bearing_severity_class"].isin([1, 2])]["timestamp_of_fault"].tolist()
-    fail_dates = group[group["bearing_severity_class"].isin([2, 3])]["timestamp_of_fault"].tolist()
-
-    if lube_dates and fail_dates:
-        for fail_date in fail_dates:
-            lube_before_fail = [d for d in lube_dates if d < fail_date]
-            if lube_before_fail:
-                last_lube = max(lube_before_fail)
-                days_between = (fail_date - last_lube).days
-                results.append({
-                    "monitor_id": monitor_id,
-                    "last_lube": last_lube,
-                    "fail_date": fail_date,
-                    "days_between": days_between,
-                    "industry_type": group["industry_type"].iloc[0],
-                    "bearing_make": group["bearing_make"].iloc[0],
-                    "bearing_type": group[["bearing_type_assigned_1", "bearing_type_assigned_2", "bearing_type_assigned_3"]].bfill(axis=1).iloc[0, 0],
-                    "machine_type": group["machine_type"].iloc[0],
-                    "rpm": group["rpm_min"].iloc[0],
-                    "lubrication_method": group["lubrication_method"].iloc[0] if "lubrication_method" in group.columns else "Unknown"
-                })
-
-case_df = pd.DataFrame(results)
+# Pair each failure (severity 2, 3) with the last lubrication event (severity 1, 2) before it
+bearing_cols = ["bearing_type_assigned_1", "bearing_type_assigned_2", "bearing_type_assigned_3"]
+monitor_cols = ["industry_type", "bearing_make", "machine_type", "rpm_min", *bearing_cols]
+if "lubrication_method" in df.columns:
+    monitor_cols.append("lubrication_method")
+case_df = lube_to_failure_cases(df, lube_classes=[1, 2], failure_classes=[2, 3], attributes=monitor_cols)
+case_df["bearing_type"] = case_df[bearing_cols].astype(object).bfill(axis=1).iloc[:, 0]
+case_df = case_df.rename(columns={"rpm_min": "rpm"})
+if "lubrication_method" not in case_df.columns:
+    case_df["lubrication_method"] = "Unknown"
 
 # --- Filter Controls in Columns ---
 st.subheader("Filter Options")
@@ -96,3 +73,18 @@ st.dataframe(
 st.subheader("Time Between Lubrication and Failure")
 fig = px.histogram(case_df, x="days_between", nbins=20, title="Distribution of Days Between Lubrication and Failure")
 st.plotly_chart(fig, use_container_width=True)
+
+# --- Monitor Drill-down ---
+with st.expander("Monitor Event History"):
+    if case_df.empty:
+        st.info("No cases to drill into.")
+    else:
+        monitor = st.selectbox("Monitor", sorted(case_df["monitor_id"].unique()))
+        history = get_event_store().history(monitor)
+        fig_history = px.scatter(
+            history, x="timestamp_of_fault", y="bearing_severity_class", color="lubrication_type",
+            title=f"Fault Timeline for Monitor {monitor}",
+            labels={"timestamp_of_fault": "Fault Time", "bearing_severity_class": "Severity Class"}
+        )
+        st.plotly_chart(fig_history, use_container_width=True)
+        st.dataframe(history.drop(columns=["row"]), use_container_width=True)
@@ -1,15 +1,18 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.cache import cached, filter_signature
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.lubrication import lube_to_failure_cases
+from bearing_analysis.timeline import get_event_store
 
 st.set_page_config(page_title="Q6: Lubrication Impact on Failure", layout="wide")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
 st.title("Q6: Does Lubrication Prolong Bearing Life?")
 st.markdown("This analysis checks if prior lubrication is associated with lower failure probability and longer bearing life.")
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault"])
+    df = get_dataset()
     df = df[df["bearing_severity_class"].isin([1, 2, 3])]
     return df
 
@@ -44,34 +47,22 @@ if "All" not in selected_lubes:
     df = df[df["lubrication_type"].isin(selected_lubes)]
 
 # --- Analyze: Time since last lubrication vs failure ---
-df_sorted = df.sort_values(["monitor_id", "timestamp_of_fault"])
-results = []
-
-for monitor_id, group in df_sorted.groupby("monitor_id"):
-    group = group.reset_index(drop=True)
-    lube_events = group[group["bearing_severity_class"] == 1]["timestamp_of_fault"].tolist()  # Assume severity 1 = lubrication
-    fail_events = group[group["bearing_severity_class"].isin([2, 3])]["timestamp_of_fault"].tolist()
-
-    for fail_date in fail_events:
-        lube_before = [d for d in lube_events if d < fail_date]
-        if lube_before:
-            last_lube = max(lube_before)
-            days_between = (fail_date - last_lube).days
-            results.append({
-                "monitor_id": monitor_id,
-                "lubed_before_fail": True,
-                "days_between": days_between,
-                "fail_date": fail_date
-            })
-        else:
-            results.append({
-                "monitor_id": monitor_id,
-                "lubed_before_fail": False,
-                "days_between": None,
-                "fail_date": fail_date
-            })
-
-case_df = pd.DataFrame(results)
+# Assume severity 1 = lubrication; severity 2, 3 = failure
+signature = filter_signature(
+    {"bearing_make": selected_bearings, "industry_type": selected_industries,
+     "machine_type": selected_machines, "lubrication_type": selected_lubes},
+    {"bearing_make": bearing_options, "industry_type": industry_options,
+     "machine_type": machine_options, "lubrication_type": lube_options},
+)
+case_df = cached(
+    ("lube_to_failure_cases", (1,), (2, 3), True), signature,
+    lambda: lube_to_failure_cases(df, lube_classes=[1], failure_classes=[2, 3], include_unlubricated=True)
+)
+case_df = case_df[["monitor_id", "lubed_before_fail", "days_between", "fail_date"]]
+
+if case_df.empty:
+    st.warning("No failures found for the selected filters.")
+    st.stop()
 
 # --- Summary Metrics ---
 total_failures = len(case_df)
@@ -103,3 +94,15 @@ st.plotly_chart(fig, use_container_width=True)
 # --- Optional: Table of all cases ---
 with st.expander("View Raw Failure Records"):
     st.dataframe(case_df.drop(columns=["fail_date"]), use_container_width=True)
+
+# --- Monitor Drill-down ---
+with st.expander("Monitor Event History"):
+    monitor = st.selectbox("Monitor", sorted(case_df["monitor_id"].unique()))
+    history = get_event_store().history(monitor)
+    fig_history = px.scatter(
+        history, x="timestamp_of_fault", y="bearing_severity_class", color="lubrication_type",
+        title=f"Fault Timeline for Monitor {monitor}",
+        labels={"timestamp_of_fault": "Fault Time", "bearing_severity_class": "Severity Class"}
+    )
+    st.plotly_chart(fig_history, use_container_width=True)
+    st.dataframe(history.drop(columns=["row"]), use_container_width=True)
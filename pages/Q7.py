@@ -1,35 +1,34 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from scipy.stats import chi2_contingency
+from bearing_analysis.cache import cached
+from bearing_analysis.cube import get_cube
+from bearing_analysis.dataset import get_dataset
+from bearing_analysis.significance import CELL_COLUMNS, DEFAULT_PERMUTATIONS, FDR, independence_tests
 
 # Load dataset
 st.set_page_config(page_title="Q7: Missing Lubrication vs Severity", layout="wide")
 st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>", unsafe_allow_html=True)
 st.title("Q7. Is there any association between missing lubrication data and higher severity failures?")
 st.markdown("Investigate if 'Not Available' lubrication records correlate with increased risk.")
-@st.cache_data
-def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault", "subscription_start"])
-    return df
-
-df = load_data()
-# --- Preprocessing ---
-df["lubrication_status"] = df["lubrication_type"]
-df["is_lubrication_missing"] = df["lubrication_status"].str.lower().str.contains("not available")
+cube = get_cube()
 
 # Optional filters
+where = {}
 with st.expander("Optional Filters"):
-    industry = st.selectbox("Filter by Industry", ["All"] + sorted(df["industry_type"].dropna().unique().tolist()))
-    machine = st.selectbox("Filter by Machine Type", ["All"] + sorted(df["machine_type"].dropna().unique().tolist()))
+    industry = st.selectbox("Filter by Industry", ["All"] + cube.values("industry_type"))
+    machine = st.selectbox("Filter by Machine Type", ["All"] + cube.values("machine_type"))
 
     if industry != "All":
-        df = df[df["industry_type"] == industry]
+        where["industry_type"] = industry
     if machine != "All":
-        df = df[df["machine_type"] == machine]
+        where["machine_type"] = machine
 
 # --- Bar plot: Severity vs Missing Lubrication ---
-if "bearing_severity_class" in df.columns:
-    severity_counts = df.groupby(["is_lubrication_missing", "bearing_severity_class"]).size().reset_index(name="count")
+severity_counts = cube.size(["lubrication_type", "bearing_severity_class"], where).reset_index(name="count")
+if not severity_counts.empty:
+    severity_counts["is_lubrication_missing"] = severity_counts["lubrication_type"].astype(str).str.lower().str.contains("not available")
+    severity_counts = severity_counts.groupby(["is_lubrication_missing", "bearing_severity_class"])["count"].sum().reset_index()
     
     fig = px.bar(
         severity_counts,
@@ -48,10 +47,42 @@ if "bearing_severity_class" in df.columns:
 
     # Percent breakdown
     st.subheader(" Severity Breakdown (Percent with Missing Lubrication)")
-    total = severity_counts.groupby("bearing_severity_class")["count"].sum()
+    total = severity_counts.groupby("bearing_severity_class", observed=True)["count"].sum()
     missing = severity_counts[severity_counts["is_lubrication_missing"] == True].set_index("bearing_severity_class")["count"]
     percent_missing = (missing / total * 100).fillna(0).round(2)
     st.dataframe(percent_missing.reset_index().rename(columns={"count": "% Failures with Missing Lubrication"}))
 
+    # --- Significance: overall, then per operating condition ---
+    st.subheader(" Is the Association Significant?")
+    table = severity_counts.pivot(index="is_lubrication_missing", columns="bearing_severity_class", values="count").fillna(0)
+    table = table.loc[:, table.sum() > 0]
+    if table.shape[0] == 2 and table.shape[1] > 1:
+        chi2, p_value, dof, _ = chi2_contingency(table)
+        st.write(f"Across the selected records: chi-square = {chi2:.1f} with {dof} degrees of freedom, p = {p_value:.3g}.")
+
+    def run_tests():
+        df = get_dataset()
+        missing = df["lubrication_type"].astype(str).str.lower().str.contains("not available")
+        return independence_tests(df, missing, "bearing_severity_class")
+
+    tests = cached(("Q7 lubrication severity tests", DEFAULT_PERMUTATIONS), (), run_tests)
+    for col, value in where.items():
+        tests = tests[tests[col] == value]
+    tests = tests[tests["p_permutation"].notna()].sort_values("p_permutation")
+    if tests.empty:
+        st.info("No industry x machine x RPM cell has both lubrication states and more than one severity class.")
+    else:
+        st.dataframe(
+            tests.rename(columns={"rpm_fine_4": "rpm_range", "flagged": "missing_lubrication"}).style
+            .apply(lambda row: ["background-color: rgba(214, 39, 40, 0.25)" if row["significant"] else ""] * len(row), axis=1)
+            .format({"chi2": "{:.2f}", "p_chi2": "{:.4f}", "p_permutation": "{:.4f}", "q_value": "{:.4f}"}),
+            hide_index=True, use_container_width=True,
+        )
+        st.caption(
+            f"One test per {' x '.join(col.replace('_', ' ') for col in CELL_COLUMNS)} cell, from "
+            f"{DEFAULT_PERMUTATIONS:,} within-cell permutations. q-values control the false discovery rate across "
+            f"all cells; highlighted cells have q < {FDR}."
+        )
+
 else:
-    st.error(" Column `bearing_severity_class` not found in the dataset.")
+    st.warning("No records match the selected filters.")
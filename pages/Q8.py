@@ -1,8 +1,8 @@
 # pages/Q8.py
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.cube import get_cube
 
 # Page setup
 st.set_page_config(page_title="Q8: Lubrication Method Across Industries", layout="wide")
@@ -10,26 +10,22 @@ st.markdown("<a href='/' style='text-decoration:none;'>&larr; Back to Home</a>",
 st.title("Q8. How does lubrication method vary across industries and machine types?")
 st.markdown("Reveal industry-specific lubrication practices and their implications.")
 
-@st.cache_data
-def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["timestamp_of_fault", "subscription_start"])
-    return df
-
-df = load_data()
+cube = get_cube()
 
 # --- Optional Filters ---
+where = {}
 with st.expander("Optional Filters"):
-    industry = st.selectbox("Filter by Industry", ["All"] + sorted(df["industry_type"].dropna().unique().tolist()))
-    machine = st.selectbox("Filter by Machine Type", ["All"] + sorted(df["machine_type"].dropna().unique().tolist()))
+    industry = st.selectbox("Filter by Industry", ["All"] + cube.values("industry_type"))
+    machine = st.selectbox("Filter by Machine Type", ["All"] + cube.values("machine_type"))
 
     if industry != "All":
-        df = df[df["industry_type"] == industry]
+        where["industry_type"] = industry
     if machine != "All":
-        df = df[df["machine_type"] == machine]
+        where["machine_type"] = machine
 
 # --- Bar Plot: Lubrication Method Distribution ---
-if "lubrication_type" in df.columns:
-    lube_counts = df.groupby(["industry_type", "machine_type", "lubrication_type"]).size().reset_index(name="count")
+lube_counts = cube.size(["industry_type", "machine_type", "lubrication_type"], where).reset_index(name="count")
+if not lube_counts.empty:
     
     fig = px.bar(
         lube_counts,
@@ -48,4 +44,4 @@ if "lubrication_type" in df.columns:
     st.dataframe(lube_counts)
 
 else:
-    st.error("Column `lubrication_type` not found in the dataset.")
+    st.warning("No records match the selected filters.")
@@ -1,6 +1,7 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from bearing_analysis.association import MEASURES, AssociationIndex
+from bearing_analysis.dataset import DIMENSION_COLUMNS, SEVERITY_COLUMN, get_dataset
 
 # --- Config ---
 st.set_page_config(page_title="Q9: Severity Correlation", layout="wide", initial_sidebar_state="collapsed")
@@ -9,28 +10,24 @@ st.title("Q9: Does Failure Severity Correlate with RPM, Machine Type, or Bearing
 st.markdown("This view helps explore which combinations of features are linked with **higher severity bearing failures**.")
 
 # --- Load Data ---
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_excel("data/Cleaned_Bearing_Dataset.xlsx", parse_dates=["subscription_start", "timestamp_of_fault"])
+    df = get_dataset()
     df = df.dropna(subset=["bearing_severity_class", "rpm_min", "bearing_type_assigned_1", "machine_type"])
-    
-    def rpm_bucket(rpm):
-        if pd.isna(rpm):
-            return "Unknown"
-        elif rpm < 500:
-            return "Low"
-        elif rpm < 1500:
-            return "Medium"
-        else:
-            return "High"
-
-    df['rpm_range'] = df['rpm_min'].apply(rpm_bucket)
+    df['rpm_range'] = df['rpm_low_med_high_500']
     return df
 
+# Severity, every dimension and the RPM range, integer-coded once for all-pairs contingency tables
+@st.cache_resource
+def load_associations():
+    df = load_data()
+    return AssociationIndex(df, [SEVERITY_COLUMN, *[col for col in DIMENSION_COLUMNS if col in df.columns], "rpm_range"])
+
 df = load_data()
+associations = load_associations()
 
 st.divider()
-tab1, tab2, tab3 = st.tabs(["By Machine Type", "By Bearing Type", "By RPM Range"])
+tab1, tab2, tab3, tab4 = st.tabs(["By Machine Type", "By Bearing Type", "By RPM Range", "Association Matrix"])
 
 # --- TAB 1: Machine Type Analysis ---
 with tab1:
@@ -99,8 +96,45 @@ with tab3:
     st.plotly_chart(fig1, use_container_width=True)
 
     st.subheader("Severity Counts by RPM")
-    count_df = df3.groupby(['rpm_range', 'bearing_severity_class']).size().reset_index(name='count')
+    count_df = df3.groupby(['rpm_range', 'bearing_severity_class'], observed=True).size().reset_index(name='count')
     fig2 = px.bar(count_df, x="rpm_range", y="count", color="bearing_severity_class",
                   barmode="group", title="Failure Count by RPM Range and Severity",
                   labels={"rpm_range": "RPM Range", "bearing_severity_class": "Severity Class", "count": "Failures"})
     st.plotly_chart(fig2, use_container_width=True)
+
+# --- TAB 4: Association Matrix ---
+with tab4:
+    st.subheader("Filter")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        industries4 = st.multiselect("Industry", sorted(df['industry_type'].dropna().unique()), key="ind4")
+    with col2:
+        machines4 = st.multiselect("Machine Type", sorted(df['machine_type'].dropna().unique()), key="mt4")
+    with col3:
+        measure = st.radio("Measure", list(MEASURES), format_func=MEASURES.get, key="measure4")
+
+    # An empty selection means every value
+    mask = (
+        df['industry_type'].isin(industries4 or df['industry_type'].cat.categories)
+        & df['machine_type'].isin(machines4 or df['machine_type'].cat.categories)
+    ).to_numpy()
+
+    if not mask.any():
+        st.warning("No records match the selected filters.")
+    else:
+        matrix = associations.matrix(mask, measure)
+        fig = px.imshow(matrix, text_auto=".2f", color_continuous_scale="Blues", zmin=0,
+                        title=f"{MEASURES[measure]} between Every Pair of Columns ({mask.sum():,} records)")
+        fig.update_layout(height=650, xaxis_tickangle=-30)
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("Association with Severity")
+        severity = matrix[SEVERITY_COLUMN].drop(SEVERITY_COLUMN).sort_values(ascending=False).reset_index()
+        severity.columns = ["column", measure]
+        fig = px.bar(severity, x="column", y=measure, labels={"column": "Column", measure: MEASURES[measure]},
+                     title=f"{MEASURES[measure]} with Severity Class")
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(
+            "Cramér's V is bias-corrected, so columns with hundreds of categories are not inflated by sparse tables. "
+            "Mutual information has no such correction and grows with the number of categories."
+        )
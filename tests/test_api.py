@@ -0,0 +1,60 @@
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from bearing_analysis.api import app
+from bearing_analysis.dataset import get_dataset
+
+
+@pytest.fixture(scope="module")
+def client():
+    # Outside a with block, so the lifespan hook does not start warming models in the background
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("query", ["industry_type=NOPE", "rpm_low=5000&rpm_high=10"])
+def test_heatmap_without_rows_is_empty(client, query):
+    response = client.get(f"/heatmap?{query}")
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_heatmap_of_empty_selection_as_arrow_keeps_columns(client):
+    response = client.get("/heatmap?industry_type=NOPE&format=arrow")
+
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["machine_type", "rpm_bin_center", "count"]
+    assert table.num_rows == 0
+
+
+def test_heatmap_counts_every_failure_in_range(client):
+    rows = client.get("/heatmap").json()
+
+    assert sum(row["count"] for row in rows) == len(get_dataset().dropna(subset=["rpm_avg", "machine_type"]))
+
+
+def test_weibull_rejects_filters_outside_condition_columns(client):
+    response = client.get("/weibull?industry_type=NOPE")
+
+    assert response.status_code == 400
+    assert "industry_type" in response.json()["detail"]
+
+
+def test_weibull_filters_by_condition_columns(client):
+    rows = client.get("/weibull", params={"machine_type": "Blower - Blower"}).json()
+
+    assert rows
+    assert {row["machine_type"] for row in rows} == {"Blower - Blower"}
+
+
+def test_health_and_cached_responses_do_not_reload_the_dataset(client, monkeypatch):
+    assert client.get("/high-rpm?threshold=2500").status_code == 200
+
+    def fail(*args, **kwargs):
+        raise AssertionError("dataset accessed on the event loop")
+
+    monkeypatch.setattr("bearing_analysis.api.get_dataset", fail)
+    monkeypatch.setattr("bearing_analysis.api.get_result_cache", fail)
+    assert client.get("/health").json()["records"] == len(get_dataset())
+    assert client.get("/high-rpm?threshold=2500").status_code == 200
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats.contingency import association
+from sklearn.metrics import mutual_info_score
+
+from bearing_analysis.association import AssociationIndex, cramers_v, mutual_information
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    a = rng.integers(0, 4, n)
+    df = pd.DataFrame({
+        "a": pd.Categorical(a),
+        # Depends on a, so the pair is associated
+        "b": pd.Categorical((a + rng.integers(0, 2, n)) % 5),
+        "c": pd.Categorical(rng.choice(list("xyz"), n)),
+    })
+    df.loc[rng.random(n) < 0.1, "c"] = np.nan
+    return df
+
+
+def test_uncorrected_cramers_v_matches_scipy(frame):
+    table = pd.crosstab(frame["a"], frame["b"]).to_numpy()
+
+    assert cramers_v(table, corrected=False) == pytest.approx(association(table, method="cramer"))
+
+
+def test_mutual_information_matches_sklearn_in_bits(frame):
+    table = pd.crosstab(frame["a"], frame["b"]).to_numpy()
+
+    expected = mutual_info_score(frame["a"], frame["b"]) / np.log(2)
+    assert mutual_information(table) == pytest.approx(expected)
+
+
+def test_tables_match_crosstab_as_the_mask_changes(frame):
+    index = AssociationIndex(frame, ["a", "b", "c"])
+    rng = np.random.default_rng(1)
+    mask = rng.random(len(frame)) < 0.5
+
+    # Small steps from the previous mask are applied incrementally
+    for _ in range(5):
+        mask = mask ^ (rng.random(len(frame)) < 0.05)
+        counts = index.counts(mask)
+        subset = frame[mask]
+        for i, j in [(0, 1), (0, 2), (2, 1)]:
+            row, col = index.columns[i], index.columns[j]
+            expected = pd.crosstab(subset[row], subset[col], dropna=False).reindex(
+                index=frame[row].cat.categories, columns=frame[col].cat.categories, fill_value=0
+            )
+            np.testing.assert_array_equal(index.table(counts, i, j), expected.to_numpy())
+
+
+def test_matrix_is_symmetric_with_an_empty_diagonal(frame):
+    matrix = AssociationIndex(frame, ["a", "b", "c"]).matrix(measure="mutual_information")
+
+    assert np.isnan(np.diag(matrix)).all()
+    np.testing.assert_allclose(matrix.to_numpy(), matrix.to_numpy().T)
+    assert matrix.loc["a", "b"] > matrix.loc["a", "c"]
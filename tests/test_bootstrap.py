@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearing_analysis import bootstrap
+
+
+@pytest.fixture(scope="module")
+def values():
+    rng = np.random.default_rng(0)
+    sizes = [7, 7, 7, 30, 5, 5, 1, 120]
+    group_ids = np.repeat(np.arange(len(sizes)), sizes)
+    order = rng.permutation(len(group_ids))
+    return rng.normal(100, 20, len(group_ids)), group_ids[order]
+
+
+# Each bound forces a different split: by groups, by resamples, down to one resample of one group
+@pytest.mark.parametrize("max_cells", [5_000, 700, 35, 1])
+def test_chunked_draws_match_a_single_draw(values, monkeypatch, max_cells):
+    single = bootstrap.bootstrap_means(*values, n_groups=9, n_resamples=101, seed=1)
+
+    monkeypatch.setattr(bootstrap, "MAX_CELLS", max_cells)
+    chunked = bootstrap.bootstrap_means(*values, n_groups=9, n_resamples=101, seed=1)
+
+    np.testing.assert_array_equal(chunked, single)
+    assert np.isnan(chunked[8]).all()
+
+
+def test_bootstrap_means_resample_each_group_with_replacement(values):
+    data, group_ids = values
+
+    means = bootstrap.bootstrap_means(data, group_ids, 8, n_resamples=4_000)
+
+    for g in range(8):
+        group = data[group_ids == g]
+        # Means of one repeated record may round a last bit past it
+        assert group.min() - 1e-9 <= means[g].min() and means[g].max() <= group.max() + 1e-9
+        assert means[g].mean() == pytest.approx(group.mean(), abs=4 * group.std() / np.sqrt(4_000) + 1e-9)
+    # A single record has only one possible resample
+    assert (means[6] == data[group_ids == 6][0]).all()
+
+
+def test_rank_groups_matches_groupby_means():
+    rng = np.random.default_rng(2)
+    groups = pd.Series(rng.choice(["a", "b", "c", "d"], 2_000))
+    values = rng.normal(0, 1, 2_000) + groups.map({"a": 0.0, "b": 0.1, "c": 3.0, "d": -3.0}).to_numpy()
+
+    ranked = bootstrap.rank_groups(values, groups, n_resamples=1_000, k=1)
+
+    expected = pd.Series(values).groupby(groups).agg(["count", "mean"])
+    assert ranked["group"].tolist() == expected.index.tolist()
+    assert ranked["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(ranked["mean"], expected["mean"])
+    assert ((ranked["ci_low"] < ranked["mean"]) & (ranked["mean"] < ranked["ci_high"])).all()
+    assert ranked.set_index("group").loc["c", "p_top"] == 1.0
+    assert ranked.set_index("group").loc["d", "p_bottom"] == 1.0
+    assert ranked["p_top"].sum() == pytest.approx(1.0)
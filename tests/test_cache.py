@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.cache import ResultCache, filter_signature
+
+DOMAINS = {"industry": ["I1", "I2", "I3"], "machine": ["pump", "fan"]}
+
+
+def test_unconstrained_selections_share_one_signature():
+    expected = filter_signature({}, DOMAINS)
+
+    assert filter_signature({"industry": ["All"]}, DOMAINS) == expected
+    assert filter_signature({"industry": ["I3", "I1", "I2"], "machine": None}, DOMAINS) == expected
+
+
+def test_signature_ignores_order_and_values_outside_the_domain():
+    signature = filter_signature({"machine": "pump", "industry": ["I2", "I1", "NOPE"]}, DOMAINS)
+
+    assert signature == (("industry", ("I1", "I2")), ("machine", ("pump",)))
+    assert filter_signature({"industry": ["I1", "I2"], "machine": ["pump"]}, DOMAINS) == signature
+
+
+def test_hits_return_the_cached_result_and_count_lookups():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pd.DataFrame({"count": [1, 2, 3]})
+
+    first = cache.get_or_compute(("q", ()), compute)
+    second = cache.get_or_compute(("q", ()), compute)
+    # Callers may add columns to what they get back without touching the entry
+    second["extra"] = 0
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, cache.get(("q", ())))
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_the_budget():
+    block = np.zeros(1_000)
+    cache = ResultCache(max_bytes=2 * block.nbytes)
+    cache.put("a", block)
+    cache.put("b", block.copy())
+    cache.get("a")
+
+    cache.put("c", block.copy())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.stats()["evictions"] == 1
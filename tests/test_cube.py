@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearing_analysis.cube import Cube
+from bearing_analysis.dataset import SEVERITY_COLUMN
+
+DIMENSIONS = ["industry", "machine", "make"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame({
+        "industry": pd.Categorical(rng.choice(["I1", "I2", "I3"], n)),
+        "machine": pd.Categorical(rng.choice(["pump", "fan", "motor", "gearbox"], n)),
+        "make": pd.Categorical(rng.choice([f"M{i}" for i in range(12)], n)),
+        # Large offset with a small spread, where a sum-of-squares variance cancels
+        "days": 1e8 + rng.normal(400, 5, n),
+        SEVERITY_COLUMN: rng.integers(0, 4, n).astype("int8"),
+    })
+    df.loc[rng.random(n) < 0.05, "days"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def cube(frame):
+    return Cube.from_frame(frame, dimensions=DIMENSIONS, measure="days")
+
+
+@pytest.mark.parametrize("by", [["industry"], ["machine", "make"], DIMENSIONS])
+def test_rollup_matches_groupby(frame, cube, by):
+    rollup = cube.rollup(by)
+
+    expected = frame.groupby(by, observed=True)["days"].agg(["size", "count", "mean", "std", "min", "max"]).reset_index()
+    assert rollup[by].astype(str).values.tolist() == expected[by].astype(str).values.tolist()
+    assert rollup["rows"].tolist() == expected["size"].tolist()
+    assert rollup["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(rollup["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(rollup["std"], expected["std"], rtol=1e-6)
+    np.testing.assert_array_equal(rollup["min"], expected["min"])
+    np.testing.assert_array_equal(rollup["max"], expected["max"])
+
+
+def test_rollup_with_filters_matches_filtered_groupby(frame, cube):
+    where = {"industry": ["I1", "I3"], "make": ["M0", "M5", "M7"]}
+
+    rollup = cube.rollup("machine", where)
+
+    subset = frame[frame["industry"].isin(where["industry"]) & frame["make"].isin(where["make"])]
+    expected = subset.groupby("machine", observed=True)["days"].agg(["count", "std"]).reset_index()
+    assert rollup["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(rollup["std"], expected["std"], rtol=1e-6)
+
+
+def test_severity_counts_match_groupby(frame, cube):
+    sizes = cube.size(["machine", SEVERITY_COLUMN])
+
+    expected = frame.groupby(["machine", SEVERITY_COLUMN], observed=True).size()
+    assert sizes.tolist() == expected.tolist()
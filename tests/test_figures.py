@@ -0,0 +1,61 @@
+import tracemalloc
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from bearing_analysis.figures import cached_figure, get_figure_cache
+
+RERUNS = 1_000
+# Growth allowed over all reruns once both figures are cached
+MAX_GROWTH_BYTES = 512 * 1024
+
+
+def _draw(ax, data):
+    ax.bar(data.index.astype(str), data.to_numpy())
+    ax.set_title(data.name)
+
+
+def test_cached_figure_memory_is_flat_across_reruns():
+    data = pd.Series(np.arange(20, dtype=float), index=[f"group {i}" for i in range(20)], name="failures")
+    params = [("Failures", 10), ("Failures", 20)]
+    cache = get_figure_cache()
+    cache.clear()
+
+    # Warm up: the first renders load fonts and fill the cache
+    first = [cached_figure("test bars", data, _draw, params=p, figsize=(4, 3)) for p in params]
+    hits, misses = cache.hits, cache.misses
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(RERUNS):
+            image = cached_figure("test bars", data, _draw, params=params[i % 2], figsize=(4, 3))
+            assert image == first[i % 2]
+        del image
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert plt.get_fignums() == []
+    assert after - before < MAX_GROWTH_BYTES
+    assert cache.hits - hits == RERUNS
+    assert cache.misses == misses
+    assert len(cache) == len(params)
+
+
+def test_cached_figure_renders_each_key_once_and_releases_figures():
+    cache = get_figure_cache()
+    cache.clear()
+    misses = cache.misses
+    data = np.linspace(0, 1, 50)
+
+    def render(i):
+        return cached_figure("test line", data, lambda ax, d: ax.plot(d ** (i + 1)), params=(i,))
+
+    images = {render(i) for i in range(5)} | {render(i) for i in range(5)}
+
+    assert cache.misses - misses == 5
+    assert len(images) == 5
+    assert all(image.startswith(b"\x89PNG") for image in images)
+    assert plt.get_fignums() == []
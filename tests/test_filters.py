@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearing_analysis.filters import FilterIndex
+
+COLUMNS = ["industry", "machine", "make"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 10_000
+    df = pd.DataFrame({
+        "industry": rng.choice(["I1", "I2", "I3"], n),
+        "machine": rng.choice(["pump", "fan", "motor"], n, p=[0.6, 0.39, 0.01]),
+        # Mostly rare values, stored as row positions rather than bitmaps
+        "make": rng.choice([f"M{i}" for i in range(200)], n),
+    })
+    df.loc[rng.random(n) < 0.05, "industry"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def index(frame):
+    return FilterIndex(frame, COLUMNS)
+
+
+def _mask(frame, selections):
+    mask = np.ones(len(frame), dtype=bool)
+    for col, selected in selections.items():
+        if selected is not None:
+            mask &= frame[col].isin(selected).to_numpy()
+    return mask
+
+
+SELECTIONS = [
+    {},
+    {"industry": ["I1", "I3"]},
+    {"industry": ["I1", "I2", "I3"]},
+    {"machine": ["motor"], "make": ["M1", "M2", "M150"]},
+    {"industry": ["I2"], "machine": ["pump", "fan"], "make": [f"M{i}" for i in range(0, 200, 3)]},
+    {"industry": None, "machine": ["NOPE"]},
+]
+
+
+@pytest.mark.parametrize("selections", SELECTIONS)
+def test_select_matches_boolean_mask(frame, index, selections):
+    expected = _mask(frame, selections)
+
+    np.testing.assert_array_equal(index.select(selections), expected)
+    assert index.count(selections) == expected.sum()
+
+
+@pytest.mark.parametrize("selections", SELECTIONS)
+def test_counts_ignore_the_columns_own_selection(frame, index, selections):
+    for column in COLUMNS:
+        others = {col: selected for col, selected in selections.items() if col != column}
+        expected = frame.loc[_mask(frame, others), column].value_counts()
+
+        counts = index.counts(column, selections)
+        assert counts[counts > 0].sort_index().to_dict() == expected.sort_index().to_dict()
+
+
+def test_signature_is_equal_for_selections_matching_the_same_rows(frame, index):
+    every_industry = {"industry": ["I1", "I2", "I3"], "machine": ["pump"]}
+
+    assert index.signature(every_industry) != index.signature({"machine": ["pump"]})
+    assert index.signature({"machine": ["pump", "NOPE"]}) == index.signature({"machine": ["pump"]})
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearing_analysis.ranges import RangeIndex
+
+
+def _frame(offset, n=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "machine": pd.Categorical(rng.choice(list("abcde"), n)),
+        "make": pd.Categorical(rng.choice(list("xyz"), n)),
+        "x": rng.uniform(0, 5_000, n),
+        "y": offset + rng.normal(100, 3, n),
+    })
+    df.loc[rng.random(n) < 0.05, "y"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("offset", [0.0, 1e9])
+@pytest.mark.parametrize("y_range", [None, (95.0, 105.0)])
+def test_summary_matches_groupby(offset, y_range):
+    df = _frame(offset)
+    index = RangeIndex.from_frame(df, "x", "y", partition=["machine", "make"])
+    y_range = None if y_range is None else (offset + y_range[0], offset + y_range[1])
+
+    summary = index.summary(["machine"], (250.0, 3_700.0), y_range)
+
+    subset = df[df["x"].between(250, 3_700) & df["y"].notna()]
+    if y_range is not None:
+        subset = subset[subset["y"].between(*y_range)]
+    expected = subset.groupby("machine", observed=True)["y"].agg(["count", "mean", "std"]).reset_index()
+    assert summary["count"].tolist() == expected["count"].tolist()
+    np.testing.assert_allclose(summary["mean"], expected["mean"], rtol=1e-12)
+    np.testing.assert_allclose(summary["std"], expected["std"], rtol=1e-5)
+
+
+def test_rows_match_boolean_filter():
+    df = _frame(0.0)
+    index = RangeIndex.from_frame(df, "x", "y", partition=["machine"])
+
+    rows = index.rows((1_000.0, 2_000.0), (98.0, 110.0), where={"machine": ["a", "c"]})
+
+    expected = np.flatnonzero(
+        (df["x"].between(1_000, 2_000) & df["y"].between(98, 110) & df["machine"].isin(["a", "c"])).to_numpy()
+    )
+    np.testing.assert_array_equal(rows, expected)
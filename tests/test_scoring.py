@@ -0,0 +1,73 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from bearing_analysis.models import get_model_registry
+from bearing_analysis.scoring import PREDICTED, probability_columns, score_file, score_frame
+
+
+@pytest.fixture(scope="module")
+def model():
+    return get_model_registry().best({})
+
+
+@pytest.fixture(scope="module")
+def machine(model):
+    return str(model.machine_encoder.classes_[0])
+
+
+def test_parquet_chunks_with_nulls_keep_the_source_types(tmp_path, model, machine):
+    source = tmp_path / "monitors.parquet"
+    pq.write_table(pa.table({
+        "machine_type": [machine] * 4,
+        "rpm_min": [100.0, 200.0, 300.0, 400.0],
+        "rpm_max": [500.0, 600.0, 700.0, 800.0],
+        # The second chunk is all null, which pandas reads back as float and None
+        "part": pa.array([1, 2, None, None], pa.int64()),
+        "note": pa.array(["a", "b", None, None]),
+    }), source)
+
+    rows = score_file(source, tmp_path / "scores.parquet", model, chunk_size=2)
+
+    scored = pq.read_table(tmp_path / "scores.parquet")
+    assert rows == 4
+    assert scored.schema.field("part").type == pa.int64()
+    assert scored.column("part").to_pylist() == [1, 2, None, None]
+    assert scored.column("note").to_pylist() == ["a", "b", None, None]
+    assert scored.schema.field(PREDICTED).type == pa.int8()
+
+
+def test_csv_chunks_with_blanks_and_decimals_fit_one_schema(tmp_path, model, machine):
+    source = tmp_path / "monitors.csv"
+    source.write_text(
+        "machine_type,rpm_min,rpm_max,part,note\n"
+        f"{machine},100,500,1,\n"
+        f"{machine},200,600,2,\n"
+        f"{machine},300,700,,x\n"
+        f"{machine},400.5,800,3.5,y\n"
+    )
+
+    score_file(source, tmp_path / "scores.parquet", model, chunk_size=2)
+
+    scored = pq.read_table(tmp_path / "scores.parquet")
+    assert scored.column("part").to_pylist() == [1.0, 2.0, None, 3.5]
+    assert scored.column("note").to_pylist() == [None, None, "x", "y"]
+    assert scored.column("rpm_min").to_pylist() == [100.0, 200.0, 300.0, 400.5]
+
+
+def test_scored_file_matches_score_frame(tmp_path, model, machine):
+    table = pa.table({
+        "machine_type": [machine, machine, "unknown machine", machine],
+        "rpm_min": [100.0, 1_000.0, 500.0, None],
+        "rpm_max": [300.0, 3_000.0, 900.0, 700.0],
+    })
+    pq.write_table(table, tmp_path / "monitors.parquet")
+
+    score_file(tmp_path / "monitors.parquet", tmp_path / "scores.parquet", model, chunk_size=3)
+
+    scored = pq.read_table(tmp_path / "scores.parquet").to_pandas()
+    expected = score_frame(table.to_pandas(), model)
+    columns = probability_columns(model)
+    np.testing.assert_allclose(scored[columns].to_numpy(), expected[columns].to_numpy())
+    assert scored[PREDICTED].isna().tolist() == [False, False, True, True]
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, false_discovery_control
+
+from bearing_analysis import significance
+
+BY = ["industry_type", "machine_type"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3_000
+    df = pd.DataFrame({
+        "industry_type": rng.choice(["I1", "I2"], n),
+        "machine_type": rng.choice(["pump", "fan", "motor"], n),
+        "severity": rng.choice(["low", "medium", "high"], n),
+        "days": rng.normal(400, 50, n),
+        "flag": rng.random(n) < 0.3,
+    })
+    # In one cell flagged records fail sooner and more severely
+    strong = (df["industry_type"] == "I1") & (df["machine_type"] == "pump") & df["flag"]
+    df.loc[strong, "days"] -= 100
+    df.loc[strong & (rng.random(n) < 0.7), "severity"] = "high"
+    # A cell with a single outcome cannot be tested
+    df.loc[(df["industry_type"] == "I2") & (df["machine_type"] == "motor"), "severity"] = "low"
+    return df
+
+
+def test_benjamini_hochberg_matches_scipy():
+    p_values = np.random.default_rng(1).uniform(0, 0.2, 50) ** 2
+
+    np.testing.assert_allclose(significance.benjamini_hochberg(p_values), false_discovery_control(p_values))
+
+
+def test_benjamini_hochberg_skips_missing_p_values():
+    p_values = np.array([0.01, np.nan, 0.04, 0.03, np.nan, 0.5])
+
+    q = significance.benjamini_hochberg(p_values)
+
+    assert np.isnan(q[[1, 4]]).all()
+    np.testing.assert_allclose(q[~np.isnan(p_values)], false_discovery_control(p_values[~np.isnan(p_values)]))
+
+
+def test_chi_square_matches_scipy_per_cell(frame):
+    tests = significance.independence_tests(frame, frame["flag"], "severity", by=BY, n_permutations=200)
+
+    for row in tests.itertuples():
+        cell = frame[(frame["industry_type"] == row.industry_type) & (frame["machine_type"] == row.machine_type)]
+        table = pd.crosstab(cell["flag"], cell["severity"]).to_numpy()
+        assert row.records == len(cell) and row.flagged == cell["flag"].sum()
+        if table.shape[1] < 2:
+            assert np.isnan(row.p_chi2) and np.isnan(row.q_value)
+            continue
+        result = chi2_contingency(table, correction=False)
+        assert row.chi2 == pytest.approx(result.statistic)
+        assert row.dof == result.dof
+        assert row.p_chi2 == pytest.approx(result.pvalue)
+    assert tests.loc[tests["significant"], BY].values.tolist() == [["I1", "pump"]]
+
+
+def test_mean_differences_match_groupby(frame):
+    tests = significance.mean_difference_tests(frame, frame["flag"], "days", by=BY, n_permutations=200)
+
+    means = frame.groupby(BY + ["flag"])["days"].mean().unstack()
+    np.testing.assert_allclose(tests["mean_flagged"], means[True].to_numpy())
+    np.testing.assert_allclose(tests["mean_other"], means[False].to_numpy())
+    np.testing.assert_allclose(tests["difference"], (means[True] - means[False]).to_numpy())
+    assert tests.loc[tests["significant"], BY].values.tolist() == [["I1", "pump"]]
+
+
+def test_chunked_permutations_match_a_single_matrix(frame, monkeypatch):
+    single = significance.mean_difference_tests(frame, frame["flag"], "days", by=BY, n_permutations=50)
+
+    monkeypatch.setattr(significance, "MAX_CELLS", 7 * len(frame))
+    chunked = significance.mean_difference_tests(frame, frame["flag"], "days", by=BY, n_permutations=50)
+
+    pd.testing.assert_frame_equal(chunked, single)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearing_analysis.cube import Cube
+from bearing_analysis.dataset import SEVERITY_COLUMN
+from bearing_analysis.sketch import ALPHA, SketchSet
+
+QS = [0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def _assert_within_alpha(actual, expected, alpha=ALPHA):
+    np.testing.assert_array_less(np.abs(actual - expected), alpha * np.abs(expected) + 1e-12)
+
+
+@pytest.mark.parametrize("alpha", [ALPHA, 0.05])
+def test_quantiles_are_within_relative_error_alpha(alpha):
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(5, 1.5, 20_000)
+    groups = rng.integers(0, 4, len(values))
+
+    sketches = SketchSet.from_values(groups, values, 4, alpha=alpha)
+    quantiles = sketches.quantiles(np.arange(4), 4, QS)
+
+    for g in range(4):
+        _assert_within_alpha(quantiles[g], np.quantile(values[groups == g], QS), alpha)
+
+
+def test_merged_sketches_match_the_pooled_values():
+    rng = np.random.default_rng(1)
+    values = rng.uniform(1, 1_734, 5_000)
+    values[rng.random(len(values)) < 0.1] = np.nan
+    groups = rng.integers(0, 10, len(values))
+    # Stored groups 0-4 merge into output 0, 5-8 into output 1, 9 is left out
+    mapping = np.array([0] * 5 + [1] * 4 + [-1])
+
+    quantiles = SketchSet.from_values(groups, values, 10).quantiles(mapping, 2, QS)
+
+    for out, stored in enumerate([groups < 5, (groups >= 5) & (groups < 9)]):
+        _assert_within_alpha(quantiles[out], np.nanquantile(values[stored], QS))
+
+
+def test_zero_and_empty_groups():
+    sketches = SketchSet.from_values([0, 0, 0, 1], [0.0, 0.0, 10.0, np.nan], 3)
+
+    quantiles = sketches.quantiles(np.arange(3), 3, [0.5, 1.0])
+
+    assert quantiles[0, 0] == 0.0
+    _assert_within_alpha(quantiles[0, 1], 10.0)
+    assert np.isnan(quantiles[1:]).all()
+    assert sketches.totals().tolist() == [3, 0, 0]
+
+
+def test_cube_quantiles_match_groupby_within_alpha():
+    rng = np.random.default_rng(2)
+    n = 10_000
+    df = pd.DataFrame({
+        "industry": pd.Categorical(rng.choice(["I1", "I2"], n)),
+        "machine": pd.Categorical(rng.choice(["pump", "fan", "motor"], n)),
+        "days": rng.integers(1, 1_735, n).astype(float),
+        SEVERITY_COLUMN: rng.integers(0, 4, n).astype("int8"),
+    })
+    cube = Cube.from_frame(df, dimensions=["industry", "machine"], measure="days")
+
+    quantiles = cube.quantiles(["machine"], [0.5, 0.9])
+
+    expected = df.groupby("machine", observed=True)["days"].quantile([0.5, 0.9]).unstack()
+    _assert_within_alpha(quantiles[["p50", "p90"]].to_numpy(), expected.to_numpy())
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from bearing_analysis.survival import SurvivalCurves, kaplan_meier, weibull_fit
+
+
+@pytest.fixture(scope="module")
+def records():
+    # Group 0: 2, 3, 3+, 5, 8, 8+   Group 1: 1+, 4, 4   (+ is censored)
+    durations = np.array([2, 3, 3, 5, 8, 8, 1, 4, 4], dtype=float)
+    events = np.array([1, 1, 0, 1, 1, 0, 0, 1, 1], dtype=bool)
+    groups = np.array([0, 0, 0, 0, 0, 0, 1, 1, 1])
+    order = np.random.default_rng(0).permutation(len(durations))
+    return durations[order], events[order], groups[order]
+
+
+def test_kaplan_meier_matches_a_hand_computed_curve(records):
+    table = kaplan_meier(*records, n_groups=2)
+
+    expected = pd.DataFrame({
+        "group": [0, 0, 0, 0, 1, 1],
+        "time": [2.0, 3.0, 5.0, 8.0, 1.0, 4.0],
+        "at_risk": [6, 5, 3, 2, 3, 2],
+        "events": [1, 1, 1, 1, 0, 2],
+        "censored": [0, 1, 0, 1, 1, 0],
+        "survival": [5 / 6, 5 / 6 * 4 / 5, 2 / 3 * 2 / 3, 4 / 9 * 1 / 2, 1.0, 0.0],
+    })
+    pd.testing.assert_frame_equal(table, expected, check_dtype=False)
+
+
+def test_intervals_read_the_first_time_at_or_below_reliability(records):
+    table = kaplan_meier(*records, n_groups=2)
+    weibull = pd.DataFrame({"shape": [1.0, 2.0], "scale": [10.0, 5.0]})
+    curves = SurvivalCurves(pd.DataFrame({"machine": ["pump", "fan"]}), table, weibull)
+
+    median = curves.intervals(0.5)
+    low = curves.intervals(0.1)
+
+    assert median["km_days"].tolist() == [5.0, 4.0]
+    assert np.isnan(low["km_days"][0]) and low["km_days"][1] == 4.0
+    np.testing.assert_allclose(median["weibull_days"], [10 * np.log(2), 5 * np.sqrt(np.log(2))])
+    assert curves.curve(1)["survival"].tolist() == [1.0, 0.0]
+
+
+def test_weibull_fit_matches_scipy_censored_maximum_likelihood():
+    rng = np.random.default_rng(1)
+    params = [(1.5, 400.0), (0.8, 50.0), (3.0, 1_000.0)]
+    durations, events, groups = [], [], []
+    for g, (shape, scale) in enumerate(params):
+        failure = scale * rng.weibull(shape, 300)
+        censor = rng.uniform(0, 2 * scale, 300)
+        durations.append(np.minimum(failure, censor))
+        events.append(failure <= censor)
+        groups.append(np.full(300, g))
+    durations, events, groups = map(np.concatenate, (durations, events, groups))
+
+    fit = weibull_fit(durations, events, groups, len(params))
+
+    for g in range(len(params)):
+        t, d = durations[groups == g], events[groups == g]
+        data = stats.CensoredData(uncensored=t[d], right=t[~d])
+        shape, _, scale = stats.weibull_min.fit(data, floc=0)
+        assert fit["shape"][g] == pytest.approx(shape, rel=1e-4)
+        assert fit["scale"][g] == pytest.approx(scale, rel=1e-4)
+        assert fit["failures"][g] == d.sum()
+
+
+def test_weibull_fit_leaves_groups_without_spread_missing():
+    durations = np.array([5.0, 5.0, 7.0, 3.0, 9.0])
+    events = np.array([True, True, False, True, False])
+    groups = np.array([0, 0, 0, 1, 1])
+
+    fit = weibull_fit(durations, events, groups, 2)
+
+    assert fit[["shape", "scale"]].isna().all().all()
+    assert fit["failures"].tolist() == [2, 1]
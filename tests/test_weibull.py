@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearing_analysis import weibull
+from bearing_analysis.dataset import SEVERITY_COLUMN
+from bearing_analysis.survival import survival_frame, weibull_fit
+
+BY = ["machine_type", "lubrication_type"]
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 3_000
+    start = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    fault = start + pd.to_timedelta(rng.weibull(1.5, n) * 500, unit="D")
+    df = pd.DataFrame({
+        "machine_type": pd.Categorical(rng.choice(["pump", "fan", "motor", "gearbox"], n)),
+        "lubrication_type": pd.Categorical(rng.choice(["grease", "oil"], n)),
+        "subscription_start": start,
+        # About a third of the monitors have not failed yet
+        "timestamp_of_fault": fault.where(rng.random(n) < 0.7),
+        "subscription_end": pd.NaT,
+        SEVERITY_COLUMN: rng.integers(0, 4, n),
+    })
+    return df
+
+
+def test_table_matches_a_fit_of_each_group_alone(frame):
+    table = weibull.fit_conditions(frame, by=BY, workers=1)
+
+    survival = survival_frame(frame)
+    for row in table.itertuples():
+        group = survival[(survival["machine_type"] == row.machine_type) & (survival["lubrication_type"] == row.lubrication_type)]
+        durations = group["duration"].to_numpy()
+        fit = weibull_fit(durations, group["event"].to_numpy(), np.zeros(len(group), dtype=np.int64), 1)
+        assert row.records == len(group)
+        assert row.shape == pytest.approx(fit["shape"][0], rel=1e-8)
+        assert row.scale == pytest.approx(fit["scale"][0], rel=1e-8)
+        assert row.shape_low < row.shape < row.shape_high
+        assert row.b10_days == pytest.approx(row.scale * (-np.log(0.9)) ** (1 / row.shape))
+
+
+def test_worker_slices_give_the_single_process_table(frame, monkeypatch):
+    monkeypatch.setattr(weibull, "MIN_ROWS_PER_WORKER", 1)
+
+    parallel = weibull.fit_conditions(frame, by=BY, workers=3)
+
+    pd.testing.assert_frame_equal(parallel, weibull.fit_conditions(frame, by=BY, workers=1))